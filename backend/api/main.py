@@ -56,16 +56,32 @@ if not logger.handlers:
     logger.addHandler(console_handler)
 
 # assume these are implemented in your pipeline
-from ocr_agents.aggregator import run_ocr_agents   # returns layer3_output
-from llm_engine.extractor import extract_entities  # takes layer3_output -> layer4_output
+from ocr_agents.aggregator import run_ocr_agents, shutdown_page_pool   # returns layer3_output
+from llm_engine.extractor import extract_entities, extract_entities_async  # takes layer3_output -> layer4_output
+from llm_engine.extractor import extract_entities_batch_async
+from llm_engine.ollama_client import close_ollama_client
 from form_mapper.mapper import map_entities_to_form
 # from admin.form_generator import generate_draft_schema # Admin module not available yet
 from llm_engine.prompt_registry import get_prompt as get_prompt_for # Corrected import
+from llm_engine.prompt_registry import clear_prompt_cache, prompt_fields
 from form_mapper.entity_store import EntityStore
 from voice.whisper_input import VoiceInputProcessor
 from ingestion.validators import validate_upload_constraints
+from ingestion.text_layer import extract_text_layer
+from ingestion.pdf_document import PDFDocument, is_pdf_upload
+from ingestion.image_preprocess import CARD_CROP, crop_card
+from ingestion.dedup import dedupe_pages
+from ingestion.quality import check_page_quality
+from ingestion.aadhaar_qr import QR_FAST_PATH, extract_from_qr, get_qr_stats, qr_missing_fields
+from ocr_agents.cache import get_ocr_cache_stats
+from llm_engine.cache import get_llm_cache_stats
+from llm_engine.compaction import get_prompt_stats
+from llm_engine.rules import get_rule_stats
+from ocr_agents.cascade import get_cascade_stats
+from ocr_agents import warmup as warmup_ocr_agents, readiness as ocr_readiness
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
 
 # --- AUTH & DB IMPORTS ---
 from . import models, database
@@ -92,6 +108,31 @@ from api.routers import dashboard
 app.include_router(dashboard.router, tags=["dashboard"])
 # -------------------------
 
+# Load OCR models in the background at start-up; /health/ready reports 503
+# until they are hot. Set OCR_WARMUP_ON_STARTUP=false to load on first use
+# (the worker then reports ready unless a required model failed to load).
+OCR_WARMUP_ON_STARTUP = os.getenv("OCR_WARMUP_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+@app.on_event("startup")
+def start_ocr_warmup():
+    if OCR_WARMUP_ON_STARTUP:
+        import threading
+        threading.Thread(target=warmup_ocr_agents, name="ocr-warmup", daemon=True).start()
+
+@app.on_event("shutdown")
+def stop_ocr_workers():
+    shutdown_page_pool()
+
+@app.on_event("shutdown")
+async def close_llm_client():
+    await close_ollama_client()
+
+@app.get("/health/ready")
+def readiness_check():
+    """Readiness probe: 200 once the OCR models are loaded and warmed up."""
+    report = ocr_readiness(lazy=not OCR_WARMUP_ON_STARTUP)
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
 BASE_DATA_DIR = Path("data/uploads")
 BASE_DATA_DIR.mkdir(exist_ok=True, parents=True)
 
@@ -218,13 +259,21 @@ async def get_session_state(session_id: str):
 async def upload_document_to_session(
     session_id: str,
     document_type: str = Form(...),
-    files: List[UploadFile] = File(...)
+    files: List[UploadFile] = File(...),
+    defer: bool = Form(False)
 ):
     """
     Step-by-step document upload.
     1. Validates upload
     2. Runs OCR & LLM
     3. Merges result into Session Entity Store
+
+    With defer=true the LLM step is postponed: the OCR output is queued on
+    the session and /session/{id}/extract extracts every queued document
+    in one LLM call (e.g. Aadhaar + PAN uploaded together). Deferred
+    documents are merged when that call returns, i.e. after any upload made
+    without defer in the meantime; merging is by source trust and
+    confidence, so the order only decides exact ties.
     """
     logger.info(f"Upload started [{session_id[:8]}]: type={document_type}, files={len(files)}")
     
@@ -240,7 +289,7 @@ async def upload_document_to_session(
 
     # 1. Validation
     try:
-        validate_upload_constraints(files, document_type)
+        pdf_documents = validate_upload_constraints(files, document_type)
         logger.info(f"  ✓ Validation passed")
     except HTTPException as e:
         logger.error(f"  ✗ Validation failed: {e.detail}")
@@ -250,66 +299,161 @@ async def upload_document_to_session(
     upload_dir = BASE_DATA_DIR / session_id / document_type
     upload_dir.mkdir(parents=True, exist_ok=True)
     
+    # PDFs are parsed once (validation may already have done it) and the
+    # same in-memory buffer is saved, text-mined and rendered.
     saved_paths = []
-    for file in files:
+    for i, file in enumerate(files):
         file_path = upload_dir / file.filename
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        saved_paths.append(str(file_path))
-    logger.info(f"  ✓ Saved {len(files)} file(s)")
-
-    # Convert PDFs to images if necessary
-    processed_paths = []
-    for path in saved_paths:
-        if path.lower().endswith('.pdf'):
+        if pdf_documents[i] is None and is_pdf_upload(file):
             try:
-                from ingestion.pdf_loader import pdf_to_images
-                image_paths = pdf_to_images(path)
-                processed_paths.extend(image_paths)
-                logger.info(f"  ✓ PDF → {len(image_paths)} image(s)")
+                pdf_documents[i] = PDFDocument.from_upload(file)
             except Exception as e:
-                logger.error(f"  ✗ PDF conversion failed: {str(e)}")
-                raise HTTPException(status_code=500, detail=f"PDF conversion failed: {str(e)}")
+                logger.error(f"  ✗ PDF could not be opened: {str(e)}")
+                raise HTTPException(status_code=400, detail=f"Invalid PDF: {str(e)}")
+        if pdf_documents[i] is not None:
+            pdf_documents[i].save(file_path)
         else:
-            processed_paths.append(path)
+            with open(file_path, "wb") as buffer:
+                shutil.copyfileobj(file.file, buffer)
+        saved_paths.append(str(file_path))
+    logger.info(f"  ✓ Saved {len(files)} file(s)")
 
-    # 3. OCR (Layer 3)
-    try:
-        layer3_output = run_ocr_agents(processed_paths, document_type)
-        
-        # Log OCR results
-        if "ocr_outputs" in layer3_output:
-            ocr_count = len(layer3_output['ocr_outputs'])
-            avg_conf = sum(o.get('confidence', 0) for o in layer3_output['ocr_outputs']) / max(ocr_count, 1)
-            logger.info(f"  ✓ OCR complete: {ocr_count} outputs, avg_conf={avg_conf:.2f}")
+    # Convert PDFs to in-memory page images if necessary. Digital PDFs with
+    # a usable text layer skip rasterization and OCR entirely.
+    processed_pages = []
+    text_layer_outputs = []
+    page_names = []
+    photo_pages, photo_names = [], []
+    for path, pdf in zip(saved_paths, pdf_documents):
+        if pdf is not None:
+            with pdf:
+                # Parsing and rendering are CPU-bound; keep them off the event loop
+                text_bundle = await run_in_threadpool(extract_text_layer, pdf)
+                if text_bundle:
+                    text_layer_outputs.extend(text_bundle["ocr_outputs"])
+                    logger.info(f"  ✓ PDF text layer → {len(text_bundle['ocr_outputs'])} page(s), OCR skipped")
+                    continue
+                try:
+                    from ingestion.pdf_loader import pdf_to_arrays
+                    page_images = await run_in_threadpool(pdf_to_arrays, pdf)
+                    processed_pages.extend(page_images)
+                    page_names.extend(f"{os.path.basename(path)} page {k + 1}" for k in range(len(page_images)))
+                    logger.info(f"  ✓ PDF → {len(page_images)} image(s)")
+                except Exception as e:
+                    logger.error(f"  ✗ PDF conversion failed: {str(e)}")
+                    raise HTTPException(status_code=500, detail=f"PDF conversion failed: {str(e)}")
         else:
-            logger.warning(f"  ⚠ Unexpected OCR output format")
+            # Photos: OCR only the perspective-corrected card, not the background
+            page = await run_in_threadpool(crop_card, path) if CARD_CROP else path
+            processed_pages.append(page)
+            page_names.append(os.path.basename(path))
+            photo_pages.append(page)
+            photo_names.append(os.path.basename(path))
+
+    # Same side uploaded twice: tell the user now rather than OCR both copies
+    # and hand the LLM duplicated text.
+    if len(processed_pages) > 1:
+        try:
+            processed_pages = await run_in_threadpool(dedupe_pages, processed_pages, document_type, page_names)
+        except HTTPException as e:
+            logger.error(f"  ✗ Duplicate pages: {e.detail}")
+            raise
+
+    # Reject blurry / dark / tiny photos in milliseconds instead of after a
+    # full OCR + LLM pass that would only produce empty entities.
+    if photo_pages:
+        try:
+            await run_in_threadpool(check_page_quality, photo_pages, photo_names)
+        except HTTPException as e:
+            logger.error(f"  ✗ Quality gate failed: {e.detail}")
+            raise
+
+    # 3. Aadhaar QR fast path: the card's QR carries name, DOB, gender and
+    # address, so a complete decode replaces OCR + LLM extraction. When a
+    # field the session's form needs is missing (typically the masked Aadhaar
+    # number), OCR + LLM extract just those fields and the QR values are
+    # merged on top.
+    layer4_output = None
+    qr_entities, qr_missing = {}, None
+    if document_type == "aadhaar" and QR_FAST_PATH and processed_pages:
+        try:
+            qr_entities = await run_in_threadpool(extract_from_qr, processed_pages) or {}
+        except Exception as e:
+            logger.warning(f"  ⚠ Aadhaar QR decode failed: {str(e)}")
+        if qr_entities:
+            form_fields = prompt_fields(get_prompt_for("aadhaar", SESSIONS[session_id]["form_type"]))
+            qr_missing = qr_missing_fields(qr_entities, form_fields)
+            if qr_missing:
+                logger.info(f"  ✓ Aadhaar QR decoded: {len(qr_entities)} entities, "
+                            f"extracting {', '.join(qr_missing)} from OCR")
+            else:
+                layer4_output = qr_entities
+                logger.info(f"  ✓ Aadhaar QR decoded: {len(qr_entities)} entities, OCR + LLM skipped")
+
+    if not layer4_output:
+        # 3b. OCR (Layer 3)
+        try:
+            # Run off the event loop so concurrent uploads can overlap (and be
+            # micro-batched by the Paddle agent when batching is enabled).
+            if processed_pages:
+                layer3_output = await run_in_threadpool(run_ocr_agents, processed_pages, document_type)
+            else:
+                layer3_output = {"ocr_outputs": []}
+            # Each PDF numbers its text-layer pages from 0 and OCR numbers the
+            # rendered pages from 0; text-layer pages follow the OCR pages so
+            # every page of the upload keeps a distinct index.
+            for k, output in enumerate(text_layer_outputs):
+                output["page"] = len(processed_pages) + k
+            layer3_output["ocr_outputs"] = text_layer_outputs + layer3_output["ocr_outputs"]
+        
+            # Log OCR results
+            if "ocr_outputs" in layer3_output:
+                ocr_count = len(layer3_output['ocr_outputs'])
+                avg_conf = sum(o.get('confidence', 0) for o in layer3_output['ocr_outputs']) / max(ocr_count, 1)
+                logger.info(f"  ✓ OCR complete: {ocr_count} outputs, avg_conf={avg_conf:.2f}")
+                if layer3_output.get("skipped_agents"):
+                    logger.info(f"  ✓ OCR cascade skipped: {layer3_output['skipped_agents']}")
+            else:
+                logger.warning(f"  ⚠ Unexpected OCR output format")
             
-    except Exception as e:
-        logger.error(f"  ✗ OCR failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
-
-    # 4. LLM Extraction (Layer 4)
-    form_type = SESSIONS[session_id]["form_type"]
-    try:
-        layer4_output = extract_entities(layer3_output, document_type, form_type)
+        except Exception as e:
+            logger.error(f"  ✗ OCR failed: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"OCR processing failed: {str(e)}")
+
+        # 4. LLM Extraction (Layer 4)
+        form_type = SESSIONS[session_id]["form_type"]
+        if defer:
+            pending = SESSIONS[session_id].setdefault("pending_documents", [])
+            pending.append({"document_type": document_type, "ocr_bundle": layer3_output,
+                            "only_fields": qr_missing, "entities": qr_entities})
+            logger.info(f"Upload deferred [{session_id[:8]}]: {document_type}, {len(pending)} document(s) queued")
+            return {
+                "message": f"{document_type} processed; extraction deferred.",
+                "pending_documents": [d["document_type"] for d in pending],
+                "current_entities": SESSIONS[session_id]["store"].get_session_view()
+            }
+        try:
+            layer4_output = await extract_entities_async(layer3_output, document_type, form_type,
+                                                         only_fields=qr_missing)
+            if qr_entities and isinstance(layer4_output, dict):
+                layer4_output = {**layer4_output, **qr_entities}
         
-        # Log extracted entities
-        if isinstance(layer4_output, dict):
-            extracted_count = sum(1 for v in layer4_output.values() if isinstance(v, dict) and v.get('value'))
-            logger.info(f"  ✓ LLM extraction: {extracted_count} entities")
-            # Log key entities at debug level
-            for key, val in layer4_output.items():
-                if isinstance(val, dict) and val.get('value'):
-                    conf = val.get('confidence') or 0.0
-                    value_preview = str(val.get('value', ''))[:40]
-                    logger.debug(f"    {key}={value_preview} (conf={conf:.2f})")
-        else:
-            logger.warning(f"  ⚠ Unexpected LLM output: {type(layer4_output)}")
+            # Log extracted entities
+            if isinstance(layer4_output, dict):
+                extracted_count = sum(1 for v in layer4_output.values() if isinstance(v, dict) and v.get('value'))
+                logger.info(f"  ✓ LLM extraction: {extracted_count} entities")
+                # Log key entities at debug level
+                for key, val in layer4_output.items():
+                    if isinstance(val, dict) and val.get('value'):
+                        conf = val.get('confidence') or 0.0
+                        value_preview = str(val.get('value', ''))[:40]
+                        logger.debug(f"    {key}={value_preview} (conf={conf:.2f})")
+            else:
+                logger.warning(f"  ⚠ Unexpected LLM output: {type(layer4_output)}")
             
-    except Exception as e:
-        logger.error(f"  ✗ Entity extraction failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"Entity extraction failed: {str(e)}")
+        except Exception as e:
+            logger.error(f"  ✗ Entity extraction failed: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Entity extraction failed: {str(e)}")
 
     # 5. Global Store Merge
     store = SESSIONS[session_id]["store"]
@@ -325,6 +469,47 @@ async def upload_document_to_session(
         "current_entities": store.get_session_view()
     }
 
+@app.post("/session/{session_id}/extract")
+async def extract_deferred_documents(session_id: str):
+    """
+    Extracts every document queued with defer=true in a single LLM call and
+    merges the results into the Session Entity Store in upload order.
+
+    The queue is merged as of this call, after documents that were uploaded
+    later without defer; the store keeps the first of two equally trusted,
+    equally confident values, so those later uploads win exact ties.
+    """
+    if session_id not in SESSIONS:
+        raise HTTPException(status_code=404, detail="Session not found")
+
+    session = SESSIONS[session_id]
+    pending = session.pop("pending_documents", [])
+    store = session["store"]
+    if not pending:
+        return {"message": "No deferred documents.", "current_entities": store.get_session_view()}
+
+    document_types = [d["document_type"] for d in pending]
+    logger.info(f"Batch extraction [{session_id[:8]}]: {', '.join(document_types)}")
+    try:
+        outputs = await extract_entities_batch_async(pending, form_type=session["form_type"])
+    except Exception as e:
+        session.setdefault("pending_documents", [])[:0] = pending  # keep them queued for a retry
+        logger.error(f"  ✗ Batch extraction failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Entity extraction failed: {str(e)}")
+
+    for document, layer4_output in zip(pending, outputs):
+        if document.get("entities"):
+            layer4_output = {**layer4_output, **document["entities"]}  # e.g. Aadhaar QR values
+        store.merge_entities(layer4_output, source_type=document["document_type"])
+
+    final_state = store.get_session_view()
+    filled_count = sum(1 for v in final_state.values() if v.get('value'))
+    logger.info(f"  ✓ Merge complete: {filled_count} total fields filled")
+    return {
+        "message": f"{', '.join(document_types)} processed and merged.",
+        "current_entities": final_state
+    }
+
 @app.post("/session/{session_id}/voice")
 async def process_voice_input(
     session_id: str,
@@ -381,7 +566,7 @@ async def process_voice_input(
     
     # 4. Extract Entities from Voice Transcript
     try:
-        voice_entities = extract_entities(voice_ocr_bundle, document_type="voice", form_type=None)
+        voice_entities = await extract_entities_async(voice_ocr_bundle, document_type="voice", form_type=None)
         
         if isinstance(voice_entities, dict):
             extracted_count = sum(1 for v in voice_entities.values() if isinstance(v, dict) and v.get('value'))
@@ -433,6 +618,10 @@ async def finalize_session(
             "created_at": datetime.now().isoformat()
         }
 
+    # Documents uploaded with defer=true and never flushed
+    if SESSIONS[session_id].get("pending_documents"):
+        await extract_deferred_documents(session_id)
+
     session = SESSIONS[session_id]
     store = session["store"]
     form_type = session["form_type"]
@@ -569,6 +758,37 @@ async def upload_and_process(
 
     return JSONResponse({"upload_id": upload_id, "mapped": mapped})
 
+@app.get("/ocr/cache/stats")
+def ocr_cache_stats():
+    """Hit/miss counters and occupancy of the OCR result cache."""
+    return get_ocr_cache_stats()
+
+@app.get("/llm/cache/stats")
+def llm_cache_stats():
+    """Hit/miss counters and occupancy of the LLM extraction cache."""
+    return get_llm_cache_stats()
+
+@app.get("/llm/prompt/stats")
+def llm_prompt_stats():
+    """Estimated prompt tokens before and after OCR payload compaction."""
+    return get_prompt_stats()
+
+
+@app.get("/llm/rules/stats")
+def llm_rules_stats():
+    """Documents per type whose fields the rule-based extractor filled, and LLM calls avoided."""
+    return get_rule_stats()
+
+@app.get("/ocr/cascade/stats")
+def ocr_cascade_stats():
+    """How often the OCR cascade skipped the digit agent."""
+    return get_cascade_stats()
+
+@app.get("/aadhaar/qr/stats")
+def aadhaar_qr_stats():
+    """How often Aadhaar uploads were served from the QR code."""
+    return get_qr_stats()
+
 @app.get("/forms/list/")
 def list_forms():
     out = []
@@ -622,5 +842,7 @@ def admin_publish_form(admin_id: str = Form(...), schema_patch: Optional[str] =
     out_path = Path("form_mapper/schemas") / f"{form_name}.json"
     with open(out_path, "w") as f:
         json.dump(final_schema, f, indent=2)
+    # Prompts are pruned to the fields each form uses
+    clear_prompt_cache()
 
     return {"status": "published", "schema_path": str(out_path)}
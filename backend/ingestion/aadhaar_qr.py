@@ -0,0 +1,272 @@
+import logging
+import os
+import re
+import threading
+import zlib
+import xml.etree.ElementTree as ET
+
+import cv2
+
+from ocr_agents.page import PageImage
+from utils.normalizer import normalize_date
+
+logger = logging.getLogger(__name__)
+
+# Decode the QR printed on Aadhaar cards before running OCR; on a hit the
+# entities come straight from the (UIDAI signed) payload and the LLM is skipped.
+QR_FAST_PATH = os.getenv("AADHAAR_QR_FAST_PATH", "true").lower() in ("1", "true", "yes")
+
+# Secure QR only carries the last 4 UID digits; read the full number from
+# the card with the digit agent (Tesseract only, no Paddle / LLM).
+QR_UID_FROM_OCR = os.getenv("AADHAAR_QR_UID_FROM_OCR", "true").lower() in ("1", "true", "yes")
+
+QR_CONFIDENCE = 0.99
+DERIVED_CONFIDENCE = 0.9  # values we infer from QR fields (e.g. father from "S/O")
+
+# Dense secure QRs decode best at full resolution; retry smaller for huge photos
+QR_RETRY_MAX_SIDE = 1600
+
+# Secure QR field order after the optional version marker ("V2", "V3", ...)
+SECURE_QR_FIELDS = [
+    "email_mobile_indicator", "reference_id", "name", "dob", "gender",
+    "care_of", "district", "landmark", "house", "location", "pincode",
+    "post_office", "state", "street", "sub_district", "vtc",
+]
+
+# Legacy (unsigned) XML QR attribute -> secure QR field name
+XML_FIELDS = {
+    "uid": "uid", "name": "name", "dob": "dob", "yob": "yob", "gender": "gender",
+    "co": "care_of", "dist": "district", "lm": "landmark", "house": "house",
+    "loc": "location", "pc": "pincode", "po": "post_office", "state": "state",
+    "street": "street", "subdist": "sub_district", "vtc": "vtc",
+}
+
+# Printed address order
+ADDRESS_PARTS = ["house", "street", "landmark", "location", "vtc", "post_office",
+                 "sub_district", "district", "state", "pincode"]
+
+GENDERS = {"M": "MALE", "F": "FEMALE", "T": "OTHER", "MALE": "MALE", "FEMALE": "FEMALE",
+           "TRANSGENDER": "OTHER", "OTHER": "OTHER"}
+
+_stats_lock = threading.Lock()
+QR_STATS = {"attempts": 0, "hits": 0, "secure": 0, "legacy": 0, "uid_from_ocr": 0, "partial": 0}
+
+# The fast path replaces OCR + LLM only when the QR gave all of these;
+# otherwise the missing ones are extracted from OCR and QR values merged on top.
+QR_REQUIRED_FIELDS = ("full_name", "date_of_birth", "gender", "address", "aadhaar_number")
+
+
+def detect_qr(image):
+    """Returns the raw QR payload string found on a page, or None."""
+    page = PageImage.coerce(image)
+    gray = page.gray
+    if gray is None:
+        return None
+
+    detector = cv2.QRCodeDetector()
+    candidates = [gray]
+    if max(gray.shape[:2]) > QR_RETRY_MAX_SIDE:
+        scale = QR_RETRY_MAX_SIDE / float(max(gray.shape[:2]))
+        candidates.append(cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA))
+
+    for candidate in candidates:
+        try:
+            data, points, _ = detector.detectAndDecode(candidate)
+        except cv2.error:
+            continue
+        if data:
+            return data
+    return None
+
+
+def _decode_text(raw: bytes) -> str:
+    try:
+        return raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return raw.decode("iso-8859-1")  # encoding mandated by the spec
+
+
+def decode_secure_qr(data: str):
+    """
+    Decodes a UIDAI secure QR: a base-10 big integer whose bytes are a
+    gzip stream of 0xFF separated fields followed by the photo and the
+    signature (both ignored here). Returns a field dict or None.
+    """
+    if not data or not data.isdigit():
+        return None
+    number = int(data)
+    raw = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    payload = None
+    for wbits in (16 + zlib.MAX_WBITS, zlib.MAX_WBITS):  # gzip, then bare zlib
+        try:
+            # decompressobj tolerates trailing bytes after the stream
+            payload = zlib.decompressobj(wbits).decompress(raw)
+            break
+        except zlib.error:
+            continue
+    if not payload:
+        return None
+
+    parts = payload.split(b"\xff")
+    version = None
+    if parts and re.fullmatch(rb"V\d+", parts[0]):
+        version = parts.pop(0).decode()
+    if len(parts) < len(SECURE_QR_FIELDS):
+        return None
+
+    fields = {name: _decode_text(parts[i]).strip() for i, name in enumerate(SECURE_QR_FIELDS)}
+    fields["format"] = "secure"
+    fields["version"] = version or "V1"
+    # Reference ID = last 4 digits of the Aadhaar number + timestamp
+    fields["uid_last4"] = fields["reference_id"][:4]
+    return fields
+
+
+def decode_xml_qr(data: str):
+    """Decodes the older XML QR (<PrintLetterBarcodeData uid=... />)."""
+    if not data or "<" not in data:
+        return None
+    try:
+        root = ET.fromstring(data[data.index("<?xml") if "<?xml" in data else data.index("<"):])
+    except (ET.ParseError, ValueError):
+        return None
+
+    fields = {}
+    for attr, name in XML_FIELDS.items():
+        if root.get(attr):
+            fields[name] = root.get(attr).strip()
+    if not fields.get("name"):
+        return None
+    fields["format"] = "legacy"
+    return fields
+
+
+def decode_aadhaar_qr(data: str):
+    return decode_secure_qr(data) or decode_xml_qr(data)
+
+
+def _entity(value, confidence=QR_CONFIDENCE):
+    return {"value": value, "confidence": confidence}
+
+
+def qr_to_entities(fields: dict) -> dict:
+    """Maps decoded QR fields to Layer 4 entities (aadhaar prompt keys)."""
+    entities = {}
+    if fields.get("name"):
+        entities["full_name"] = _entity(fields["name"])
+
+    if fields.get("dob"):
+        entities["date_of_birth"] = _entity(normalize_date(fields["dob"].replace(" ", "")))
+    elif fields.get("yob"):
+        entities["date_of_birth"] = _entity(fields["yob"])
+
+    gender = GENDERS.get((fields.get("gender") or "").upper())
+    if gender:
+        entities["gender"] = _entity(gender)
+
+    uid = re.sub(r"\D", "", fields.get("uid") or "")
+    if len(uid) == 12:
+        entities["aadhaar_number"] = _entity(uid)
+
+    care_of = fields.get("care_of")
+    if care_of:
+        entities["care_of"] = _entity(care_of)
+        match = re.match(r"^\s*[SD]\s*/\s*O\s*:?\s*(.+)$", care_of, re.IGNORECASE)
+        if match:
+            entities["fathers_name"] = _entity(match.group(1).strip(" ,"), DERIVED_CONFIDENCE)
+
+    address = []
+    for part in ADDRESS_PARTS:
+        value = (fields.get(part) or "").strip(" ,")
+        if value and value not in address:
+            address.append(value)
+    if address:
+        entities["address"] = _entity(", ".join(address))
+
+    if fields.get("district"):
+        entities["district"] = _entity(fields["district"])
+    if fields.get("sub_district"):
+        entities["tehsil"] = _entity(fields["sub_district"])
+    if fields.get("state"):
+        entities["state"] = _entity(fields["state"])
+    if re.fullmatch(r"\d{6}", fields.get("pincode") or ""):
+        entities["pincode"] = _entity(fields["pincode"])
+    return entities
+
+
+def find_uid_with_suffix(text: str, last4: str):
+    """A 12 digit number in OCR text ending in the QR's last 4 UID digits."""
+    if not text or not last4:
+        return None
+    for match in re.finditer(r"(?<!\d)(\d{4})\s?(\d{4})\s?(\d{4})(?!\d)", text):
+        uid = "".join(match.groups())
+        if uid.endswith(last4) and uid[0] not in "01":  # Aadhaar never starts with 0/1
+            return uid
+    return None
+
+
+def _uid_from_ocr(pages, last4):
+    from ocr_agents import get_agent
+
+    agent = get_agent("digit_ocr")
+    if agent is None:
+        return None
+    for page in pages:
+        res = agent.extract(page)
+        uid = find_uid_with_suffix(res.get("text"), last4)
+        if uid:
+            return uid
+    return None
+
+
+def extract_from_qr(pages):
+    """
+    Aadhaar fast path: decodes the first QR found on `pages` (paths or
+    arrays) and returns Layer 4 entities, or None to fall back to OCR + LLM.
+    """
+    pages = [PageImage.coerce(p) for p in pages]
+    fields = None
+    for page in pages:
+        data = detect_qr(page)
+        fields = decode_aadhaar_qr(data) if data else None
+        if fields:
+            break
+
+    with _stats_lock:
+        QR_STATS["attempts"] += 1
+        if fields:
+            QR_STATS["hits"] += 1
+            QR_STATS[fields["format"]] += 1
+    if not fields:
+        return None
+
+    entities = qr_to_entities(fields)
+    if "aadhaar_number" not in entities and fields.get("uid_last4") and QR_UID_FROM_OCR:
+        try:
+            uid = _uid_from_ocr(pages, fields["uid_last4"])
+        except Exception as e:
+            logger.warning(f"Aadhaar number OCR after QR decode failed: {e}")
+            uid = None
+        if uid:
+            entities["aadhaar_number"] = _entity(uid, DERIVED_CONFIDENCE)
+            with _stats_lock:
+                QR_STATS["uid_from_ocr"] += 1
+    if qr_missing_fields(entities):
+        with _stats_lock:
+            QR_STATS["partial"] += 1
+    return entities
+
+
+def qr_missing_fields(entities, fields=QR_REQUIRED_FIELDS) -> list:
+    """
+    Wanted `fields` (e.g. what the session's form uses) the QR entities
+    lack; an empty list means the fast path is complete.
+    """
+    return [field for field in fields if not (entities or {}).get(field, {}).get("value")]
+
+
+def get_qr_stats() -> dict:
+    with _stats_lock:
+        stats = dict(QR_STATS)
+    stats["hit_rate"] = round(stats["hits"] / stats["attempts"], 3) if stats["attempts"] else 0.0
+    return stats
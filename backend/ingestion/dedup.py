@@ -0,0 +1,85 @@
+import logging
+
+import cv2
+from fastapi import HTTPException
+
+from ocr_agents.page import PageImage
+
+logger = logging.getLogger(__name__)
+
+# Perceptual difference hash: 16x16 gradient signs = 256 bits, enough to
+# tell the front and back of the same card apart while still matching
+# re-shot or re-compressed photos of one side.
+HASH_SIZE = 16
+MAX_DUPLICATE_DISTANCE = 24  # Hamming bits (~10%)
+
+# Documents uploaded as a front/back pair (see validate_upload_constraints)
+FRONT_BACK_DOCUMENTS = ("aadhaar", "voter_id")
+
+
+def dhash(image, hash_size=HASH_SIZE) -> int:
+    """Difference hash of a page (path, array or PageImage) as an int."""
+    gray = PageImage.coerce(image).gray
+    if gray is None:
+        raise ValueError(f"Cannot hash unreadable page: {PageImage.coerce(image).name}")
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
+
+
+def find_duplicates(pages, max_distance=MAX_DUPLICATE_DISTANCE):
+    """
+    Pairs (original, duplicate, distance) of identical or near-identical
+    pages; each duplicate is matched against the earliest page it resembles.
+    Unreadable pages are never duplicates; the quality gate reports them.
+    """
+    hashes = []
+    for page in pages:
+        try:
+            hashes.append(dhash(page))
+        except ValueError:
+            hashes.append(None)
+    duplicates = []
+    for j in range(1, len(hashes)):
+        if hashes[j] is None:
+            continue
+        for i in range(j):
+            if hashes[i] is None:
+                continue
+            distance = hamming(hashes[i], hashes[j])
+            if distance <= max_distance:
+                duplicates.append((i, j, distance))
+                break
+    return duplicates
+
+
+def dedupe_pages(pages, document_type=None, labels=None):
+    """
+    Drops repeated pages before OCR. For front/back documents a repeat
+    means the same side was uploaded twice, which is rejected with a 400
+    so the user can upload the other side right away.
+    """
+    if len(pages) < 2:
+        return list(pages)
+
+    duplicates = find_duplicates(pages)
+    if not duplicates:
+        return list(pages)
+
+    if document_type in FRONT_BACK_DOCUMENTS:
+        i, j, _ = duplicates[0]
+        first = labels[i] if labels else f"Page {i + 1}"
+        second = labels[j] if labels else f"Page {j + 1}"
+        raise HTTPException(
+            status_code=400,
+            detail=f"{document_type.title()} upload: {first} and {second} show the same side. "
+                   f"Please upload one image of the front and one of the back."
+        )
+
+    dropped = {j for _, j, _ in duplicates}
+    logger.info(f"Dropped {len(dropped)} duplicate page(s): {sorted(dropped)}")
+    return [page for index, page in enumerate(pages) if index not in dropped]
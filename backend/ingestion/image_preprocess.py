@@ -1,4 +1,20 @@
+import os
+
 import cv2
+import numpy as np
+
+from ocr_agents.page import PageImage
+
+# Crop phone photos of ID cards to the card before OCR: the background is
+# most of the frame and every agent would otherwise process it.
+CARD_CROP = os.getenv("OCR_CARD_CROP", "true").lower() in ("1", "true", "yes")
+
+DETECT_MAX_SIDE = 1000        # contour search runs on a downscaled copy
+MIN_CARD_AREA_RATIO = 0.15    # smaller quads are logos, photos, QR codes...
+MAX_CARD_AREA_RATIO = 0.95    # card already fills the frame: nothing to crop
+# ID-1 cards are 85.6 x 54 mm (1.586); allow for perspective and lamination
+CARD_ASPECT_RANGE = (1.2, 2.1)
+
 
 def preprocess(image_path):
     img = cv2.imread(image_path)
@@ -7,9 +23,90 @@ def preprocess(image_path):
     return denoised
 
 
-# the below written code, is just for testing the preprocess function for its grayscale processing
+def order_points(pts):
+    """Top-left, top-right, bottom-right, bottom-left."""
+    pts = np.asarray(pts, dtype=np.float32).reshape(4, 2)
+    s = pts.sum(axis=1)
+    d = np.diff(pts, axis=1).ravel()  # y - x
+    return np.array([pts[np.argmin(s)], pts[np.argmin(d)], pts[np.argmax(s)], pts[np.argmax(d)]],
+                    dtype=np.float32)
+
+
+def _quad_size(quad):
+    tl, tr, br, bl = quad
+    width = max(np.linalg.norm(tr - tl), np.linalg.norm(br - bl))
+    height = max(np.linalg.norm(bl - tl), np.linalg.norm(br - tr))
+    return int(round(width)), int(round(height))
+
+
+def find_card_quad(bgr):
+    """
+    Corners of the ID card in a photo (full-resolution, ordered), or None
+    when no card-shaped quadrilateral stands out from the background.
+    """
+    h, w = bgr.shape[:2]
+    scale = min(1.0, DETECT_MAX_SIDE / float(max(h, w)))
+    small = cv2.resize(bgr, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else bgr
+    gray = small if small.ndim == 2 else cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+
+    edges = cv2.Canny(cv2.GaussianBlur(gray, (5, 5), 0), 50, 150)
+    # Close small gaps in the card border (glare, fingers on the edge)
+    edges = cv2.dilate(edges, np.ones((3, 3), np.uint8), iterations=2)
+    contours, _ = cv2.findContours(edges, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    frame_area = float(gray.shape[0] * gray.shape[1])
+    for contour in sorted(contours, key=cv2.contourArea, reverse=True)[:5]:
+        area_ratio = cv2.contourArea(contour) / frame_area
+        if area_ratio < MIN_CARD_AREA_RATIO:
+            break
+        if area_ratio > MAX_CARD_AREA_RATIO:
+            continue
+        approx = cv2.approxPolyDP(contour, 0.02 * cv2.arcLength(contour, True), True)
+        if len(approx) == 4 and cv2.isContourConvex(approx):
+            quad = order_points(approx)
+        else:
+            # Rounded corners / partial occlusion: use the rotated bounding box
+            quad = order_points(cv2.boxPoints(cv2.minAreaRect(contour)))
+
+        qw, qh = _quad_size(quad)
+        aspect = max(qw, qh) / float(max(1, min(qw, qh)))
+        if CARD_ASPECT_RANGE[0] <= aspect <= CARD_ASPECT_RANGE[1]:
+            return quad / scale
+    return None
+
+
+def warp_card(bgr, quad):
+    """Perspective-corrects (and so deskews) the card to a flat rectangle."""
+    width, height = _quad_size(quad)
+    target = np.float32([[0, 0], [width - 1, 0], [width - 1, height - 1], [0, height - 1]])
+    matrix = cv2.getPerspectiveTransform(np.asarray(quad, dtype=np.float32), target)
+    return cv2.warpPerspective(bgr, matrix, (width, height), flags=cv2.INTER_CUBIC,
+                               borderMode=cv2.BORDER_REPLICATE)
+
+
+def crop_card(image):
+    """
+    Returns a PageImage of just the card when one is found in the photo,
+    otherwise the input page unchanged (already decoded, so agents do not
+    read the file again).
+    """
+    page = PageImage.coerce(image)
+    bgr = page.bgr
+    if bgr is None:
+        return page
+    quad = find_card_quad(bgr)
+    if quad is None:
+        return page
+    return PageImage(image=warp_card(bgr, quad))
+
+
+if __name__ == "__main__":
+    # Manual check of the grayscale preprocessing and the card crop
+    processed_image = preprocess("./data/pages/page_1.png")
+    output_path = "./data/pages/page_1_processed.png"
+    cv2.imwrite(output_path, processed_image)
+    print(f"Saved processed image to {output_path}")
 
-processed_image = preprocess("./data/pages/page_1.png")
-output_path = "./data/pages/page_1_processed.png"
-cv2.imwrite(output_path, processed_image)
-print(f"Saved processed image to {output_path}")
+    card = crop_card("./data/pages/page_1.png")
+    cv2.imwrite("./data/pages/page_1_card.png", card.bgr)
+    print(f"Card crop: {card.bgr.shape[1]}x{card.bgr.shape[0]}")
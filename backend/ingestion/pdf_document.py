@@ -0,0 +1,76 @@
+import contextlib
+from pathlib import Path
+
+import fitz  # PyMuPDF
+
+
+def is_pdf_upload(upload_file) -> bool:
+    """True for uploads that claim to be PDFs (content type or extension)."""
+    return "pdf" in (upload_file.content_type or "") or \
+        (upload_file.filename or "").lower().endswith(".pdf")
+
+
+class PDFDocument:
+    """
+    An uploaded PDF parsed exactly once.
+
+    The upload is read into memory a single time; that buffer backs the
+    PyMuPDF document and is also what gets written to disk, so validation
+    (page count), persistence, text-layer extraction and page rendering all
+    share one parse instead of re-reading and re-opening the file.
+    """
+
+    def __init__(self, data: bytes, name: str = "document.pdf"):
+        self.name = name
+        self.path = None  # set once persisted with save()
+        self._data = data
+        self.doc = fitz.open(stream=data, filetype="pdf")
+
+    @classmethod
+    def from_upload(cls, upload_file):
+        data = upload_file.file.read()
+        upload_file.file.seek(0)
+        return cls(data, name=upload_file.filename or "document.pdf")
+
+    @property
+    def page_count(self) -> int:
+        return self.doc.page_count
+
+    @property
+    def needs_pass(self) -> bool:
+        return self.doc.needs_pass
+
+    def save(self, path):
+        """Writes the original upload bytes (no re-serialization)."""
+        with open(Path(path), "wb") as f:
+            f.write(self._data)
+        self.path = str(path)
+
+    def close(self):
+        if not self.doc.is_closed:
+            self.doc.close()
+        self._data = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@contextlib.contextmanager
+def open_pdf(source):
+    """
+    Yields a fitz.Document for a path, a PDFDocument or an open document.
+    Only documents opened here are closed on exit.
+    """
+    if isinstance(source, PDFDocument):
+        yield source.doc
+    elif isinstance(source, fitz.Document):
+        yield source
+    else:
+        doc = fitz.open(str(source))
+        try:
+            yield doc
+        finally:
+            doc.close()
@@ -2,6 +2,19 @@ import fitz  # PyMuPDF
 import os
 from pathlib import Path
 
+import cv2
+import numpy as np
+
+from ingestion.pdf_document import PDFDocument, open_pdf
+
+# Longest side the OCR backend works at (PaddleOCRAgent.max_side). Pages are
+# rendered straight to this size instead of 300 DPI + downscale.
+OCR_TARGET_SIDE = 2048
+MAX_DPI = 300
+
+# Write rendered pages to disk for inspection (off in production)
+DEBUG_ARTIFACTS = os.getenv("PIPELINE_DEBUG_ARTIFACTS", "false").lower() in ("1", "true", "yes")
+
 def pdf_to_images(pdf_path, output_dir=None):
     """
     Convert PDF to images.
@@ -34,6 +47,46 @@ def pdf_to_images(pdf_path, output_dir=None):
     doc.close()
     return image_paths
 
+def render_page(page, max_side=OCR_TARGET_SIDE):
+    """Renders one PyMuPDF page to a BGR NumPy array of at most `max_side`."""
+    rect = page.rect
+    zoom = min(max_side / max(rect.width, rect.height), MAX_DPI / 72.0)
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    arr = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    if pix.n == 1:
+        return cv2.cvtColor(arr, cv2.COLOR_GRAY2BGR)
+    return cv2.cvtColor(arr, cv2.COLOR_RGB2BGR)
+
+
+def pdf_to_arrays(pdf_source, max_side=OCR_TARGET_SIDE, debug_dir=None):
+    """
+    Render PDF pages directly to in-memory BGR arrays sized for OCR.
+    `pdf_source` may be a path or an already parsed PDFDocument.
+
+    No PNG is encoded or written unless debugging is enabled
+    (PIPELINE_DEBUG_ARTIFACTS or an explicit debug_dir).
+
+    Returns:
+        List of NumPy arrays, one per page
+    """
+    if debug_dir is None and DEBUG_ARTIFACTS:
+        # Next to the saved upload, like pdf_to_images
+        pdf_path = Path(pdf_source.path or pdf_source.name) if isinstance(pdf_source, PDFDocument) else Path(pdf_source)
+        debug_dir = pdf_path.parent / f"{pdf_path.stem}_pages"
+
+    pages = []
+    with open_pdf(pdf_source) as doc:
+        for page in doc:
+            pages.append(render_page(page, max_side))
+
+    if debug_dir is not None:
+        debug_dir = Path(debug_dir)
+        debug_dir.mkdir(exist_ok=True, parents=True)
+        for i, img in enumerate(pages):
+            cv2.imwrite(str(debug_dir / f"page_{i}.png"), img)
+
+    return pages
+
 if __name__ == "__main__":
     # Test with default path if run directly
     test_path = "C:/Users/abhis/Desktop/Abhishek/Govt. Issued Documents/pan card.pdf"
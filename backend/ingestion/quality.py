@@ -0,0 +1,108 @@
+import logging
+import os
+
+import cv2
+from fastapi import HTTPException
+
+from ocr_agents.page import PageImage
+
+logger = logging.getLogger(__name__)
+
+# Quality gate run before OCR: "reject" answers 422 for unusable pages,
+# "warn" only logs them, "off" disables the checks.
+QUALITY_GATE = os.getenv("IMAGE_QUALITY_GATE", "reject").lower()
+
+# Metrics are measured on a copy downscaled to this side so thresholds do
+# not depend on the camera resolution (and the checks take milliseconds).
+ASSESS_MAX_SIDE = 640
+
+MIN_SIDE_PX = 300          # shorter side of the (cropped) page
+MIN_SHARPNESS = 50.0       # variance of the Laplacian
+MIN_BRIGHTNESS = 40.0      # mean gray level
+MAX_BRIGHTNESS = 245.0     # white paper is ~230; above this the page is washed out
+MIN_CONTRAST = 15.0        # gray level standard deviation
+
+MESSAGES = {
+    "resolution": "image resolution is too low ({value}px on the short side). "
+                  "Move the camera closer so the document fills the frame, or upload a higher resolution scan.",
+    "blur": "image is too blurry (sharpness {value}). Hold the camera steady, tap to focus and retake the photo.",
+    "dark": "image is too dark (brightness {value}). Retake the photo in better light.",
+    "bright": "image is overexposed (brightness {value}). Turn off the flash, avoid direct light and retake the photo.",
+    "contrast": "image has almost no contrast (contrast {value}). Make sure the document is in focus and fully visible.",
+}
+
+
+def assess_image_quality(image) -> dict:
+    """
+    Cheap quality metrics for one page and the checks it fails.
+    Returns {"metrics": {...}, "issues": [check, ...]}.
+    """
+    page = PageImage.coerce(image)
+    gray = page.gray
+    if gray is None:
+        return {"metrics": {}, "issues": ["unreadable"]}
+
+    h, w = gray.shape[:2]
+    scale = min(1.0, ASSESS_MAX_SIDE / float(max(h, w)))
+    small = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+
+    mean, std = cv2.meanStdDev(small)
+    metrics = {
+        "width": w,
+        "height": h,
+        "sharpness": round(float(cv2.Laplacian(small, cv2.CV_64F).var()), 1),
+        "brightness": round(float(mean[0][0]), 1),
+        "contrast": round(float(std[0][0]), 1),
+    }
+
+    issues = []
+    if min(h, w) < MIN_SIDE_PX:
+        issues.append("resolution")
+    if metrics["brightness"] < MIN_BRIGHTNESS:
+        issues.append("dark")
+    elif metrics["brightness"] > MAX_BRIGHTNESS:
+        issues.append("bright")
+    if metrics["contrast"] < MIN_CONTRAST:
+        issues.append("contrast")
+    elif metrics["sharpness"] < MIN_SHARPNESS:
+        # A flat page has no edges either; only call it blur if there is contrast
+        issues.append("blur")
+    return {"metrics": metrics, "issues": issues}
+
+
+def _issue_message(issue, metrics):
+    if issue == "unreadable":
+        return "the image could not be decoded. Please upload a JPG, PNG or PDF file."
+    value = {
+        "resolution": min(metrics.get("width", 0), metrics.get("height", 0)),
+        "blur": metrics.get("sharpness"),
+        "dark": metrics.get("brightness"),
+        "bright": metrics.get("brightness"),
+        "contrast": metrics.get("contrast"),
+    }[issue]
+    return MESSAGES[issue].format(value=value)
+
+
+def check_page_quality(pages, labels=None, mode=None):
+    """
+    Runs the quality gate over the pages about to be OCR'd. Raises a 422
+    listing what to fix on each failing page (mode "reject"), or only logs
+    it (mode "warn"). `labels` name the pages in messages (e.g. file
+    names). Returns the per-page assessments.
+    """
+    mode = (mode or QUALITY_GATE).lower()
+    if mode == "off":
+        return []
+
+    reports = [assess_image_quality(page) for page in pages]
+    problems = []
+    for index, report in enumerate(reports):
+        for issue in report["issues"]:
+            label = labels[index] if labels else f"Page {index + 1}"
+            problems.append(f"{label}: {_issue_message(issue, report['metrics'])}")
+
+    if problems:
+        if mode == "reject":
+            raise HTTPException(status_code=422, detail=" ".join(problems))
+        logger.warning(f"Low quality upload: {' '.join(problems)}")
+    return reports
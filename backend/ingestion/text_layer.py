@@ -0,0 +1,70 @@
+import logging
+
+from ingestion.pdf_document import open_pdf
+
+logger = logging.getLogger(__name__)
+
+# A page needs at least this many letters/digits in its text layer to be
+# trusted; scanned PDFs usually have none (or a few stray characters).
+MIN_CHARS_PER_PAGE = 20
+
+
+def _page_output(page, page_index):
+    """Layer 3 style output for one page, built from its embedded words."""
+    # (x0, y0, x1, y1, word, block_no, line_no, word_no)
+    words = page.get_text("words", sort=True)
+
+    lines = {}
+    for x0, y0, x1, y1, word, block_no, line_no, _ in words:
+        lines.setdefault((block_no, line_no), []).append((x0, y0, x1, y1, word))
+
+    boxes = []
+    for line_words in lines.values():
+        boxes.append({
+            "text": " ".join(w[4] for w in line_words),
+            "confidence": 1.0,
+            # PDF points, top-left origin
+            "box": [
+                int(min(w[0] for w in line_words)),
+                int(min(w[1] for w in line_words)),
+                int(round(max(w[2] for w in line_words))),
+                int(round(max(w[3] for w in line_words))),
+            ],
+        })
+
+    return {
+        "agent": "pdf_text_layer",
+        "modality": "embedded_text",
+        "text": " ".join(b["text"] for b in boxes),
+        "confidence": 1.0,
+        "page": page_index,
+        "boxes": boxes,
+    }
+
+
+def extract_text_layer(pdf_source):
+    """
+    Reads the embedded text layer of a digital PDF (e.g. DigiLocker issued).
+    `pdf_source` may be a path or an already parsed PDFDocument.
+
+    Returns a Layer 3 bundle ({"ocr_outputs": [...]}) with one output per
+    page, or None when the PDF has no usable text layer (scanned, encrypted
+    or empty) and has to go through OCR instead.
+    """
+    try:
+        with open_pdf(pdf_source) as doc:
+            if doc.needs_pass or doc.page_count == 0:
+                return None
+
+            outputs = []
+            for i, page in enumerate(doc):
+                output = _page_output(page, i)
+                if sum(c.isalnum() for c in output["text"]) < MIN_CHARS_PER_PAGE:
+                    # One image-only page means the document is (partly) scanned
+                    return None
+                outputs.append(output)
+    except Exception as e:
+        logger.warning(f"Could not read PDF text layer: {e}")
+        return None
+
+    return {"ocr_outputs": outputs}
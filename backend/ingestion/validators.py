@@ -1,18 +1,25 @@
 from fastapi import UploadFile, HTTPException
-from typing import List
+from typing import List, Optional
 
-def validate_upload_constraints(files: List[UploadFile], document_type: str):
+from ingestion.pdf_document import PDFDocument
+
+def validate_upload_constraints(files: List[UploadFile], document_type: str) -> List[Optional[PDFDocument]]:
     """
     Terminates request if document-specific upload rules are violated.
     Rules:
       - Aadhaar: Must be 2 images (Front+Back) OR 1 PDF (Assume 2 pages).
       - PAN: Must be 1 file (Image or PDF).
       - Voter ID: Must be 2 images (Front+Back) OR 1 PDF.
+
+    Returns a list aligned with `files` holding the parsed PDFDocument for
+    every PDF that validation had to open (None otherwise), so callers can
+    reuse the parse instead of reading the upload again.
     """
     if not files:
         raise HTTPException(status_code=400, detail="No files uploaded.")
 
     num_files = len(files)
+    parsed = [None] * num_files
     
     # 1. PAN Card Logic
     if document_type == "pan":
@@ -35,17 +42,16 @@ def validate_upload_constraints(files: List[UploadFile], document_type: str):
                 )
             
             # --- PAGE COUNT VALIDATION ---
-            # We need to read the file likely. Since UploadFile is a stream, 
-            # we must be careful not to consume it fully if downstream needs it.
-            # But here validation is before saving. We can read and seek(0).
+            # The upload is read and parsed once here; the caller reuses the
+            # PDFDocument for saving, text-layer extraction and rendering.
             pdf_file = files[0]
             try:
-                from ingestion.pdf_validator import count_pdf_pages
-                content = pdf_file.file.read()
-                pdf_file.file.seek(0) # Reset cursor for saving later!
+                pdf = PDFDocument.from_upload(pdf_file)
+                parsed[0] = pdf
                 
-                page_count = count_pdf_pages(content)
+                page_count = pdf.page_count
                 if page_count < 2:
+                     pdf.close()  # rejected: nobody downstream will close it
                      raise HTTPException(
                         status_code=400,
                         detail=f"{document_type.title()} PDF must contain at least 2 pages (Front and Back). Found {page_count} page(s)."
@@ -67,3 +73,5 @@ def validate_upload_constraints(files: List[UploadFile], document_type: str):
     # Unknown type
     else:
         pass
+
+    return parsed
@@ -0,0 +1,57 @@
+import os
+import re
+
+from utils.cache import TieredCache, stable_hash
+
+# Memoizes extract_entities: the same OCR bundle (re-upload, same document in
+# another session) with the same prompt and model is not sent to the LLM again.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "true").lower() in ("1", "true", "yes")
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "256"))
+# Cached results are extracted personal data (names, DOB, Aadhaar/PAN
+# numbers) stored as plain JSON. The disk tier is therefore off unless
+# LLM_CACHE_DIR is set (e.g. data/cache/llm) on a disk that is access
+# controlled / encrypted at rest; by default results only live in memory.
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "")
+LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "64"))
+# Template edits change the key by themselves; the TTL ages out entries left
+# behind by old templates and results of a re-pulled model with the same tag,
+# and bounds how long personal data is retained (1 hour by default).
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", "1"))
+
+llm_cache = TieredCache(
+    "llm",
+    max_items=LLM_CACHE_SIZE,
+    disk_dir=LLM_CACHE_DIR or None,
+    max_disk_bytes=LLM_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=LLM_CACHE_TTL_HOURS * 3600 if LLM_CACHE_TTL_HOURS > 0 else None,
+)
+
+
+def normalize_bundle(prompt_bundle):
+    """
+    Canonical form of the OCR data for hashing (a bundle dict or the
+    serialized prompt payload): whitespace in texts is collapsed and
+    confidences are rounded, so OCR jitter that would not change the
+    extraction does not change the key either.
+    """
+    def normalize(value):
+        if isinstance(value, dict):
+            return {k: normalize(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [normalize(v) for v in value]
+        if isinstance(value, str):
+            return re.sub(r"\s+", " ", value).strip()
+        if isinstance(value, float):
+            return round(value, 2)
+        return value
+
+    return normalize(prompt_bundle)
+
+
+def llm_cache_key(prompt_template: str, prompt_bundle, model_name: str) -> str:
+    """Key = hash of the prompt template + normalized OCR data + model."""
+    return stable_hash(prompt_template, normalize_bundle(prompt_bundle), model_name)
+
+
+def get_llm_cache_stats() -> dict:
+    return llm_cache.stats()
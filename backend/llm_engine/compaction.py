@@ -0,0 +1,195 @@
+import json
+import logging
+import math
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Prompt compaction: the OCR bundle is most of the prompt, and on CPU the
+# prefill time grows with every token of it.
+PROMPT_COMPACTION = os.getenv("LLM_PROMPT_COMPACT", "true").lower() in ("1", "true", "yes")
+
+# Token budget for the OCR data part of the prompt, per document_type.
+# Two-sided ID cards carry more text than a PAN card.
+TOKEN_BUDGETS = {
+    "aadhaar": 700,
+    "voter_id": 600,
+    "pan": 400,
+}
+DEFAULT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "800"))
+# Never trimmed: any sentence of a voice transcript may carry a field, so
+# cutting its tail silently loses what the user said last.
+UNBUDGETED_DOCUMENT_TYPES = {"voice"}
+
+# Outputs that carry nothing the LLM extracts from
+DROP_MODALITIES = {"layout"}
+# Per-output fields worth sending; everything else is agent bookkeeping
+KEEP_FIELDS = ("agent", "page", "text", "confidence")
+# Dropped first when over budget (the digit agent only repeats numbers)
+LOW_PRIORITY_AGENTS = ("digit_agent",)
+
+NUMBER_GROUP = re.compile(r'(?<!\d)\d{4}(?:\s?\d{4}){2,3}(?!\d)')  # Aadhaar / VID
+DIGIT_RUN = re.compile(r'\d{2,}')
+TOKEN_PIECES = re.compile(r'[A-Za-z]+|\d|[^\sA-Za-z\d]')
+
+_stats_lock = threading.Lock()
+PROMPT_STATS = {"prompts": 0, "tokens_before": 0, "tokens_after": 0, "over_budget": 0}
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough BPE token count without loading a tokenizer: Qwen/Llama style
+    vocabularies split digits one per token, words into ~4 character
+    pieces, and most symbols / non-Latin characters into their own token.
+    """
+    count = 0
+    for piece in TOKEN_PIECES.findall(text or ""):
+        count += math.ceil(len(piece) / 4) if piece[0].isalpha() and piece.isascii() else 1
+    return count
+
+
+def _dedupe_number_groups(text, seen):
+    """Removes Aadhaar/VID number groups already present earlier in the bundle."""
+    def replace(match):
+        digits = re.sub(r"\s", "", match.group())
+        if digits in seen:
+            return ""
+        seen.add(digits)
+        return match.group()
+    return re.sub(r"\s{2,}", " ", NUMBER_GROUP.sub(replace, text)).strip()
+
+
+def _digit_runs(text):
+    """Digit runs with group and date separators removed ("27/09/2004" -> "27092004")."""
+    return DIGIT_RUN.findall(re.sub(r"(?<=\d)[ /.\-](?=\d)", "", text))
+
+
+def _dedupe_digit_runs(text, known_runs):
+    """Digit agent output: keep only numbers no other agent has read."""
+    kept = []
+    for run in DIGIT_RUN.findall(text):
+        if run in kept or any(run in known for known in known_runs):
+            continue
+        kept.append(run)
+    return " ".join(kept)
+
+
+def compact_outputs(ocr_bundle: dict) -> list:
+    """Informative, de-duplicated agent outputs in prompt order."""
+    outputs = [o for o in ocr_bundle.get("ocr_outputs", []) if isinstance(o, dict)]
+    outputs = [o for o in outputs
+               if "error" not in o and o.get("modality") not in DROP_MODALITIES and (o.get("text") or "").strip()]
+    multi_page = len({o.get("page") for o in outputs}) > 1
+
+    seen_groups = set()
+    compact = []
+    # Text agents first so their reading of a number wins over the digit agent's
+    for output in sorted(outputs, key=lambda o: o.get("agent") in LOW_PRIORITY_AGENTS):
+        text = re.sub(r"\s+", " ", output["text"]).strip()
+        if output.get("agent") in LOW_PRIORITY_AGENTS:
+            known = [run for c in compact for run in _digit_runs(c["text"])] + list(seen_groups)
+            text = _dedupe_digit_runs(text, known)
+        else:
+            text = _dedupe_number_groups(text, seen_groups)
+        if not text:
+            continue
+
+        item = {k: output[k] for k in KEEP_FIELDS if k in output and (k != "page" or multi_page)}
+        item["text"] = text
+        if isinstance(item.get("confidence"), float):
+            item["confidence"] = round(item["confidence"], 2)
+        compact.append(item)
+    return compact
+
+
+def _serialize(outputs):
+    return json.dumps({"ocr_outputs": outputs}, ensure_ascii=False, separators=(",", ":"))
+
+
+def _fit_budget(outputs, budget):
+    """
+    Drops low-priority outputs, then trims the longest texts, until within
+    budget. Once the longest text is down to one word, whole outputs are
+    dropped from the end, and a last remaining output is cut by characters.
+    Returns (outputs, number of outputs dropped, characters cut).
+    """
+    outputs = [dict(o) for o in outputs]
+    dropped = cut_chars = 0
+    while outputs and estimate_tokens(_serialize(outputs)) > budget:
+        excess = estimate_tokens(_serialize(outputs)) - budget
+        low = [i for i, o in enumerate(outputs) if o.get("agent") in LOW_PRIORITY_AGENTS]
+        if low and len(outputs) > 1:
+            outputs.pop(low[-1])
+            dropped += 1
+            continue
+        longest = max(outputs, key=lambda o: len(o["text"]))
+        words = longest["text"].split(" ")
+        if len(words) > 1:
+            # Cut proportionally to the overshoot, at least one word
+            cut = max(1, min(len(words) - 1, math.ceil(len(words) * excess / max(1, estimate_tokens(longest["text"])))))
+            cut_chars += len(longest["text"])
+            longest["text"] = " ".join(words[:-cut])
+            cut_chars -= len(longest["text"])
+        elif len(outputs) > 1:
+            outputs.pop()
+            dropped += 1
+        else:
+            # A single unbroken text (e.g. a long digit run): cut characters
+            text = longest["text"]
+            keep = len(text) - max(1, math.ceil(len(text) * excess / max(1, estimate_tokens(text))))
+            if keep <= 0:
+                outputs.pop()
+                dropped += 1
+            else:
+                longest["text"] = text[:keep]
+                cut_chars += len(text) - keep
+    return outputs, dropped, cut_chars
+
+
+def compact_bundle(ocr_bundle: dict, document_type: str | None = None, budget: int | None = None):
+    """
+    Compact prompt payload for the OCR bundle (as filtered for the prompt).
+
+    Returns (payload_json, report) where report holds the estimated tokens
+    of the bundle pretty-printed as before and of the compact payload, plus
+    the budget that was applied. Over budget, digit agent output is dropped
+    first, then the longest texts are cut from the end. Document types in
+    UNBUDGETED_DOCUMENT_TYPES are compacted but never cut (budget None).
+    """
+    if budget is None and document_type not in UNBUDGETED_DOCUMENT_TYPES:
+        budget = TOKEN_BUDGETS.get(document_type, DEFAULT_TOKEN_BUDGET)
+    tokens_before = estimate_tokens(json.dumps(ocr_bundle, indent=2))
+
+    outputs = compact_outputs(ocr_bundle)
+    over_budget = budget is not None and estimate_tokens(_serialize(outputs)) > budget
+    if over_budget:
+        outputs, dropped, cut_chars = _fit_budget(outputs, budget)
+        logger.warning(f"Prompt OCR data over budget for {document_type}: dropped {dropped} output(s) and "
+                       f"cut {cut_chars} character(s) to fit {budget} tokens")
+    payload = _serialize(outputs)
+
+    report = {
+        "tokens_before": tokens_before,
+        "tokens_after": estimate_tokens(payload),
+        "budget": budget,
+        "trimmed": over_budget,
+    }
+    with _stats_lock:
+        PROMPT_STATS["prompts"] += 1
+        PROMPT_STATS["tokens_before"] += report["tokens_before"]
+        PROMPT_STATS["tokens_after"] += report["tokens_after"]
+        PROMPT_STATS["over_budget"] += int(over_budget)
+    logger.info(f"Prompt OCR data: ~{report['tokens_before']} -> ~{report['tokens_after']} tokens "
+                f"(budget {budget or 'none'}{', trimmed' if over_budget else ''})")
+    return payload, report
+
+
+def get_prompt_stats() -> dict:
+    with _stats_lock:
+        stats = dict(PROMPT_STATS)
+    stats["saved_ratio"] = (
+        round(1 - stats["tokens_after"] / stats["tokens_before"], 3) if stats["tokens_before"] else 0.0
+    )
+    return stats
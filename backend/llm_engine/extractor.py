@@ -1,3 +1,4 @@
+import asyncio
 import json
 import subprocess
 import re
@@ -7,41 +8,139 @@ import os
 # Add parent directory to path to allow importing from llm_engine when running as script
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-from llm_engine.prompt_registry import get_prompt
+from llm_engine.prompt_registry import (
+    batch_output_schema, get_batch_prompt, get_prompt, output_schema, prompt_fields,
+)
+from llm_engine.ollama_client import get_ollama_client
+from llm_engine.cache import LLM_CACHE_ENABLED, llm_cache, llm_cache_key
+from llm_engine.compaction import PROMPT_COMPACTION, compact_bundle
+from llm_engine.rules import DOCUMENT_RULES, RULES_ENABLED, prefill_entities, record_document
+from llm_engine.streaming import EntityStreamParser
 
+# "http": Ollama HTTP API over a pooled keep-alive connection (model stays
+# loaded). "cli": spawn `ollama run` per document (previous behaviour).
+LLM_BACKEND = os.getenv("LLM_BACKEND", "http").lower()
+# Stream the HTTP reply, parse it as it arrives and stop the generation once
+# every requested field is complete (skips trailing commentary).
+LLM_STREAM = os.getenv("LLM_STREAM", "true").lower() in ("1", "true", "yes")
+# Constrain generation to the prompt's output format (Ollama structured
+# outputs), so the reply always parses and no tokens go to commentary.
+LLM_SCHEMA = os.getenv("LLM_SCHEMA", "true").lower() in ("1", "true", "yes")
 
-def extract_entities(
-    ocr_bundle: dict,
-    document_type: str = "aadhaar",
-    form_type: str | None = None,
-    model_name: str = "qwen2:7b-instruct",
-    timeout: int = 30
-) -> dict:
-    """
-    Extract structured entities from OCR bundle using a local LLM.
+# Agent output fields that are only meant for other agents (e.g. Paddle
+# detection boxes used for digit re-reads) and carry nothing for the LLM.
+NON_PROMPT_FIELDS = {"boxes"}
+# Bundle-level bookkeeping (e.g. the OCR cascade report)
+NON_PROMPT_KEYS = {"skipped_agents"}
 
-    Parameters:
-    - ocr_bundle: output of Layer 3 (OCR agents)
-    - document_type: aadhaar / pan / voter_id etc.
-    - form_type: income_certificate / domicile_certificate etc.
-    - model_name: local ollama model
-    - timeout: max seconds to wait for LLM
 
-    Returns:
-    - Parsed JSON dictionary (Layer 4 output)
+def _prompt_view(ocr_bundle: dict) -> dict:
+    """Copy of the OCR bundle without agent-internal fields."""
+    outputs = ocr_bundle.get("ocr_outputs")
+    if not isinstance(outputs, list):
+        return ocr_bundle
+    return {
+        **{k: v for k, v in ocr_bundle.items() if k not in NON_PROMPT_KEYS},
+        "ocr_outputs": [
+            {k: v for k, v in o.items() if k not in NON_PROMPT_FIELDS} if isinstance(o, dict) else o
+            for o in outputs
+        ],
+    }
+
+
+def _response_format(document_type, form_type, fields):
+    """Ollama `format`: the prompt's JSON schema, plain JSON mode without one, or None when off."""
+    if not LLM_SCHEMA:
+        return None
+    return output_schema(get_prompt(document_type, form_type, fields=fields)) or "json"
+
+
+def _rule_prefill(ocr_bundle, document_type, form_type, only_fields=None):
+    """
+    Entities the deterministic rules fill confidently, and the fields still
+    left for the LLM: None means the full prompt, [] means no LLM call.
+    `only_fields` limits the extraction to those fields (e.g. what the
+    Aadhaar QR did not provide).
     """
+    wanted = prompt_fields(get_prompt(document_type, form_type))
+    if only_fields is not None:
+        wanted = [field for field in wanted if field in only_fields]
+    if not RULES_ENABLED or document_type not in DOCUMENT_RULES:
+        return {}, (wanted if only_fields is not None else None)
+    filled, missing = prefill_entities(ocr_bundle, document_type, wanted)
+    record_document(document_type, filled, missing)
+    return filled, (missing if filled or only_fields is not None else None)
+
+
+def _merge(llm_entities, rule_entities):
+    """Rule values win: they are pattern/checksum verified."""
+    if not rule_entities or not isinstance(llm_entities, dict):
+        return llm_entities
+    return {**llm_entities, **rule_entities}
+
 
-    # 1️⃣ Select appropriate prompt
-    prompt_template = get_prompt(document_type, form_type)
+def _ocr_payload(ocr_bundle, document_type):
+    prompt_bundle = _prompt_view(ocr_bundle)
+    if PROMPT_COMPACTION:
+        return compact_bundle(prompt_bundle, document_type)[0]
+    return json.dumps(prompt_bundle, indent=2)
 
-    prompt = prompt_template.format(
-        ocr_data=json.dumps(ocr_bundle, indent=2)
-    )
 
-    # 2️⃣ Call local LLM
+def _prepare(ocr_bundle, document_type, form_type, model_name, use_cache, fields=None):
+    """Prompt, cache key (None when caching is off) and cached result if any."""
+    prompt_template = get_prompt(document_type, form_type, fields=fields)
+    ocr_data = _ocr_payload(ocr_bundle, document_type)
+    prompt = prompt_template.format(ocr_data=ocr_data)
+
+    if use_cache is None:
+        use_cache = LLM_CACHE_ENABLED
+    if not use_cache:
+        return prompt, None, None
+    key = llm_cache_key(prompt_template, ocr_data, model_name)
+    return prompt, key, llm_cache.get(key)
+
+
+def _remember(entities, cache_key):
+    if cache_key is not None and isinstance(entities, dict):
+        llm_cache.set(cache_key, entities)
+    return entities
+
+
+def _finish(raw_output, cache_key):
+    return _remember(parse_llm_output(raw_output), cache_key)
+
+
+def _expected_fields(document_type, form_type, fields):
+    """Keys the reply must contain before streaming can stop early."""
+    return fields if fields is not None else prompt_fields(get_prompt(document_type, form_type))
+
+
+def _streamed_result(parser):
+    # An unfinished or malformed stream gets the same recovery as a full reply
+    return parser.entities if parser.complete else parse_llm_output(parser.buffer)
+
+
+def _generate_streaming(prompt, model_name, timeout, expected, response_format=None):
+    """Streams the reply over HTTP, stopping once every expected field is parsed."""
+    parser = EntityStreamParser(expected)
+    chunks = get_ollama_client().stream(prompt, model_name, timeout=timeout, format=response_format)
+    try:
+        for chunk in chunks:
+            parser.feed(chunk)
+            if parser.complete:
+                break
+    finally:
+        chunks.close()
+    return _streamed_result(parser)
+
+
+def _run_cli(prompt: str, model_name: str, timeout: int, json_mode: bool = False) -> str:
+    """Legacy backend: one `ollama run` process per document."""
+    # The CLI has no schema option, only JSON mode
+    command = ["ollama", "run", "--format", "json", model_name] if json_mode else ["ollama", "run", model_name]
     try:
         result = subprocess.run(
-            ["ollama", "run", model_name],
+            command,
             input=prompt,
             text=True,
             capture_output=True,
@@ -51,10 +150,13 @@ def extract_entities(
         )
     except subprocess.TimeoutExpired:
         raise RuntimeError("LLM execution timed out")
+    return result.stdout
 
-    raw_output = result.stdout.strip()
 
-    # 3️⃣ Enforce STRICT JSON
+def parse_llm_output(raw_output: str) -> dict:
+    """Parses the model's reply as JSON, repairing common LLM mistakes."""
+    raw_output = raw_output.strip()
+
     # Strip JavaScript/C-style inline comments that LLMs sometimes add
     raw_output = re.sub(r"//.*?$", "", raw_output, flags=re.MULTILINE)
     raw_output = re.sub(r"/\*.*?\*/", "", raw_output, flags=re.DOTALL)
@@ -84,6 +186,225 @@ def extract_entities(
         )
 
 
+def extract_entities(
+    ocr_bundle: dict,
+    document_type: str = "aadhaar",
+    form_type: str | None = None,
+    model_name: str = "qwen2:7b-instruct",
+    timeout: int = 30,
+    backend: str | None = None,
+    use_cache: bool | None = None,
+    stream: bool | None = None,
+    only_fields: list | None = None
+) -> dict:
+    """
+    Extract structured entities from OCR bundle using a local LLM.
+
+    Parameters:
+    - ocr_bundle: output of Layer 3 (OCR agents)
+    - document_type: aadhaar / pan / voter_id etc.
+    - form_type: income_certificate / domicile_certificate etc.
+    - model_name: local ollama model
+    - timeout: max seconds to wait for LLM
+    - backend: "http" (pooled Ollama API client) or "cli" (`ollama run`);
+      defaults to LLM_BACKEND
+    - use_cache: serve identical bundles from the LLM result cache;
+      defaults to LLM_CACHE
+    - stream: parse the HTTP reply incrementally and stop generating once
+      all fields are in; defaults to LLM_STREAM
+    - only_fields: extract just these fields of the prompt's output format
+
+    Fields the rule-based extractor (llm_engine.rules) fills confidently are
+    not asked of the LLM; when it fills all of them the LLM is not called.
+
+    Returns:
+    - Parsed JSON dictionary (Layer 4 output)
+    """
+
+    # 0️⃣ Deterministic rules first
+    rule_entities, fields = _rule_prefill(ocr_bundle, document_type, form_type, only_fields)
+    if fields == []:
+        return rule_entities
+
+    # 1️⃣ Select appropriate prompt (and check the result cache)
+    prompt, cache_key, cached = _prepare(ocr_bundle, document_type, form_type, model_name, use_cache, fields)
+    if cached is not None:
+        return _merge(cached, rule_entities)
+
+    # 2️⃣ Call local LLM (constrained to the output schema)
+    response_format = _response_format(document_type, form_type, fields)
+    if (backend or LLM_BACKEND) == "cli":
+        raw_output = _run_cli(prompt, model_name, timeout, json_mode=response_format is not None)
+    elif LLM_STREAM if stream is None else stream:
+        entities = _generate_streaming(prompt, model_name, timeout,
+                                       _expected_fields(document_type, form_type, fields), response_format)
+        return _merge(_remember(entities, cache_key), rule_entities)
+    else:
+        raw_output = get_ollama_client().generate(prompt, model_name, timeout=timeout, format=response_format)
+
+    # 3️⃣ Enforce STRICT JSON
+    return _merge(_finish(raw_output, cache_key), rule_entities)
+
+
+async def extract_entities_async(
+    ocr_bundle: dict,
+    document_type: str = "aadhaar",
+    form_type: str | None = None,
+    model_name: str = "qwen2:7b-instruct",
+    timeout: int = 30,
+    backend: str | None = None,
+    use_cache: bool | None = None,
+    stream: bool | None = None,
+    only_fields: list | None = None
+) -> dict:
+    """extract_entities for async callers: awaits the LLM without blocking the event loop."""
+    if (backend or LLM_BACKEND) != "cli" and (LLM_STREAM if stream is None else stream):
+        return {field: entity async for field, entity in stream_entities(
+            ocr_bundle, document_type, form_type, model_name, timeout, backend=backend,
+            use_cache=use_cache, only_fields=only_fields)}
+
+    rule_entities, fields = _rule_prefill(ocr_bundle, document_type, form_type, only_fields)
+    if fields == []:
+        return rule_entities
+
+    prompt, cache_key, cached = _prepare(ocr_bundle, document_type, form_type, model_name, use_cache, fields)
+    if cached is not None:
+        return _merge(cached, rule_entities)
+
+    response_format = _response_format(document_type, form_type, fields)
+    if (backend or LLM_BACKEND) == "cli":
+        raw_output = await asyncio.to_thread(_run_cli, prompt, model_name, timeout, response_format is not None)
+    else:
+        raw_output = await get_ollama_client().agenerate(prompt, model_name, timeout=timeout,
+                                                          format=response_format)
+
+    return _merge(_finish(raw_output, cache_key), rule_entities)
+
+
+async def stream_entities(
+    ocr_bundle: dict,
+    document_type: str = "aadhaar",
+    form_type: str | None = None,
+    model_name: str = "qwen2:7b-instruct",
+    timeout: int = 30,
+    backend: str | None = None,
+    use_cache: bool | None = None,
+    only_fields: list | None = None
+):
+    """
+    Async iterator of (field, entity) pairs, each yielded as soon as it is
+    known: rule-filled fields first, then the LLM's fields as the model
+    completes them. Generation stops once every requested field is in.
+    """
+    rule_entities, fields = _rule_prefill(ocr_bundle, document_type, form_type, only_fields)
+    for item in rule_entities.items():
+        yield item
+    if fields == []:
+        return
+
+    prompt, cache_key, cached = _prepare(ocr_bundle, document_type, form_type, model_name, use_cache, fields)
+    response_format = _response_format(document_type, form_type, fields)
+    if cached is None and (backend or LLM_BACKEND) == "cli":
+        raw_output = await asyncio.to_thread(_run_cli, prompt, model_name, timeout, response_format is not None)
+        cached = _finish(raw_output, cache_key)
+    if cached is not None:
+        for field, entity in (cached.items() if isinstance(cached, dict) else ()):
+            if field not in rule_entities:
+                yield field, entity
+        return
+
+    parser = EntityStreamParser(_expected_fields(document_type, form_type, fields))
+    chunks = get_ollama_client().astream(prompt, model_name, timeout=timeout, format=response_format)
+    try:
+        async for chunk in chunks:
+            for field, entity in parser.feed(chunk):
+                if field not in rule_entities:
+                    yield field, entity
+            if parser.complete:
+                break
+    finally:
+        await chunks.aclose()
+
+    entities = _remember(_streamed_result(parser), cache_key)
+    # Fields only the full-text recovery found
+    for field, entity in (entities.items() if isinstance(entities, dict) else ()):
+        if field not in parser.entities and field not in rule_entities:
+            yield field, entity
+
+
+async def extract_entities_batch_async(
+    documents: list,
+    form_type: str | None = None,
+    model_name: str = "qwen2:7b-instruct",
+    timeout: int = 30,
+    backend: str | None = None,
+    use_cache: bool | None = None,
+    stream: bool | None = None
+) -> list:
+    """
+    Layer 4 output for several documents from a single LLM call.
+
+    `documents` is a list of {"document_type": ..., "ocr_bundle": ...}
+    (e.g. the Aadhaar and PAN of one application), optionally with
+    "only_fields" as in extract_entities; the result is one
+    entities dict per document, in the same order. Documents are tagged
+    "doc<N>_<document_type>" in one combined prompt, so the instructions
+    and model prefill are paid once. Rule-filled fields are left out as
+    in extract_entities, and documents the rules complete are not sent.
+    `timeout` is per document sent to the model.
+    """
+    results = [None] * len(documents)
+    pending = []
+    for i, document in enumerate(documents):
+        document_type = document["document_type"]
+        rule_entities, fields = _rule_prefill(document["ocr_bundle"], document_type, form_type,
+                                              document.get("only_fields"))
+        if fields == []:
+            results[i] = rule_entities
+            continue
+        key = f"doc{i + 1}_{document_type}"
+        pending.append((i, key, rule_entities, get_prompt(document_type, form_type, fields=fields)))
+    if not pending:
+        return results
+
+    sections = [(key, template) for _, key, _, template in pending]
+    batch_template = get_batch_prompt(sections)
+    payloads = [_ocr_payload(documents[i]["ocr_bundle"], documents[i]["document_type"]) for i, _, _, _ in pending]
+    ocr_data = "{" + ",".join(f'"{key}":{payload}' for (_, key, _, _), payload in zip(pending, payloads)) + "}"
+    prompt = batch_template.format(ocr_data=ocr_data)
+    timeout = timeout * len(pending)
+
+    if use_cache is None:
+        use_cache = LLM_CACHE_ENABLED
+    cache_key = llm_cache_key(batch_template, ocr_data, model_name) if use_cache else None
+    reply = llm_cache.get(cache_key) if cache_key else None
+
+    if reply is None:
+        response_format = batch_output_schema(sections) if LLM_SCHEMA else None
+        if (backend or LLM_BACKEND) == "cli":
+            raw_output = await asyncio.to_thread(_run_cli, prompt, model_name, timeout, response_format is not None)
+            reply = parse_llm_output(raw_output)
+        elif LLM_STREAM if stream is None else stream:
+            parser = EntityStreamParser([key for _, key, _, _ in pending])
+            chunks = get_ollama_client().astream(prompt, model_name, timeout=timeout, format=response_format)
+            try:
+                async for chunk in chunks:
+                    parser.feed(chunk)
+                    if parser.complete:
+                        break
+            finally:
+                await chunks.aclose()
+            reply = _streamed_result(parser)
+        else:
+            reply = parse_llm_output(await get_ollama_client().agenerate(
+                prompt, model_name, timeout=timeout, format=response_format))
+        _remember(reply, cache_key)
+
+    for i, key, rule_entities, _ in pending:
+        entities = reply.get(key) if isinstance(reply, dict) else None
+        results[i] = _merge(entities if isinstance(entities, dict) else {}, rule_entities)
+    return results
+
 
 if __name__ == "__main__":
     # testing (success)
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import os
+import threading
+import time
+
+import httpx
+
+# Ollama HTTP API. One pooled client per process keeps TCP connections open
+# between requests, and `keep_alive` keeps the model loaded in Ollama, so a
+# document costs one POST instead of a CLI process + model attach.
+OLLAMA_HOST = os.getenv("OLLAMA_HOST", "http://localhost:11434")
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "4"))
+
+
+class OllamaClient:
+    """
+    Minimal client for Ollama's /api/generate with sync and async entry
+    points. The underlying httpx clients are created on first use and
+    reused for every call (connection pooling with HTTP keep-alive).
+    """
+
+    def __init__(self, host=OLLAMA_HOST, keep_alive=OLLAMA_KEEP_ALIVE,
+                 max_connections=OLLAMA_MAX_CONNECTIONS):
+        if not host.startswith(("http://", "https://")):
+            host = f"http://{host}"  # OLLAMA_HOST is often given as host:port
+        self.host = host.rstrip("/")
+        self.keep_alive = keep_alive
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=300,
+        )
+        self._client = None
+        self._async_client = None
+        self._async_loop = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self) -> httpx.Client:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = httpx.Client(base_url=self.host, limits=self.limits, timeout=None)
+        return self._client
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        # An AsyncClient's connections belong to the event loop that opened
+        # them. The API has one loop, so this is created once; a new loop
+        # (e.g. asyncio.run in scripts) gets a fresh client.
+        loop = asyncio.get_running_loop()
+        if self._async_client is None or self._async_loop is not loop:
+            self._async_client = httpx.AsyncClient(base_url=self.host, limits=self.limits, timeout=None)
+            self._async_loop = loop
+        return self._async_client
+
+    def _payload(self, prompt, model, options=None, **extra):
+        payload = {"model": model, "prompt": prompt, "stream": False, "keep_alive": self.keep_alive}
+        if options:
+            payload["options"] = options
+        payload.update({k: v for k, v in extra.items() if v is not None})  # e.g. format=None
+        return payload
+
+    @staticmethod
+    def _response_text(response: httpx.Response) -> str:
+        if response.status_code != 200:
+            raise RuntimeError(f"Ollama request failed ({response.status_code}): {response.text[:200]}")
+        return response.json().get("response", "")
+
+    def generate(self, prompt: str, model: str, timeout: float = 30, options=None, **extra) -> str:
+        """Blocking completion; returns the generated text."""
+        try:
+            response = self.client.post("/api/generate", json=self._payload(prompt, model, options, **extra),
+                                        timeout=timeout)
+        except httpx.TimeoutException:
+            raise RuntimeError("LLM execution timed out")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Ollama is not reachable at {self.host}: {e}")
+        return self._response_text(response)
+
+    async def agenerate(self, prompt: str, model: str, timeout: float = 30, options=None, **extra) -> str:
+        """Async completion for use inside the API event loop."""
+        try:
+            response = await self.async_client.post("/api/generate",
+                                                    json=self._payload(prompt, model, options, **extra),
+                                                    timeout=timeout)
+        except httpx.TimeoutException:
+            raise RuntimeError("LLM execution timed out")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Ollama is not reachable at {self.host}: {e}")
+        return self._response_text(response)
+
+    @staticmethod
+    def _stream_chunk(line: str, deadline: float):
+        """Text of one NDJSON stream line (None when there is none)."""
+        if time.monotonic() > deadline:
+            raise RuntimeError("LLM execution timed out")
+        if not line:
+            return None
+        chunk = json.loads(line)
+        if chunk.get("error"):
+            raise RuntimeError(f"Ollama error: {chunk['error']}")
+        return chunk.get("response") or None
+
+    def stream(self, prompt: str, model: str, timeout: float = 30, options=None, **extra):
+        """
+        Yields the generated text chunk by chunk (`stream: true`). Closing
+        the generator early closes the connection, which makes Ollama stop
+        generating.
+        """
+        payload = self._payload(prompt, model, options, **{**extra, "stream": True})
+        deadline = time.monotonic() + timeout
+        try:
+            with self.client.stream("POST", "/api/generate", json=payload, timeout=timeout) as response:
+                if response.status_code != 200:
+                    response.read()
+                    self._response_text(response)
+                for line in response.iter_lines():
+                    text = self._stream_chunk(line, deadline)
+                    if text:
+                        yield text
+        except httpx.TimeoutException:
+            raise RuntimeError("LLM execution timed out")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Ollama is not reachable at {self.host}: {e}")
+
+    async def astream(self, prompt: str, model: str, timeout: float = 30, options=None, **extra):
+        """Async version of stream(); close it with `aclose()` to stop early."""
+        payload = self._payload(prompt, model, options, **{**extra, "stream": True})
+        deadline = time.monotonic() + timeout
+        try:
+            async with self.async_client.stream("POST", "/api/generate", json=payload, timeout=timeout) as response:
+                if response.status_code != 200:
+                    await response.aread()
+                    self._response_text(response)
+                async for line in response.aiter_lines():
+                    text = self._stream_chunk(line, deadline)
+                    if text:
+                        yield text
+        except httpx.TimeoutException:
+            raise RuntimeError("LLM execution timed out")
+        except httpx.HTTPError as e:
+            raise RuntimeError(f"Ollama is not reachable at {self.host}: {e}")
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    async def aclose(self):
+        if self._async_client is not None and self._async_loop is asyncio.get_running_loop():
+            await self._async_client.aclose()
+        self._async_client = None
+        self._async_loop = None
+        self.close()
+
+
+_default_client = None
+
+
+def get_ollama_client() -> OllamaClient:
+    """Process-wide client (shares the connection pool across requests)."""
+    global _default_client
+    if _default_client is None:
+        _default_client = OllamaClient()
+    return _default_client
+
+
+async def close_ollama_client():
+    global _default_client
+    if _default_client is not None:
+        await _default_client.aclose()
+        _default_client = None
@@ -1,4 +1,11 @@
 # llm_engine/prompt_registry.py
+import json
+import logging
+import os
+import re
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
 
 DEFAULT_PROMPT = """
 You are an AI system for extracting structured information from Indian government documents.
@@ -143,6 +150,25 @@ Input Data:
 """
 }
 
+# Several documents of one applicant in a single call; the output format and
+# rules of each document are filled in by get_batch_prompt.
+BATCH_PROMPT = """
+You are an expert OCR extractor for Indian government documents.
+The input holds OCR data of several documents of the same applicant, each under its own key.
+Extract each document's entities from that document's OCR data only.
+Do not return Python code. Output raw JSON only.
+
+STRICT OUTPUT FORMAT (JSON ONLY):
+{{{{
+{output_format}
+}}}}
+
+{rules}
+
+Input Data:
+{{ocr_data}}
+"""
+
 FORM_AWARE_PROMPTS = {
     ("aadhaar", "income_certificate"): """
 Extract specific entities from Aadhaar OCR data for an Income Certificate application.
@@ -171,11 +197,180 @@ Input Data:
 """
 }
 
-def get_prompt(document_type: str, form_type: str | None = None) -> str:
+# Form-aware pruning: with a form_type, the output format only lists the
+# entities that form's schema consumes (fewer fields -> fewer output tokens).
+FORM_PRUNING = os.getenv("LLM_FORM_PRUNING", "true").lower() in ("1", "true", "yes")
+FORM_SCHEMA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "form_mapper", "schemas")
+
+# One entity line of a STRICT OUTPUT FORMAT block
+FIELD_LINE = re.compile(r'^\s*"(\w+)":\s*\{\{"value"')
+FIELD_HINT = re.compile(r'^\s*"(\w+)":\s*\{\{"value":\s*"?([^",]*)"?')
+
+# Value hints of the output formats -> string patterns
+HINT_PATTERNS = {
+    r"(\d+)_digits?_string": r"^\d{{{0}}}$",
+    r"(\d+)_chars_string": r"^[A-Z0-9]{{{0}}}$",
+    r"YYYY-MM-DD": r"^\d{{4}}(-\d{{2}}-\d{{2}})?$",  # year only when that is all the card shows
+}
+
+
+def prompt_fields(template: str) -> list:
+    """Entity keys listed in a template's output format, in order."""
+    return [m.group(1) for m in map(FIELD_LINE.match, template.splitlines()) if m]
+
+
+def _value_schema(hint: str) -> dict:
+    """JSON schema of an entity value from its output-format hint (always nullable)."""
+    hint = re.sub(r"(_or_null|/null)$", "", hint.strip())
+    if hint == "number":
+        return {"type": ["number", "null"]}
+    for hint_regex, pattern in HINT_PATTERNS.items():
+        match = re.fullmatch(hint_regex, hint)
+        if match:
+            return {"type": ["string", "null"], "pattern": pattern.format(*match.groups())}
+    options = hint.split("/")
+    if len(options) > 1 and all(o.isupper() for o in options):
+        return {"enum": options + [None]}  # e.g. MALE/FEMALE/OTHER
+    return {"type": ["string", "null"]}
+
+
+@lru_cache(maxsize=128)
+def output_schema(template: str) -> dict | None:
+    """
+    JSON schema of a template's STRICT OUTPUT FORMAT block, for the
+    model's structured-output mode (Ollama `format`). Every listed entity
+    is required, in prompt order, as {"value", "confidence"}. None when
+    the template has no output format block.
+    """
+    properties = {}
+    for match in map(FIELD_HINT.match, template.splitlines()):
+        if match:
+            properties[match.group(1)] = {
+                "type": "object",
+                "properties": {
+                    "value": _value_schema(match.group(2)),
+                    "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+                },
+                "required": ["value", "confidence"],
+            }
+    if not properties:
+        return None
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def _restrict_fields(template: str, fields) -> str:
+    """Template with only `fields` left in its output format block."""
+    lines = [line for line in template.splitlines()
+             if not FIELD_LINE.match(line) or FIELD_LINE.match(line).group(1) in fields]
+    # The last remaining entity line must not end with a comma
+    field_lines = [i for i, line in enumerate(lines) if FIELD_LINE.match(line)]
+    if field_lines:
+        last = field_lines[-1]
+        lines[last] = lines[last].rstrip().rstrip(",")
+        for i in field_lines[:-1]:
+            if not lines[i].rstrip().endswith(","):
+                lines[i] = lines[i].rstrip() + ","
+    return "\n".join(lines) + ("\n" if template.endswith("\n") else "")
+
+
+def _collect_source_entities(node, found):
+    if isinstance(node, dict):
+        if node.get("source_entity"):
+            found.add(node["source_entity"])
+        for value in node.values():
+            _collect_source_entities(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _collect_source_entities(value, found)
+
+
+def form_source_entities(form_type: str) -> set | None:
+    """Entity keys a form schema maps from (`source_entity`); None if the form is unknown."""
+    schema_path = os.path.join(FORM_SCHEMA_DIR, f"{form_type}.json")
+    try:
+        with open(schema_path, "r") as f:
+            schema = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not load form schema {form_type}: {e}")
+        return None
+    found = set()
+    _collect_source_entities(schema.get("fields", {}), found)
+    return found
+
+
+@lru_cache(maxsize=256)
+def _compile_prompt(document_type: str, form_type: str | None, fields: tuple | None) -> str:
     if form_type and (document_type, form_type) in FORM_AWARE_PROMPTS:
-        return FORM_AWARE_PROMPTS[(document_type, form_type)]
+        template = FORM_AWARE_PROMPTS[(document_type, form_type)]
+    elif document_type in DOCUMENT_PROMPTS:
+        template = DOCUMENT_PROMPTS[document_type]
+    else:
+        template = DEFAULT_PROMPT
+
+    if form_type and FORM_PRUNING and prompt_fields(template):
+        consumed = form_source_entities(form_type)
+        # A document sharing no field with the form keeps its full template
+        if consumed and consumed & set(prompt_fields(template)):
+            template = _restrict_fields(template, consumed)
+
+    if fields is not None and prompt_fields(template):
+        template = _restrict_fields(template, set(fields))
+    return template
+
+
+RULES_BLOCK = re.compile(r"(?is)^(?:RULES|Rules):\s*\n(.*?)\n\s*Input Data:", re.MULTILINE)
+
+
+def get_batch_prompt(sections) -> str:
+    """
+    One template for several documents. `sections` is a list of
+    (key, template) pairs, e.g. ("doc1_aadhaar", get_prompt("aadhaar", form)).
+    Each document's output format is nested under its key; rules shared by
+    several documents are written once. Like the single-document
+    templates, the result takes `ocr_data` through str.format.
+    """
+    output_format, rules = [], {}
+    for n, (key, template) in enumerate(sections):
+        lines = [line for line in template.splitlines() if FIELD_LINE.match(line)]
+        lines = [("    " + line.strip()).rstrip(",") + ("," if i < len(lines) - 1 else "")
+                 for i, line in enumerate(lines)]
+        closing = "  }}," if n < len(sections) - 1 else "  }}"
+        output_format.extend([f'  "{key}": {{{{', *lines, closing])
+
+        match = RULES_BLOCK.search(template)
+        if match:
+            rules.setdefault(match.group(1).strip(), []).append(key)
+
+    rules_text = "\n\n".join(f"RULES for {', '.join(keys)}:\n{text}" for text, keys in rules.items())
+    return BATCH_PROMPT.format(output_format="\n".join(output_format), rules=rules_text)
+
+
+def batch_output_schema(sections) -> dict:
+    """JSON schema of a batch reply: each key holds its template's output_schema."""
+    properties = {key: output_schema(template) or {"type": "object"} for key, template in sections}
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def get_prompt(document_type: str, form_type: str | None = None, fields=None) -> str:
+    """
+    Prompt template for a document (and form). With a form_type, the
+    output format is pruned to the entities that form's schema uses; with
+    `fields`, it only asks for those entities (e.g. what the rule-based
+    extractor could not fill). Compiled templates are cached.
+    """
+    return _compile_prompt(document_type, form_type, tuple(fields) if fields is not None else None)
 
-    if document_type in DOCUMENT_PROMPTS:
-        return DOCUMENT_PROMPTS[document_type]
 
-    return DEFAULT_PROMPT
+def clear_prompt_cache():
+    """Drops compiled templates, e.g. after a form schema is (re)published."""
+    _compile_prompt.cache_clear()
@@ -0,0 +1,234 @@
+import os
+import re
+import threading
+
+from utils.normalizer import normalize_date
+from utils.validators import EPIC_REGEX, PAN_REGEX, is_valid_aadhaar, verhoeff_valid
+
+# Deterministic extraction on the Layer 3 bundle, run before the LLM. Only
+# entities at or above this confidence count as filled; the LLM is asked
+# for the rest (and skipped entirely when nothing is left).
+RULES_ENABLED = os.getenv("LLM_RULES", "true").lower() in ("1", "true", "yes")
+RULE_MIN_CONFIDENCE = float(os.getenv("LLM_RULES_MIN_CONFIDENCE", "0.9"))
+
+# Calibrated by the strength of the evidence behind a value
+CHECKSUM_CONFIDENCE = 0.98   # pattern + check digit (Aadhaar / VID Verhoeff)
+STRUCTURED_CONFIDENCE = 0.97  # pattern with an internal structure check (PAN holder type)
+LABELLED_CONFIDENCE = 0.95   # value found right after its printed label
+SINGLE_CANDIDATE_CONFIDENCE = 0.9  # only candidate of its kind on the card
+WEAK_CONFIDENCE = 0.8        # plausible but unverified; left to the LLM by default
+
+AADHAAR_PATTERN = re.compile(r'(?<!\d)(?<!\d )(\d{4}) ?(\d{4}) ?(\d{4})(?! ?\d)')
+VID_PATTERN = re.compile(r'VID\s*:?\s*(\d{4} ?\d{4} ?\d{4} ?\d{4})(?!\d)')
+DATE_PATTERN = re.compile(r'(?<!\d)(\d{1,2})\s?[/\-.]\s?(\d{1,2})\s?[/\-.]\s?(\d{4})(?!\d)')
+DOB_LABEL = re.compile(r'(?i)(?:\bDOB\b|D\.O\.B|date\s+of\s+birth|जन्म\s*तिथि|जन्म)\s*[:/]?\s*')
+YOB_PATTERN = re.compile(r'(?i)(?:year\s+of\s+birth|\bYOB\b|जन्म\s*वर्ष)\s*[:/]?\s*((?:19|20)\d{2})\b')
+GENDER_PATTERN = re.compile(r'(?i)\b(MALE|FEMALE|TRANSGENDER)\b|(पुरुष|महिला)')
+PINCODE_PATTERN = re.compile(r'(?<!\d)([1-9]\d{5})(?!\d)')
+PAN_HOLDER_TYPES = "PCHFATBLJG"  # 4th character of a PAN
+NAME_LINE = re.compile(r"^[A-Z][A-Z .']+$")
+INLINE_NAME = re.compile(r"(?i)^(?:elector'?s\s+)?name\s*:\s*([A-Za-z .']{3,})$")
+INLINE_FATHER = re.compile(r"(?i)^(?:father'?s|husband'?s)\s+name\s*:\s*([A-Za-z .']{3,})$")
+
+
+def _unanchored(regex):
+    """A full-value validator regex (^...$) turned into a word-bounded search pattern."""
+    return re.compile(rf"\b({regex.lstrip('^').rstrip('$')})\b")
+
+
+GENDERS = {"MALE": "MALE", "FEMALE": "FEMALE", "TRANSGENDER": "OTHER", "पुरुष": "MALE", "महिला": "FEMALE"}
+
+# Same formats utils.validators checks, searched for inside OCR text. Aadhaar
+# numbers are printed in 4-digit groups, so AADHAAR_PATTERN allows the
+# spaces and is_valid_aadhaar (AADHAAR_REGEX + Verhoeff) checks candidates.
+PAN_PATTERN = _unanchored(PAN_REGEX)
+EPIC_PATTERN = _unanchored(EPIC_REGEX)
+
+_stats_lock = threading.Lock()
+RULE_STATS = {}
+
+
+def _entity(value, confidence):
+    return {"value": value, "confidence": confidence}
+
+
+def _bundle_lines(ocr_bundle):
+    """(text, lines) over the informative outputs; lines come from boxes when present."""
+    texts, lines = [], []
+    for output in ocr_bundle.get("ocr_outputs", []):
+        if not isinstance(output, dict) or "error" in output or not output.get("text"):
+            continue
+        texts.append(output["text"])
+        boxes = output.get("boxes")
+        if boxes:
+            lines.extend(b.get("text", "").strip() for b in boxes)
+        else:
+            lines.append(output["text"].strip())
+    return " ".join(texts), [line for line in lines if line]
+
+
+def _date(match):
+    day, month, year = match.groups()
+    value = normalize_date(f"{int(day):02d}/{int(month):02d}/{year}")
+    return value if re.match(r"^\d{4}-\d{2}-\d{2}$", value) else None
+
+
+def _labelled_dob(text):
+    for label in DOB_LABEL.finditer(text):
+        match = DATE_PATTERN.match(text, label.end())
+        if match and _date(match):
+            return _date(match)
+    return None
+
+
+def _unique(values):
+    values = {v for v in values if v}
+    return values.pop() if len(values) == 1 else None
+
+
+def _date_of_birth(text, allow_unlabelled=False):
+    dob = _labelled_dob(text)
+    if dob:
+        return _entity(dob, LABELLED_CONFIDENCE)
+    yob = YOB_PATTERN.search(text)
+    if yob:
+        return _entity(yob.group(1), SINGLE_CANDIDATE_CONFIDENCE)
+    if allow_unlabelled:
+        dob = _unique(_date(m) for m in DATE_PATTERN.finditer(text))
+        if dob:
+            return _entity(dob, SINGLE_CANDIDATE_CONFIDENCE)
+    return None
+
+
+def _gender(text):
+    gender = _unique(GENDERS[m.group(1).upper() if m.group(1) else m.group(2)]
+                     for m in GENDER_PATTERN.finditer(text))
+    return _entity(gender, LABELLED_CONFIDENCE) if gender else None
+
+
+def _labelled_names(lines):
+    """
+    full_name / fathers_name from 'Name' label lines (next line or inline).
+    Nothing verifies a name, so these stay below RULE_MIN_CONFIDENCE: they
+    are hints, and the LLM still extracts names.
+    """
+    entities = {}
+    for i, line in enumerate(lines):
+        inline_father = INLINE_FATHER.match(line)
+        inline_name = INLINE_NAME.match(line)
+        if inline_father:
+            entities.setdefault("fathers_name", _entity(inline_father.group(1).strip(), WEAK_CONFIDENCE))
+            continue
+        if inline_name:
+            entities.setdefault("full_name", _entity(inline_name.group(1).strip(), WEAK_CONFIDENCE))
+            continue
+
+        next_line = lines[i + 1] if i + 1 < len(lines) else ""
+        if not (re.search(r"(?i)\bname\s*$", line) and NAME_LINE.match(next_line) and " " in next_line.strip()):
+            continue
+        key = "fathers_name" if re.search(r"(?i)father", line) else "full_name"
+        entities.setdefault(key, _entity(next_line.strip(), WEAK_CONFIDENCE))
+    return entities
+
+
+def aadhaar_rules(text, lines):
+    entities = {}
+    numbers = {"".join(m.groups()) for m in AADHAAR_PATTERN.finditer(text)}
+    valid = {n for n in numbers if is_valid_aadhaar(n)}
+    if len(valid) == 1:
+        entities["aadhaar_number"] = _entity(valid.pop(), CHECKSUM_CONFIDENCE)
+
+    vid = _unique(re.sub(r"\s", "", m.group(1)) for m in VID_PATTERN.finditer(text))
+    if vid:
+        entities["vid_number"] = _entity(vid, CHECKSUM_CONFIDENCE if verhoeff_valid(vid) else WEAK_CONFIDENCE)
+
+    dob = _date_of_birth(text)
+    if dob:
+        entities["date_of_birth"] = dob
+    gender = _gender(text)
+    if gender:
+        entities["gender"] = gender
+
+    address = re.split(r"(?i)\baddress\b|पता", text, maxsplit=1)
+    if len(address) == 2:
+        pincode = _unique(PINCODE_PATTERN.findall(address[1]))
+        if pincode:
+            entities["pincode"] = _entity(pincode, SINGLE_CANDIDATE_CONFIDENCE)
+    return entities
+
+
+def pan_rules(text, lines):
+    entities = {}
+    candidates = set(PAN_PATTERN.findall(text))
+    structured = {p for p in candidates if p[3] in PAN_HOLDER_TYPES}
+    if len(structured) == 1:
+        entities["pan_number"] = _entity(structured.pop(), STRUCTURED_CONFIDENCE)
+    elif len(candidates) == 1:
+        entities["pan_number"] = _entity(candidates.pop(), WEAK_CONFIDENCE)
+
+    # A PAN card prints a single date: the date of birth
+    dob = _date_of_birth(text, allow_unlabelled=True)
+    if dob:
+        entities["date_of_birth"] = dob
+    entities.update(_labelled_names(lines))
+    return entities
+
+
+def voter_id_rules(text, lines):
+    entities = {}
+    epic = _unique(EPIC_PATTERN.findall(text))
+    if epic:
+        entities["epic_number"] = _entity(epic, LABELLED_CONFIDENCE)
+    dob = _date_of_birth(text)
+    if dob:
+        entities["date_of_birth"] = dob
+    gender = _gender(text)
+    if gender:
+        entities["gender"] = gender
+    entities.update(_labelled_names(lines))
+    return entities
+
+
+DOCUMENT_RULES = {
+    "aadhaar": aadhaar_rules,
+    "pan": pan_rules,
+    "voter_id": voter_id_rules,
+}
+
+
+def apply_rules(ocr_bundle: dict, document_type: str) -> dict:
+    """All entities the rules find for this document (any confidence)."""
+    rules = DOCUMENT_RULES.get(document_type)
+    if rules is None:
+        return {}
+    text, lines = _bundle_lines(ocr_bundle)
+    return rules(text, lines)
+
+
+def prefill_entities(ocr_bundle: dict, document_type: str, fields, min_confidence=None):
+    """
+    Splits the wanted `fields` into those the rules fill confidently and
+    those still needing the LLM. Returns (filled_entities, missing_fields).
+    """
+    if min_confidence is None:
+        min_confidence = RULE_MIN_CONFIDENCE
+    found = apply_rules(ocr_bundle, document_type)
+    filled = {k: found[k] for k in fields if k in found and found[k]["confidence"] >= min_confidence}
+    missing = [k for k in fields if k not in filled]
+    return filled, missing
+
+
+def record_document(document_type, filled, missing):
+    with _stats_lock:
+        stats = RULE_STATS.setdefault(document_type, {
+            "documents": 0, "llm_calls_avoided": 0, "fields_from_rules": 0, "fields_to_llm": 0,
+        })
+        stats["documents"] += 1
+        stats["llm_calls_avoided"] += int(not missing)
+        stats["fields_from_rules"] += len(filled)
+        stats["fields_to_llm"] += len(missing)
+
+
+def get_rule_stats() -> dict:
+    with _stats_lock:
+        return {doc: dict(stats) for doc, stats in RULE_STATS.items()}
@@ -0,0 +1,108 @@
+import json
+import re
+
+TRAILING_COMMA = re.compile(r",\s*([}\]])")
+_UNPARSED = object()  # a value json.loads rejected (unlike a JSON null)
+
+
+class EntityStreamParser:
+    """
+    Incremental parser for the model's JSON reply.
+
+    feed() takes text chunks as the model generates them and returns the
+    top-level (key, value) pairs completed by that chunk, so an entity is
+    available as soon as its closing brace arrives. Text before the opening
+    brace and after the closing one (model commentary) is ignored, as are
+    // and /* */ comments. `complete` turns true once the object has closed
+    or every expected key has been produced; the caller can then stop the
+    generation.
+    """
+
+    def __init__(self, expected_keys=None):
+        self.expected = set(expected_keys or ())
+        self.entities = {}
+        self.buffer = ""
+        self.closed = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._key = None
+        self._value_start = None
+
+    @property
+    def complete(self) -> bool:
+        return self.closed or bool(self.expected and self.expected <= self.entities.keys())
+
+    def _emit(self, end, emitted):
+        raw = TRAILING_COMMA.sub(r"\1", self.buffer[self._value_start:end].strip())
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            value = _UNPARSED  # left to the full-text recovery
+        if value is not _UNPARSED and self._key is not None:
+            self.entities[self._key] = value
+            emitted.append((self._key, value))
+        self._key = None
+        self._value_start = None
+
+    def _skip_comment(self):
+        """Drops a comment at the cursor: "removed", "none", or "wait" (not complete yet)."""
+        marker = self.buffer[self._pos + 1:self._pos + 2]
+        if not marker:
+            return "wait"
+        if marker not in "/*":
+            return "none"
+        closing = "\n" if marker == "/" else "*/"
+        end = self.buffer.find(closing, self._pos + 2)
+        if end == -1:
+            return "wait"
+        end += 0 if marker == "/" else 2
+        self.buffer = self.buffer[:self._pos] + self.buffer[end:]
+        return "removed"
+
+    def feed(self, chunk: str) -> list:
+        self.buffer += chunk
+        emitted = []
+        while self._pos < len(self.buffer) and not self.closed:
+            ch = self.buffer[self._pos]
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+            elif self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._value_start is None:
+                        self._key = json.loads(self.buffer[self._string_start:self._pos + 1])
+            elif ch == "/":
+                status = self._skip_comment()
+                if status == "wait":
+                    break
+                if status == "removed":
+                    continue  # re-read the same position
+            elif ch == '"':
+                self._in_string = True
+                self._string_start = self._pos
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    self._emit(self._pos + 1, emitted)  # object / array value closed
+                elif self._depth == 0:
+                    if self._value_start is not None:
+                        self._emit(self._pos, emitted)  # last value was a scalar
+                    self.closed = True
+            elif self._depth == 1:
+                if ch == ":" and self._key is not None and self._value_start is None:
+                    self._value_start = self._pos + 1
+                elif ch == "," and self._value_start is not None:
+                    self._emit(self._pos, emitted)
+            self._pos += 1
+        return emitted
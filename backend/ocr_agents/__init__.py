@@ -1,78 +1,267 @@
 from .paddle_agent import PaddleOCRAgent
 from .tesseract_agent import DigitOCRAgent
 from .layout_agent import LayoutAgent
+from .page import PageImage
+from .registry import get_agent, mark_ready, warmup, readiness
+from .cache import ocr_cache, ocr_cache_key, is_cacheable, OCR_CACHE_ENABLED
+from .cascade import missing_numeric_fields, record_page
+from concurrent.futures import ThreadPoolExecutor, wait
 import logging
+import os
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Initialize agents with error handling
-try:
-    paddle_agent = PaddleOCRAgent()
-    logger.info("PaddleOCRAgent initialized successfully.")
-except Exception as e:
-    logger.error(f"Failed to initialize PaddleOCRAgent: {e}")
-    paddle_agent = None
-
-try:
-    tesseract_agent = DigitOCRAgent()
-    logger.info("DigitOCRAgent (Tesseract) initialized successfully.")
-except Exception as e:
-    logger.error(f"Failed to initialize DigitOCRAgent: {e}")
-    tesseract_agent = None
-
-try:
-    layout_agent = LayoutAgent()
-    logger.info("LayoutAgent initialized successfully.")
-except Exception as e:
-    logger.error(f"Failed to initialize LayoutAgent: {e}")
-    layout_agent = None
-
-def run_ocr(image_path):
+# Agent fan-out settings. Tesseract runs out of process and the layout agent
+# is pure NumPy, so running them alongside Paddle costs little extra CPU.
+CONCURRENT_AGENTS = os.getenv("OCR_CONCURRENT_AGENTS", "false").lower() in ("1", "true", "yes")
+AGENT_TIMEOUT = float(os.getenv("OCR_AGENT_TIMEOUT", "30"))
+
+# "page": Tesseract reads the whole page. "regions": it only re-reads the
+# Paddle detection boxes that look like number lines (IDs, dates).
+DIGIT_MODE = os.getenv("OCR_DIGIT_MODE", "page")
+
+# "all": every agent on every page. "cascade": Paddle first, digit agent
+# only when the document type's numeric fields are missing/low-confidence.
+OCR_POLICY = os.getenv("OCR_POLICY", "all")
+
+_agent_pool = None
+
+
+def _get_agent_pool():
+    global _agent_pool
+    if _agent_pool is None:
+        _agent_pool = ThreadPoolExecutor(max_workers=6, thread_name_prefix="ocr-agent")
+    return _agent_pool
+
+
+def _run_paddle(page):
+    paddle_agent = get_agent("paddle_ocr")
+    if not paddle_agent:
+        return {"agent": "paddle_ocr", "error": "Agent not initialized"}
+    try:
+        paddle_res = paddle_agent.extract(page)
+        # Add validation or fail-safe if extract returns None or error dict
+        if paddle_res and "error" not in paddle_res:
+            mark_ready("paddle_ocr")
+            return paddle_res
+        logger.warning(f"PaddleOCR failed for {page.name}: {paddle_res}")
+        return {"agent": "paddle_ocr", "error": "Extraction failed"}
+    except Exception as e:
+        logger.error(f"Error running PaddleOCR: {e}")
+        return {"agent": "paddle_ocr", "error": str(e)}
+
+
+def _run_tesseract(page, regions=None):
+    # Run Tesseract (focused on digits)
+    tesseract_agent = get_agent("digit_ocr")
+    if not tesseract_agent:
+        return None
+    try:
+        result = tesseract_agent.extract(page, regions=regions) or None
+        if result and "error" not in result:
+            mark_ready("digit_ocr")
+        return result
+    except Exception as e:
+        logger.error(f"Error running Tesseract: {e}")
+        return {"agent": "digit_ocr", "error": str(e)}
+
+
+def _run_layout(page):
+    layout_agent = get_agent("layout_agent")
+    if not layout_agent:
+        return None
+    try:
+        result = layout_agent.extract(page) or None
+        if result and "error" not in result:
+            mark_ready("layout_agent")
+        return result
+    except Exception as e:
+        logger.error(f"Error running LayoutAgent: {e}")
+        return {"agent": "layout_agent", "error": str(e)}
+
+
+def _paddle_regions(paddle_res):
+    """Detection boxes from a Paddle output, or None if it has none."""
+    if not paddle_res or "error" in paddle_res:
+        return None
+    return paddle_res.get("boxes") or None
+
+
+def _run_tesseract_on_regions(page, paddle_future):
+    # Runs inside the agent pool; waits for Paddle's boxes first
+    return _run_tesseract(page, regions=_paddle_regions(paddle_future.result()))
+
+
+def agent_config(digit_mode=DIGIT_MODE, policy=OCR_POLICY, document_type=None):
+    """Settings that change agent output; part of the OCR cache key."""
+    return {
+        "paddle": {**PaddleOCRAgent.params, **PaddleOCRAgent.backend, "max_side": PaddleOCRAgent.max_side},
+        "digit": DigitOCRAgent.config,
+        "digit_mode": digit_mode,
+        "layout": LayoutAgent.__name__,
+        "policy": policy,
+        # Only the cascade output depends on the document type
+        "document_type": document_type if policy == "cascade" else None,
+    }
+
+
+# Output order matches the serial pipeline: paddle, digits, layout
+AGENT_RUNNERS = [
+    ("paddle_ocr", _run_paddle),
+    ("digit_ocr", _run_tesseract),
+    ("layout_agent", _run_layout),
+]
+
+
+def _run_agents_serially(page, digit_regions=False, names=None, upstream=None):
+    results = {}
+    for name, runner in AGENT_RUNNERS:
+        if names is not None and name not in names:
+            continue
+        if name == "digit_ocr" and digit_regions:
+            paddle_res = results.get("paddle_ocr") or (upstream or {}).get("paddle_ocr")
+            results[name] = _run_tesseract(page, regions=_paddle_regions(paddle_res))
+        else:
+            results[name] = runner(page)
+    return results
+
+
+def _run_agents_concurrently(page, timeout, digit_regions=False, names=None, upstream=None):
     """
-    Runs all available OCR agents on the given image path.
-    Aggregates results into a single dictionary.
+    Fans the agents out on a thread pool. Each agent gets `timeout` seconds
+    from the moment the fan-out starts; an agent that is still running after
+    that is reported as an error entry and the other results are kept.
+    In region mode the digit agent starts as soon as Paddle's boxes are in,
+    or reads the boxes of an `upstream` Paddle result right away.
     """
-    outputs = []
+    pool = _get_agent_pool()
+    futures = []
+    for name, runner in AGENT_RUNNERS:
+        if names is not None and name not in names:
+            continue
+        paddle_future = dict(futures).get("paddle_ocr")
+        if name == "digit_ocr" and digit_regions and paddle_future is not None:
+            futures.append((name, pool.submit(_run_tesseract_on_regions, page, paddle_future)))
+        elif name == "digit_ocr" and digit_regions and upstream:
+            regions = _paddle_regions(upstream.get("paddle_ocr"))
+            futures.append((name, pool.submit(_run_tesseract, page, regions)))
+        else:
+            futures.append((name, pool.submit(runner, page)))
+    wait([f for _, f in futures], timeout=timeout)
 
-    # Run PaddleOCR
-    if paddle_agent:
+    results = {}
+    for name, future in futures:
+        if not future.done():
+            # The worker thread cannot be interrupted; its result is dropped.
+            logger.warning(f"{name} timed out after {timeout}s for {page.name}")
+            future.cancel()
+            results[name] = {"agent": name, "error": f"Timed out after {timeout}s"}
+            continue
         try:
-            paddle_res = paddle_agent.extract(image_path)
-            # Add validation or fail-safe if extract returns None or error dict
-            if paddle_res and "error" not in paddle_res:
-                outputs.append(paddle_res)
-            else:
-                logger.warning(f"PaddleOCR failed for {image_path}: {paddle_res}")
-                outputs.append({"agent": "paddle_ocr", "error": "Extraction failed"})
+            results[name] = future.result()
         except Exception as e:
-            logger.error(f"Error running PaddleOCR: {e}")
-            outputs.append({"agent": "paddle_ocr", "error": str(e)})
+            logger.error(f"Error running {name}: {e}")
+            results[name] = {"agent": name, "error": str(e)}
+    return results
+
+
+def _run_cascade(page, document_type, concurrent, timeout, digit_regions):
+    """
+    Stage 1: every agent except the digit agent. Stage 2: the digit agent,
+    only if Paddle left required numeric fields missing or low-confidence.
+    Returns (results by agent name, skipped agent names).
+    """
+    first_stage = [name for name, _ in AGENT_RUNNERS if name != "digit_ocr"]
+    if concurrent:
+        results = _run_agents_concurrently(page, timeout, names=first_stage)
     else:
-        outputs.append({"agent": "paddle_ocr", "error": "Agent not initialized"})
+        results = _run_agents_serially(page, names=first_stage)
 
-    # Run Tesseract (focused on digits)
-    if tesseract_agent:
-        try:
-            tess_res = tesseract_agent.extract(image_path)
-            if tess_res:
-                 outputs.append(tess_res)
-        except Exception as e:
-            logger.error(f"Error running Tesseract: {e}")
-            outputs.append({"agent": "digit_ocr", "error": str(e)})
+    missing = missing_numeric_fields(results.get("paddle_ocr"), document_type)
+    if missing == []:
+        record_page(digit_skipped=True)
+        logger.info(f"Cascade: digit agent skipped for {page.name} ({document_type})")
+        return results, ["digit_ocr"]
+
+    record_page(digit_skipped=False)
+    if concurrent:
+        # Bounded by the same per-agent timeout as the first stage
+        results.update(_run_agents_concurrently(page, timeout, digit_regions, names=["digit_ocr"],
+                                                upstream=results))
+    else:
+        results.update(_run_agents_serially(page, digit_regions, names=["digit_ocr"], upstream=results))
+    return results, []
+
+
+def run_ocr(image_path, concurrent=None, timeout=None, use_cache=None, digit_mode=None,
+            policy=None, document_type=None):
+    """
+    Runs all available OCR agents on the given image path.
+    Aggregates results into a single dictionary.
+
+    `image_path` may also be a decoded NumPy array or a PageImage. The page
+    is decoded once and its grayscale/downscaled variants are shared by
+    all agents.
 
-    # Run Layout Analysis
-    if layout_agent:
+    With `concurrent=True` the agents run at the same time and each one is
+    bounded by `timeout` seconds; slow or failing agents yield an error entry
+    while the remaining outputs are still returned.
+
+    `digit_mode="regions"` makes the digit agent re-read only the Paddle
+    boxes that look like number lines instead of the whole page.
+
+    `policy="cascade"` runs the cheapest sufficient agents first and only
+    calls the digit agent when `document_type`'s numeric fields are missing
+    or low-confidence; skipped agents are listed under 'skipped_agents'.
+
+    Complete results are cached by image content and agent configuration
+    (see ocr_agents.cache); `use_cache=False` forces a fresh run.
+    """
+    if concurrent is None:
+        concurrent = CONCURRENT_AGENTS
+    if timeout is None:
+        timeout = AGENT_TIMEOUT
+
+    if use_cache is None:
+        use_cache = OCR_CACHE_ENABLED
+    if digit_mode is None:
+        digit_mode = DIGIT_MODE
+    digit_regions = digit_mode == "regions"
+    if policy is None:
+        policy = OCR_POLICY
+
+    page = PageImage.coerce(image_path)
+
+    cache_key = None
+    if use_cache:
         try:
-            layout_info = layout_agent.extract(image_path)
-            # Add layout info directly to the list as per requested format
-            if layout_info:
-                outputs.append(layout_info)
-        except Exception as e:
-            logger.error(f"Error running LayoutAgent: {e}")
-            outputs.append({"agent": "layout_agent", "error": str(e)})
+            cache_key = ocr_cache_key(page, agent_config(digit_mode, policy, document_type))
+            cached = ocr_cache.get(cache_key)
+            if cached is not None:
+                logger.info(f"OCR cache hit for {page.name}")
+                return cached
+        except OSError as e:
+            logger.warning(f"OCR cache lookup failed for {page.name}: {e}")
 
-    return {
+    skipped = []
+    if policy == "cascade":
+        results, skipped = _run_cascade(page, document_type, concurrent, timeout, digit_regions)
+    elif concurrent:
+        results = _run_agents_concurrently(page, timeout, digit_regions)
+    else:
+        results = _run_agents_serially(page, digit_regions)
+
+    # Keep the pipeline's agent order regardless of how they were scheduled
+    outputs = [results[name] for name, _ in AGENT_RUNNERS if results.get(name)]
+    result = {
         "ocr_outputs": outputs
-    }
\ No newline at end of file
+    }
+    if policy == "cascade":
+        result["skipped_agents"] = skipped
+
+    if cache_key and is_cacheable(result):
+        ocr_cache.set(cache_key, result)
+
+    return result
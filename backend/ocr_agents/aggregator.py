@@ -1,26 +1,89 @@
-from . import run_ocr
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
 
-def run_ocr_agents(image_paths, document_type=None):
+from . import run_ocr, warmup
+
+logger = logging.getLogger(__name__)
+
+# Page-level parallelism. Each worker process holds its own copy of the OCR
+# models, so the pool is created once and reused across requests.
+PARALLEL_PAGES = os.getenv("OCR_PARALLEL_PAGES", "false").lower() in ("1", "true", "yes")
+PAGE_WORKERS = int(os.getenv("OCR_PAGE_WORKERS", "0")) or (os.cpu_count() or 1)
+
+_page_pool = None
+
+
+def _get_page_pool():
+    """Lazily creates the shared process pool used for per-page OCR."""
+    global _page_pool
+    if _page_pool is None:
+        # 'spawn' gives every worker a clean interpreter; forking a process
+        # that already holds Paddle/MKL thread pools is not safe.
+        ctx = multiprocessing.get_context("spawn")
+        # Each worker loads and warms its own models once at start-up.
+        _page_pool = ProcessPoolExecutor(max_workers=PAGE_WORKERS, mp_context=ctx, initializer=warmup)
+        logger.info(f"OCR page pool started with {PAGE_WORKERS} worker(s).")
+    return _page_pool
+
+
+def shutdown_page_pool():
+    """Stops the per-page worker pool (e.g. on application shutdown)."""
+    global _page_pool
+    if _page_pool is not None:
+        _page_pool.shutdown(wait=True)
+        _page_pool = None
+
+
+def _run_page(image_path, document_type=None):
+    # Module-level so it can be pickled into the page pool
+    return run_ocr(image_path, document_type=document_type)
+
+
+def run_ocr_agents(image_paths, document_type=None, parallel=None):
     """
     Runs OCR on a list of image paths and aggregates the results.
-    
+
     Args:
-        image_paths (list): List of file paths to images (pages).
-        document_type (str, optional): Type of document (e.g., 'aadhaar'). 
-                                       Can be used to tune OCR parameters if needed.
-                                       
+        image_paths (list): List of file paths to images (pages), or
+                            already-decoded page arrays (e.g. from pdf_to_arrays).
+        document_type (str, optional): Type of document (e.g., 'aadhaar').
+                                       Drives the cascade policy (OCR_POLICY=cascade).
+        parallel (bool, optional): OCR pages concurrently in the page pool.
+                                   Defaults to the OCR_PARALLEL_PAGES setting.
+
     Returns:
         dict: Aggregated Layer 3 output containing 'ocr_outputs' from all pages.
+              Every agent output is tagged with the 'page' index it came from.
+              Under the cascade policy, 'skipped_agents' lists the agents
+              that were not needed per page.
     """
+    if parallel is None:
+        parallel = PARALLEL_PAGES
+
+    if parallel and len(image_paths) > 1:
+        try:
+            # map() yields results in submission order, so page order is kept
+            page_results = list(_get_page_pool().map(_run_page, image_paths, [document_type] * len(image_paths)))
+        except Exception as e:
+            logger.error(f"Parallel page OCR failed, falling back to serial: {e}")
+            page_results = [_run_page(path, document_type) for path in image_paths]
+    else:
+        page_results = [_run_page(path, document_type) for path in image_paths]
+
     combined_outputs = []
-    
-    for path in image_paths:
+    skipped_agents = []
+    for page_index, result in enumerate(page_results):
         # run_ocr returns {"ocr_outputs": [...agents results...]}
-        result = run_ocr(path)
         if result and "ocr_outputs" in result:
-             # Extend the main list with the agents' output for this page
-             # We might want to tag them with page number in future, 
-             # but for now simple aggregation is sufficient for the LLM.
-             combined_outputs.extend(result["ocr_outputs"])
-             
-    return {"ocr_outputs": combined_outputs}
\ No newline at end of file
+            for output in result["ocr_outputs"]:
+                output["page"] = page_index
+                combined_outputs.append(output)
+            for agent in result.get("skipped_agents", []):
+                skipped_agents.append({"page": page_index, "agent": agent})
+
+    layer3_output = {"ocr_outputs": combined_outputs}
+    if skipped_agents:
+        layer3_output["skipped_agents"] = skipped_agents
+    return layer3_output
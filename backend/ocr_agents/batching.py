@@ -0,0 +1,104 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+
+class BatchingOCRService:
+    """
+    Collects single-image OCR calls from concurrent requests and runs them
+    through the model as one batch.
+
+    A background thread takes the first queued image, then keeps gathering
+    more for up to `max_wait_ms` (or until `max_batch_size` is reached)
+    before calling `ocr.ocr(list_of_images)`. Each caller gets back the
+    result for its own image, in the same shape a single-image call returns.
+    """
+
+    def __init__(self, ocr, max_batch_size=8, max_wait_ms=20):
+        self.ocr = ocr
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, max_wait_ms / 1000.0)
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self.batches_run = 0
+        self.images_run = 0
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._loop, name="paddle-batcher", daemon=True
+                )
+                self._thread.start()
+
+    def submit(self, img) -> Future:
+        if self._closed:
+            raise RuntimeError("BatchingOCRService is closed")
+        future = Future()
+        self._queue.put((img, future))
+        self._ensure_worker()
+        return future
+
+    def infer(self, img):
+        """Blocking single-image call routed through the batcher."""
+        return self.submit(img).result()
+
+    def _collect_batch(self):
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                # Shutdown sentinel: finish this batch, then stop
+                self._queue.put(None)
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+
+            images = [img for img, _ in batch]
+            futures = [fut for _, fut in batch]
+            try:
+                results = self.ocr.ocr(images)
+                if results is None or len(results) != len(images):
+                    raise RuntimeError(
+                        f"Batch OCR returned {0 if results is None else len(results)} "
+                        f"results for {len(images)} images"
+                    )
+            except Exception as e:
+                logger.error(f"Batched OCR failed ({len(images)} images): {e}")
+                for fut in futures:
+                    fut.set_exception(e)
+                continue
+
+            self.batches_run += 1
+            self.images_run += len(images)
+            for fut, res in zip(futures, results):
+                # Wrap so callers see the single-image shape: result[0]
+                fut.set_result([res])
+
+    def close(self):
+        self._closed = True
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
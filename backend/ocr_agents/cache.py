@@ -0,0 +1,38 @@
+import os
+
+from utils.cache import TieredCache, stable_hash
+
+# Content-addressed cache in front of run_ocr. Re-uploads of the same image
+# (common after a failed step) are served without re-running the agents.
+OCR_CACHE_ENABLED = os.getenv("OCR_CACHE", "true").lower() in ("1", "true", "yes")
+OCR_CACHE_SIZE = int(os.getenv("OCR_CACHE_SIZE", "256"))
+# OCR text carries the same personal data as the extracted entities (names,
+# full Aadhaar/PAN numbers, addresses) as plain JSON, so like the LLM cache
+# the disk tier is off unless OCR_CACHE_DIR is set (e.g. data/cache/ocr) on
+# an access-controlled disk, and entries expire after OCR_CACHE_TTL_HOURS.
+OCR_CACHE_DIR = os.getenv("OCR_CACHE_DIR", "")
+OCR_CACHE_MAX_MB = int(os.getenv("OCR_CACHE_MAX_MB", "256"))
+OCR_CACHE_TTL_HOURS = float(os.getenv("OCR_CACHE_TTL_HOURS", "1"))
+
+ocr_cache = TieredCache(
+    "ocr",
+    max_items=OCR_CACHE_SIZE,
+    disk_dir=OCR_CACHE_DIR or None,
+    max_disk_bytes=OCR_CACHE_MAX_MB * 1024 * 1024,
+    ttl_seconds=OCR_CACHE_TTL_HOURS * 3600 if OCR_CACHE_TTL_HOURS > 0 else None,
+)
+
+
+def ocr_cache_key(page, agent_config) -> str:
+    """Key = hash of the image bytes + the configuration of every agent."""
+    return stable_hash(page.digest(), agent_config)
+
+
+def is_cacheable(result) -> bool:
+    """Only complete results are cached; partial/error outputs are retried."""
+    outputs = result.get("ocr_outputs", [])
+    return bool(outputs) and not any("error" in o for o in outputs)
+
+
+def get_ocr_cache_stats() -> dict:
+    return ocr_cache.stats()
@@ -0,0 +1,75 @@
+import re
+import threading
+
+# Cascade policy: run Paddle first and only call the digit agent when the
+# numbers a document type needs are missing or read with low confidence.
+MIN_CONFIDENCE = 0.9
+
+DATE_PATTERN = r'\b\d{1,2}\s?[/\-.]\s?\d{1,2}\s?[/\-.]\s?\d{4}\b'
+
+# document_type -> field -> (value pattern, trigger pattern or None).
+# A field with a trigger is only required on pages where the trigger
+# (its label) appears, e.g. DOB is on the Aadhaar front but not the back.
+REQUIRED_NUMERIC_FIELDS = {
+    "aadhaar": {
+        "aadhaar_number": (r'\b\d{4}\s?\d{4}\s?\d{4}\b', None),
+        "date_of_birth": (DATE_PATTERN, r'(?i)\bDOB\b|birth|जन्म'),
+    },
+    "pan": {
+        "pan_number": (r'\b[A-Z]{5}\d{4}[A-Z]\b', None),
+        "date_of_birth": (DATE_PATTERN, None),
+    },
+    "voter_id": {
+        "epic_number": (r'\b[A-Z]{3}\d{7}\b', None),
+    },
+}
+
+_stats_lock = threading.Lock()
+CASCADE_STATS = {"pages": 0, "digit_runs": 0, "digit_skipped": 0}
+
+
+def _field_confidence(paddle_res, pattern):
+    """Best confidence of a Paddle line matching `pattern` (0.0 if none)."""
+    best = 0.0
+    for box in paddle_res.get("boxes") or []:
+        if re.search(pattern, box.get("text") or ""):
+            best = max(best, box.get("confidence", 0.0))
+    if best == 0.0 and re.search(pattern, paddle_res.get("text") or ""):
+        # Value split across lines: fall back to the page-level confidence
+        best = paddle_res.get("confidence", 0.0)
+    return best
+
+
+def missing_numeric_fields(paddle_res, document_type, min_confidence=MIN_CONFIDENCE):
+    """
+    Fields the digit agent should help with for this page. Returns None when
+    the document type has no rules (run every agent), or a possibly empty
+    list of field names.
+    """
+    rules = REQUIRED_NUMERIC_FIELDS.get(document_type)
+    if rules is None:
+        return None
+    if not paddle_res or "error" in paddle_res:
+        return list(rules)
+
+    text = paddle_res.get("text") or ""
+    missing = []
+    for field, (pattern, trigger) in rules.items():
+        if trigger and not re.search(trigger, text):
+            continue
+        if _field_confidence(paddle_res, pattern) < min_confidence:
+            missing.append(field)
+    return missing
+
+
+def record_page(digit_skipped):
+    with _stats_lock:
+        CASCADE_STATS["pages"] += 1
+        CASCADE_STATS["digit_skipped" if digit_skipped else "digit_runs"] += 1
+
+
+def get_cascade_stats() -> dict:
+    with _stats_lock:
+        stats = dict(CASCADE_STATS)
+    stats["skip_rate"] = round(stats["digit_skipped"] / stats["pages"], 3) if stats["pages"] else 0.0
+    return stats
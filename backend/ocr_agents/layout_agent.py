@@ -1,10 +1,13 @@
-import cv2
 import numpy as np
 
+from .page import PageImage
+
 class LayoutAgent:
-    def extract(self, image_path):
-        img = cv2.imread(image_path)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    def extract(self, image):
+        page = PageImage.coerce(image)
+        gray = page.gray
+        if gray is None:
+            return {"agent": "layout_agent", "error": f"Failed to load image: {page.name}"}
 
         h, w = gray.shape
 
@@ -0,0 +1,252 @@
+import math
+import os
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+# Optional: only needed when PADDLE_BACKEND=openvino (pip install openvino)
+try:
+    import openvino as ov
+except ImportError:
+    ov = None
+
+try:
+    import pyclipper
+except ImportError:  # installed with paddleocr; only needed for box unclipping
+    pyclipper = None
+
+
+class OpenVINOOCR:
+    """
+    PP-OCR (detection -> angle classification -> recognition) compiled with
+    the OpenVINO runtime for Intel CPUs.
+
+    `model_dir` holds the exported Paddle models as OpenVINO IR or ONNX:
+        det.xml|det.onnx, cls.xml|cls.onnx, rec.xml|rec.onnx, rec_dict.txt
+    With precision="int8" the quantized variants (det_int8.xml, ...) are
+    preferred and the FP32 files are used for any model without one.
+
+    `ocr(img)` mirrors PaddleOCR 3.x: it returns one dict per input image
+    with 'rec_texts', 'rec_scores' and 'rec_boxes', so PaddleOCRAgent parses
+    the output exactly like the Paddle backend.
+    """
+
+    det_limit_side = 960
+    det_thresh = 0.3
+    det_box_thresh = 0.6
+    det_unclip_ratio = 1.5
+    cls_shape = (48, 192)
+    cls_thresh = 0.9
+    rec_height = 48
+    rec_base_width = 320
+    rec_batch_size = 8
+
+    def __init__(self, model_dir, precision="fp32", device="CPU", use_angle_cls=True, num_threads=None):
+        if ov is None:
+            raise RuntimeError("OpenVINO backend selected but the 'openvino' package is not installed")
+        self.model_dir = Path(model_dir)
+        self.precision = precision
+        self.use_angle_cls = use_angle_cls
+
+        core = ov.Core()
+        config = {"PERFORMANCE_HINT": "LATENCY"}
+        if num_threads:
+            config["INFERENCE_NUM_THREADS"] = int(num_threads)
+
+        self.det = core.compile_model(core.read_model(self._model_path("det")), device, config)
+        self.rec = core.compile_model(core.read_model(self._model_path("rec")), device, config)
+        self.cls = None
+        if use_angle_cls:
+            self.cls = core.compile_model(core.read_model(self._model_path("cls")), device, config)
+
+        dict_path = self.model_dir / "rec_dict.txt"
+        with open(dict_path, "r", encoding="utf-8") as f:
+            chars = [line.rstrip("\n").rstrip("\r") for line in f]
+        # CTC: index 0 is blank; PP-OCR appends a space character
+        self.characters = ["blank"] + chars + [" "]
+
+    def _model_path(self, name):
+        candidates = []
+        if self.precision == "int8":
+            candidates += [f"{name}_int8.xml", f"{name}_int8.onnx"]
+        candidates += [f"{name}.xml", f"{name}.onnx"]
+        for candidate in candidates:
+            path = self.model_dir / candidate
+            if path.exists():
+                return str(path)
+        raise FileNotFoundError(f"No {name} model found in {self.model_dir}")
+
+    # ------------------------------------------------------------------ API
+
+    def ocr(self, img, **kwargs):
+        if isinstance(img, (list, tuple)):
+            return [self._ocr_one(i) for i in img]
+        return [self._ocr_one(img)]
+
+    def _ocr_one(self, img):
+        boxes = self._detect(img)
+        if not boxes:
+            return {"rec_texts": [], "rec_scores": [], "rec_boxes": np.zeros((0, 4), dtype=np.int32)}
+
+        crops = [self._crop(img, box) for box in boxes]
+        if self.cls is not None:
+            crops = self._classify(crops)
+        texts, scores = self._recognize(crops)
+
+        rec_boxes = np.array(
+            [[b[:, 0].min(), b[:, 1].min(), b[:, 0].max(), b[:, 1].max()] for b in boxes],
+            dtype=np.int32,
+        )
+        return {"rec_texts": texts, "rec_scores": scores, "rec_boxes": rec_boxes}
+
+    # ------------------------------------------------------------ detection
+
+    def _detect(self, img):
+        h, w = img.shape[:2]
+        ratio = min(1.0, self.det_limit_side / float(max(h, w)))
+        resize_h = max(32, int(round(h * ratio / 32)) * 32)
+        resize_w = max(32, int(round(w * ratio / 32)) * 32)
+        resized = cv2.resize(img, (resize_w, resize_h))
+
+        x = resized.astype(np.float32) / 255.0
+        x = (x - np.array([0.485, 0.456, 0.406], dtype=np.float32)) / np.array([0.229, 0.224, 0.225], dtype=np.float32)
+        x = x.transpose(2, 0, 1)[np.newaxis]
+
+        prob = self.det([x])[self.det.output(0)][0, 0]
+        bitmap = (prob > self.det_thresh).astype(np.uint8)
+        contours, _ = cv2.findContours(bitmap, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+
+        scale_x, scale_y = w / float(resize_w), h / float(resize_h)
+        boxes = []
+        for contour in contours[:1000]:
+            points, short_side = self._min_box(contour)
+            if short_side < 3:
+                continue
+            if self._box_score(prob, contour) < self.det_box_thresh:
+                continue
+            expanded = self._unclip(points)
+            if expanded is None:
+                continue
+            points, short_side = self._min_box(expanded.reshape(-1, 1, 2))
+            if short_side < 5:
+                continue
+            points[:, 0] = np.clip(np.round(points[:, 0] * scale_x), 0, w)
+            points[:, 1] = np.clip(np.round(points[:, 1] * scale_y), 0, h)
+            boxes.append(points.astype(np.float32))
+
+        # Reading order: top-to-bottom, then left-to-right
+        boxes.sort(key=lambda b: (round(b[0][1] / 10), b[0][0]))
+        return boxes
+
+    @staticmethod
+    def _min_box(contour):
+        rect = cv2.minAreaRect(contour)
+        pts = sorted(cv2.boxPoints(rect).tolist(), key=lambda p: p[0])
+        left = sorted(pts[:2], key=lambda p: p[1])
+        right = sorted(pts[2:], key=lambda p: p[1])
+        # top-left, top-right, bottom-right, bottom-left
+        box = np.array([left[0], right[0], right[1], left[1]], dtype=np.float32)
+        return box, min(rect[1])
+
+    @staticmethod
+    def _box_score(prob, contour):
+        h, w = prob.shape
+        x, y, bw, bh = cv2.boundingRect(contour)
+        mask = np.zeros((bh, bw), dtype=np.uint8)
+        cv2.fillPoly(mask, [contour.reshape(-1, 2) - [x, y]], 1)
+        return cv2.mean(prob[y:y + bh, x:x + bw], mask)[0]
+
+    def _unclip(self, box):
+        area = cv2.contourArea(box)
+        length = cv2.arcLength(box, True)
+        if length == 0:
+            return None
+        distance = area * self.det_unclip_ratio / length
+        if pyclipper is None:
+            center = box.mean(axis=0)
+            direction = box - center
+            norm = np.linalg.norm(direction, axis=1, keepdims=True) + 1e-6
+            return (box + direction / norm * distance).astype(np.float32)
+        offset = pyclipper.PyclipperOffset()
+        offset.AddPath(box.astype(np.int64).tolist(), pyclipper.JT_ROUND, pyclipper.ET_CLOSEDPOLYGON)
+        expanded = offset.Execute(distance)
+        if len(expanded) != 1:
+            return None
+        return np.array(expanded[0], dtype=np.float32)
+
+    @staticmethod
+    def _crop(img, box):
+        width = int(max(np.linalg.norm(box[0] - box[1]), np.linalg.norm(box[2] - box[3])))
+        height = int(max(np.linalg.norm(box[0] - box[3]), np.linalg.norm(box[1] - box[2])))
+        width, height = max(width, 1), max(height, 1)
+        target = np.float32([[0, 0], [width, 0], [width, height], [0, height]])
+        matrix = cv2.getPerspectiveTransform(box, target)
+        crop = cv2.warpPerspective(img, matrix, (width, height), borderMode=cv2.BORDER_REPLICATE,
+                                   flags=cv2.INTER_CUBIC)
+        if height / float(width) >= 1.5:
+            crop = np.ascontiguousarray(np.rot90(crop))
+        return crop
+
+    # ------------------------------------------------- classification / rec
+
+    @staticmethod
+    def _resize_norm(crop, height, width, max_width):
+        ratio = crop.shape[1] / float(crop.shape[0])
+        resized_w = min(max_width, int(math.ceil(height * ratio)))
+        resized = cv2.resize(crop, (max(resized_w, 1), height)).astype(np.float32)
+        resized = (resized / 255.0 - 0.5) / 0.5
+        out = np.zeros((3, height, width), dtype=np.float32)
+        out[:, :, :resized.shape[1]] = resized.transpose(2, 0, 1)
+        return out
+
+    def _classify(self, crops):
+        h, w = self.cls_shape
+        batch = np.stack([self._resize_norm(c, h, w, w) for c in crops])
+        probs = self.cls([batch])[self.cls.output(0)]
+        out = []
+        for crop, p in zip(crops, probs):
+            # labels: ['0', '180']
+            if int(np.argmax(p)) == 1 and float(p[1]) > self.cls_thresh:
+                crop = cv2.rotate(crop, cv2.ROTATE_180)
+            out.append(crop)
+        return out
+
+    def _recognize(self, crops):
+        texts, scores = [""] * len(crops), [0.0] * len(crops)
+        # Similar aspect ratios in one batch keep padding small
+        order = np.argsort([c.shape[1] / float(c.shape[0]) for c in crops])
+        for start in range(0, len(crops), self.rec_batch_size):
+            idx = order[start:start + self.rec_batch_size]
+            max_ratio = max(self.rec_base_width / self.rec_height,
+                            max(crops[i].shape[1] / float(crops[i].shape[0]) for i in idx))
+            width = int(math.ceil(self.rec_height * max_ratio))
+            batch = np.stack([self._resize_norm(crops[i], self.rec_height, width, width) for i in idx])
+            preds = self.rec([batch])[self.rec.output(0)]
+            for i, pred in zip(idx, preds):
+                texts[i], scores[i] = self._ctc_decode(pred)
+        return texts, scores
+
+    def _ctc_decode(self, pred):
+        indices = pred.argmax(axis=1)
+        probs = pred.max(axis=1)
+        chars, confs = [], []
+        previous = -1
+        for index, prob in zip(indices, probs):
+            if index != previous and index != 0 and index < len(self.characters):
+                chars.append(self.characters[index])
+                confs.append(float(prob))
+            previous = index
+        return "".join(chars), (float(np.mean(confs)) if confs else 0.0)
+
+
+def create_openvino_ocr(use_angle_cls=True):
+    """Builds the OpenVINO pipeline from OPENVINO_* environment settings."""
+    model_dir = os.getenv("OPENVINO_MODEL_DIR", "models/ppocr_openvino")
+    return OpenVINOOCR(
+        model_dir,
+        precision=os.getenv("OPENVINO_PRECISION", "fp32"),
+        device=os.getenv("OPENVINO_DEVICE", "CPU"),
+        use_angle_cls=use_angle_cls,
+        num_threads=os.getenv("OPENVINO_NUM_THREADS"),
+    )
@@ -1,37 +1,82 @@
-from paddleocr import PaddleOCR
 import os
-import cv2
+import threading
+
 import numpy as np
 
+from .page import PageImage
+from .batching import BatchingOCRService
+
+# Cross-request micro-batching: a batch size above 1 routes every page
+# through a shared BatchingOCRService instead of calling Paddle directly.
+BATCH_SIZE = int(os.getenv("PADDLE_BATCH_SIZE", "1"))
+BATCH_WAIT_MS = float(os.getenv("PADDLE_BATCH_WAIT_MS", "25"))
+
+# Inference backend: "paddle" (paddlepaddle CPU inference) or "openvino"
+# (same PP-OCR models compiled with OpenVINO, optionally INT8).
+BACKEND = os.getenv("PADDLE_BACKEND", "paddle")
+
+def _to_box(coords, inv_scale):
+    """[x1, y1, x2, y2] in full-resolution page pixels from a box or polygon."""
+    pts = np.asarray(coords, dtype=np.float32).reshape(-1, 2)
+    x1, y1 = pts.min(axis=0) * inv_scale
+    x2, y2 = pts.max(axis=0) * inv_scale
+    return [int(x1), int(y1), int(round(x2)), int(round(y2))]
+
 class PaddleOCRAgent:
-    def __init__(self):
-        self.ocr = PaddleOCR(use_angle_cls=True, lang='en')
+    max_side = 2048
+    params = {"use_angle_cls": True, "lang": "en"}
+    backend = {
+        "name": BACKEND,
+        "precision": os.getenv("OPENVINO_PRECISION", "fp32") if BACKEND == "openvino" else "fp32",
+    }
 
-    def extract(self, image_path):
-        if not os.path.exists(image_path):
-            return {"error": f"File not found: {image_path}"}
+    def __init__(self, batch_size=BATCH_SIZE, batch_wait_ms=BATCH_WAIT_MS):
+        # Imported here so importing ocr_agents stays cheap; the model is
+        # only loaded when the registry first asks for this agent.
+        if self.backend["name"] == "openvino":
+            from .openvino_backend import create_openvino_ocr
+            self.ocr = create_openvino_ocr(use_angle_cls=self.params["use_angle_cls"])
+        else:
+            from paddleocr import PaddleOCR
+            self.ocr = PaddleOCR(**self.params)
+        # A Paddle / OpenVINO predictor is not safe to call from several
+        # threads (concurrent uploads, warmup, timed-out fan-out agents);
+        # direct calls take turns, batched ones go through one worker thread.
+        self._infer_lock = threading.Lock()
+        self.batcher = None
+        if batch_size > 1:
+            self.batcher = BatchingOCRService(self.ocr, max_batch_size=batch_size, max_wait_ms=batch_wait_ms)
+
+    def _infer(self, img):
+        if self.batcher is not None:
+            return self.batcher.infer(img)
+        with self._infer_lock:
+            return self.ocr.ocr(img)
+
+    def extract(self, image):
+        page = PageImage.coerce(image)
+        if page.path is not None and not os.path.exists(page.path):
+            return {"error": f"File not found: {page.path}"}
 
         # Safe read & Resize
         try:
-            img = cv2.imread(image_path)
+            img = page.downscaled(self.max_side)
             if img is None:
-                return {"error": f"Failed to load image: {image_path}"}
-            
-            h, w = img.shape[:2]
-            max_limit = 2048
-            if max(h, w) > max_limit:
-                scale = max_limit / float(max(h, w))
-                new_w, new_h = int(w * scale), int(h * scale)
-                img = cv2.resize(img, (new_w, new_h))
+                return {"error": f"Failed to load image: {page.name}"}
             
             # Pass numpy array to OCR
-            result = self.ocr.ocr(img)
+            result = self._infer(img)
             
         except Exception as e:
             return {"agent": "paddle_ocr", "error": f"Pre-processing failed: {str(e)}"}
 
+        # Detection boxes are reported in full-resolution coordinates so
+        # other agents can crop the original page (e.g. digit re-reads).
+        inv_scale = page.bgr.shape[1] / float(img.shape[1])
+
         lines = []
         scores = []
+        boxes = []
         
         if result is None or result[0] is None:
              return {
@@ -44,14 +89,22 @@ class PaddleOCRAgent:
             data = result[0]
             rec_texts = data.get('rec_texts', [])
             rec_scores = data.get('rec_scores', [])
+            rec_boxes = data.get('rec_boxes')
+            if rec_boxes is None or len(rec_boxes) != len(rec_texts):
+                rec_boxes = data.get('rec_polys')
+            if rec_boxes is None or len(rec_boxes) != len(rec_texts):
+                rec_boxes = [None] * len(rec_texts)
             
             if not rec_texts and 'res' in data:
                  pass 
 
-            for text, score in zip(rec_texts, rec_scores):
+            for text, score, coords in zip(rec_texts, rec_scores, rec_boxes):
                 if score > 0.5:
                     lines.append(text)
                     scores.append(score)
+                    if coords is not None:
+                        boxes.append({"text": text, "confidence": round(float(score), 3),
+                                      "box": _to_box(coords, inv_scale)})
         
         elif isinstance(result[0], list):
              for line in result[0]:
@@ -62,6 +115,8 @@ class PaddleOCRAgent:
                     if confidence > 0.5:
                         lines.append(text_content)
                         scores.append(confidence)
+                        boxes.append({"text": text_content, "confidence": round(float(confidence), 3),
+                                      "box": _to_box(line[0], inv_scale)})
                 else:
                     pass
 
@@ -71,7 +126,8 @@ class PaddleOCRAgent:
             "agent": "paddle_agent",
             "modality": "printed_text",
             "text": final_text,
-            "confidence": round(avg_conf, 2)
+            "confidence": round(avg_conf, 2),
+            "boxes": boxes
         }
 
 # Agent Usage test (success)
@@ -0,0 +1,98 @@
+import hashlib
+import threading
+
+import cv2
+import numpy as np
+
+
+class PageImage:
+    """
+    A single decoded page shared by every OCR agent.
+
+    The image is decoded from disk at most once; the grayscale and
+    downscaled variants are derived lazily on first use and cached, so
+    agents running on the same page never repeat the work.
+    """
+
+    def __init__(self, path=None, image=None):
+        if path is None and image is None:
+            raise ValueError("PageImage needs a path or a decoded image")
+        self.path = str(path) if path is not None else None
+        self._bgr = image
+        self._gray = None
+        self._scaled = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def coerce(cls, image):
+        """Wraps a path or NumPy array; returns PageImage inputs unchanged."""
+        if isinstance(image, cls):
+            return image
+        if isinstance(image, np.ndarray):
+            return cls(image=image)
+        return cls(path=image)
+
+    def __getstate__(self):
+        # Derived variants are cheap to rebuild; only ship the source across
+        # process boundaries (e.g. to the per-page worker pool).
+        return {"path": self.path, "image": self._bgr}
+
+    def __setstate__(self, state):
+        self.__init__(path=state["path"], image=state["image"])
+
+    @property
+    def name(self):
+        return self.path or "<in-memory page>"
+
+    def digest(self):
+        """Content hash of the source image (file bytes or raw pixels)."""
+        h = hashlib.sha256()
+        if self.path is not None:
+            with open(self.path, "rb") as f:
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    h.update(chunk)
+        else:
+            img = np.ascontiguousarray(self._bgr)
+            h.update(f"{img.shape}|{img.dtype}".encode("utf-8"))
+            h.update(img.data)
+        return h.hexdigest()
+
+    @property
+    def bgr(self):
+        """Full-resolution BGR array, or None if the file cannot be decoded."""
+        if self._bgr is None and self.path is not None:
+            with self._lock:
+                if self._bgr is None:
+                    self._bgr = cv2.imread(self.path)
+        return self._bgr
+
+    @property
+    def gray(self):
+        """Full-resolution grayscale array."""
+        if self._gray is None:
+            img = self.bgr
+            if img is None:
+                return None
+            with self._lock:
+                if self._gray is None:
+                    self._gray = img if img.ndim == 2 else cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    def downscaled(self, max_side):
+        """
+        BGR array whose longest side is at most `max_side`.
+        Returns the full-resolution array when it is already small enough.
+        """
+        img = self.bgr
+        if img is None:
+            return None
+        h, w = img.shape[:2]
+        if max(h, w) <= max_side:
+            return img
+        if max_side not in self._scaled:
+            scale = max_side / float(max(h, w))
+            new_w, new_h = int(w * scale), int(h * scale)
+            resized = cv2.resize(img, (new_w, new_h))
+            with self._lock:
+                self._scaled.setdefault(max_side, resized)
+        return self._scaled[max_side]
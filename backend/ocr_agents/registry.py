@@ -0,0 +1,133 @@
+import logging
+import threading
+import time
+
+import numpy as np
+
+from .paddle_agent import PaddleOCRAgent
+from .tesseract_agent import DigitOCRAgent
+from .layout_agent import LayoutAgent
+
+logger = logging.getLogger(__name__)
+
+# Agents are constructed on first use instead of at import time, so
+# importing ocr_agents (API workers, tests, scripts) never loads a model.
+AGENT_FACTORIES = {
+    "paddle_ocr": PaddleOCRAgent,
+    "digit_ocr": DigitOCRAgent,
+    "layout_agent": LayoutAgent,
+}
+
+# The pipeline cannot produce useful Layer 3 output without these
+REQUIRED_AGENTS = ("paddle_ocr",)
+
+_instances = {}
+_errors = {}
+_warm = set()
+_lock = threading.Lock()
+_warmup_state = {"started_at": None, "finished_at": None}
+
+
+def get_agent(name):
+    """
+    Returns the shared instance of agent `name`, constructing it on first
+    call. A failed construction is remembered and returns None until
+    reset_agents() is called, so a broken install does not retry the model
+    load on every page.
+    """
+    if name in _instances:
+        return _instances[name]
+    if name in _errors:
+        return None
+
+    with _lock:
+        if name in _instances:
+            return _instances[name]
+        if name in _errors:
+            return None
+        try:
+            agent = AGENT_FACTORIES[name]()
+            _instances[name] = agent
+            logger.info(f"{type(agent).__name__} initialized successfully.")
+            return agent
+        except Exception as e:
+            logger.error(f"Failed to initialize {name}: {e}")
+            _errors[name] = str(e)
+            return None
+
+
+def reset_agents():
+    """Drops all constructed agents and remembered failures."""
+    with _lock:
+        _instances.clear()
+        _errors.clear()
+        _warm.clear()
+        _warmup_state.update(started_at=None, finished_at=None)
+
+
+def warmup():
+    """
+    Loads every agent and runs one dummy inference through it so model
+    weights, MKL-DNN kernels and the Tesseract binary are all hot before
+    the first real upload. Returns the readiness report.
+    """
+    _warmup_state["started_at"] = time.time()
+    dummy = np.full((64, 256, 3), 255, dtype=np.uint8)
+
+    for name in AGENT_FACTORIES:
+        agent = get_agent(name)
+        if agent is None:
+            continue
+        try:
+            result = agent.extract(dummy)
+        except Exception as e:
+            result = {"error": str(e)}
+        # Agents catch their own inference errors and report them in the result
+        if isinstance(result, dict) and "error" in result:
+            logger.error(f"Warmup inference failed for {name}: {result['error']}")
+            _errors[name] = f"warmup failed: {result['error']}"
+        else:
+            mark_ready(name)
+
+    _warmup_state["finished_at"] = time.time()
+    report = readiness()
+    logger.info(f"OCR warmup finished in {_warmup_state['finished_at'] - _warmup_state['started_at']:.1f}s "
+                f"(ready={report['ready']})")
+    return report
+
+
+def mark_ready(name):
+    """
+    Records that agent `name` has produced a result. Warmup does this at
+    start-up; without it (OCR_WARMUP_ON_STARTUP=false) an agent becomes
+    ready after its first successful page.
+    """
+    if name not in _warm:
+        with _lock:
+            _warm.add(name)
+
+
+def readiness(lazy=False) -> dict:
+    """
+    Per-agent status plus an overall 'ready' flag for health checks.
+    With `lazy` (no start-up warmup, models load on first use) the required
+    agents only need to not have failed; otherwise they must be warm.
+    """
+    agents = {}
+    for name in AGENT_FACTORIES:
+        if name in _errors:
+            agents[name] = f"failed: {_errors[name]}"
+        elif name in _warm:
+            agents[name] = "ready"
+        elif name in _instances:
+            agents[name] = "loaded"
+        else:
+            agents[name] = "not_loaded"
+
+    ready_states = ("ready", "loaded", "not_loaded") if lazy else ("ready",)
+    ready = all(agents[name] in ready_states for name in REQUIRED_AGENTS)
+    return {
+        "ready": ready,
+        "warming_up": _warmup_state["started_at"] is not None and _warmup_state["finished_at"] is None,
+        "agents": agents,
+    }
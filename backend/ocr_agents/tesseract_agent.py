@@ -1,30 +1,56 @@
 import cv2
-import pytesseract
 import re
-import os
 
-class DigitOCRAgent:
-    def __init__(self):
-        # Set Tesseract Path explicitly since it's not in PATH
-        # Common default installation path on Windows
-        tesseract_path = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
-        if not os.path.exists(tesseract_path):
-             # Fallback or warning if not found even there
-             print(f"Warning: Tesseract not found at {tesseract_path}")
-        
-        pytesseract.pytesseract.tesseract_cmd = tesseract_path
+from .page import PageImage
+from .tesseract_backend import create_backend
 
-        # Only digits + space
-        self.config = r'-c tessedit_char_whitelist=0123456789 --psm 6'
+# Lines worth a digit re-read: Aadhaar/VID groups, dates, long digit runs
+NUMBER_LINE_PATTERNS = [
+    re.compile(r'\d{4}\s?\d{4}\s?\d{4}'),            # Aadhaar / VID groups
+    re.compile(r'\d{1,2}\s?[/\-.]\s?\d{1,2}\s?[/\-.]\s?\d{2,4}'),  # DOB / issue dates
+    re.compile(r'\d{6,}'),
+]
 
-    def extract(self, image_path):
-        img = cv2.imread(image_path)
-        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+def is_number_line(text):
+    """True if an OCR line looks like it carries an ID number or a date."""
+    if not text:
+        return False
+    if any(p.search(text) for p in NUMBER_LINE_PATTERNS):
+        return True
+    alnum = [c for c in text if c.isalnum()]
+    digits = sum(c.isdigit() for c in alnum)
+    return digits >= 4 and digits >= 0.6 * len(alnum)
 
-        # light blur to reduce noise (cheap)
-        gray = cv2.GaussianBlur(gray, (3, 3), 0)
+class DigitOCRAgent:
+    # Only digits + space
+    whitelist = "0123456789"
+    psm = 6
+    line_psm = 7   # single text line, used for region crops
+    config = f'-c tessedit_char_whitelist={whitelist} --psm {psm}'
 
-        text = pytesseract.image_to_string(gray, config=self.config)
+    def __init__(self):
+        # Persistent engine (tesserocr) when available, pytesseract otherwise
+        self.backend = create_backend(self.whitelist, psm=self.psm)
+
+    def extract(self, image, regions=None):
+        """
+        OCR digits on the whole page, or - when `regions` (Paddle detection
+        boxes) are given - only on the crops that look like number lines.
+        Falls back to the whole page if no region qualifies.
+        """
+        page = PageImage.coerce(image)
+        gray = page.gray
+        if gray is None:
+            return {"agent": "digit_agent", "error": f"Failed to load image: {page.name}"}
+
+        number_regions = [r for r in (regions or []) if is_number_line(r.get("text"))]
+        if number_regions:
+            text = self._read_regions(gray, number_regions)
+            mode = "regions"
+        else:
+            # light blur to reduce noise (cheap)
+            text = self.backend.image_to_string(cv2.GaussianBlur(gray, (3, 3), 0))
+            mode = "page"
 
         # clean output
         digits = re.findall(r'\d{2,}', text)
@@ -36,9 +62,23 @@ class DigitOCRAgent:
             "agent": "digit_agent",
             "modality": "numeric",
             "text": cleaned,
-            "confidence": confidence
+            "confidence": confidence,
+            "mode": mode
         }
 
+    def _read_regions(self, gray, regions):
+        h, w = gray.shape[:2]
+        texts = []
+        for region in regions:
+            x1, y1, x2, y2 = region["box"]
+            pad = max(2, int((y2 - y1) * 0.25))
+            crop = gray[max(0, y1 - pad):min(h, y2 + pad), max(0, x1 - pad):min(w, x2 + pad)]
+            if crop.size == 0:
+                continue
+            crop = cv2.GaussianBlur(crop, (3, 3), 0)
+            texts.append(self.backend.image_to_string(crop, psm=self.line_psm))
+        return "\n".join(texts)
+
 # testing (success)
 if __name__ == "__main__":
     agent = DigitOCRAgent()
@@ -0,0 +1,102 @@
+import logging
+import os
+import platform
+import queue
+import shutil
+
+logger = logging.getLogger(__name__)
+
+# Optional: tesserocr binds libtesseract directly (pip install tesserocr).
+# Without it we fall back to pytesseract, which spawns a process per call.
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+TESSERACT_BACKEND = os.getenv("TESSERACT_BACKEND", "auto")  # auto | tesserocr | pytesseract
+TESSERACT_POOL_SIZE = int(os.getenv("TESSERACT_POOL_SIZE", "2"))
+
+WINDOWS_DEFAULT_CMD = r'C:\Program Files\Tesseract-OCR\tesseract.exe'
+
+
+def find_tesseract_cmd():
+    """TESSERACT_CMD, then PATH, then the default Windows install location."""
+    cmd = os.getenv("TESSERACT_CMD") or shutil.which("tesseract")
+    if not cmd and platform.system() == "Windows" and os.path.exists(WINDOWS_DEFAULT_CMD):
+        cmd = WINDOWS_DEFAULT_CMD
+    return cmd
+
+
+class TesserocrBackend:
+    """
+    In-process Tesseract. A small pool of initialized engines is kept alive
+    (one engine is not thread-safe), each already configured with the
+    character whitelist, and fed raw grayscale NumPy buffers directly.
+    """
+    name = "tesserocr"
+
+    def __init__(self, whitelist, psm=6, lang="eng", pool_size=TESSERACT_POOL_SIZE):
+        if tesserocr is None:
+            raise RuntimeError("tesserocr is not installed")
+        self.default_psm = psm
+        self._engines = queue.Queue()
+        tessdata = os.getenv("TESSDATA_PREFIX")
+        for _ in range(max(1, pool_size)):
+            kwargs = {"lang": lang, "psm": psm}
+            if tessdata:
+                kwargs["path"] = tessdata
+            api = tesserocr.PyTessBaseAPI(**kwargs)
+            api.SetVariable("tessedit_char_whitelist", whitelist)
+            self._engines.put(api)
+
+    def image_to_string(self, gray, psm=None):
+        h, w = gray.shape[:2]
+        api = self._engines.get()
+        try:
+            api.SetPageSegMode(psm or self.default_psm)
+            api.SetImageBytes(gray.tobytes(), w, h, 1, w)
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+            self._engines.put(api)
+
+    def close(self):
+        while not self._engines.empty():
+            self._engines.get().End()
+
+
+class PytesseractBackend:
+    """Fallback: one `tesseract` subprocess (and temp image) per call."""
+    name = "pytesseract"
+
+    def __init__(self, whitelist, psm=6):
+        import pytesseract
+        self._pytesseract = pytesseract
+        cmd = find_tesseract_cmd()
+        if cmd:
+            pytesseract.pytesseract.tesseract_cmd = cmd
+        else:
+            logger.warning("Tesseract binary not found (set TESSERACT_CMD or add it to PATH)")
+        self.whitelist = whitelist
+        self.default_psm = psm
+
+    def image_to_string(self, gray, psm=None):
+        config = f'-c tessedit_char_whitelist={self.whitelist} --psm {psm or self.default_psm}'
+        return self._pytesseract.image_to_string(gray, config=config)
+
+    def close(self):
+        pass
+
+
+def create_backend(whitelist, psm=6, backend=TESSERACT_BACKEND):
+    """Builds the configured backend, preferring the in-process engine."""
+    if backend in ("auto", "tesserocr") and tesserocr is not None:
+        try:
+            return TesserocrBackend(whitelist, psm=psm)
+        except Exception as e:
+            if backend == "tesserocr":
+                raise
+            logger.warning(f"tesserocr unavailable ({e}); falling back to pytesseract")
+    elif backend == "tesserocr":
+        raise RuntimeError("TESSERACT_BACKEND=tesserocr but tesserocr is not installed")
+    return PytesseractBackend(whitelist, psm=psm)
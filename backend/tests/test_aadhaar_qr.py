@@ -0,0 +1,78 @@
+import sys
+import os
+import gzip
+
+import cv2
+import numpy as np
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import ingestion.aadhaar_qr as aadhaar_qr
+from ingestion.aadhaar_qr import decode_aadhaar_qr, qr_to_entities, find_uid_with_suffix, extract_from_qr
+from ingestion.aadhaar_qr import qr_missing_fields
+
+
+def _secure_qr_payload():
+    fields = ["V2", "3", "714020190101120000000", "Abhishek Dixit", "27-09-2004", "M",
+              "S/O Ajay Kumar Dixit", "Kanpur Nagar", "Near Temple", "12/4", "Kalyanpur",
+              "208017", "Kalyanpur", "Uttar Pradesh", "Main Road", "Kanpur", "Kanpur"]
+    # photo and signature stubs follow the text fields
+    body = b"\xff".join(f.encode("iso-8859-1") for f in fields) + b"\xff" + b"\x00" * 32 + bytes(range(256))
+    raw = gzip.compress(body)
+    return str(int.from_bytes(raw, "big"))
+
+
+LEGACY_XML = ('<?xml version="1.0" encoding="UTF-8"?><PrintLetterBarcodeData uid="470226297140" '
+              'name="Abhishek Dixit" gender="M" yob="2004" co="S/O Ajay Kumar Dixit" vtc="Kanpur" '
+              'dist="Kanpur Nagar" state="Uttar Pradesh" pc="208017" dob="27/09/2004"/>')
+
+
+def test_secure_qr_decodes_to_entities():
+    fields = decode_aadhaar_qr(_secure_qr_payload())
+    assert fields["format"] == "secure" and fields["uid_last4"] == "7140"
+
+    entities = qr_to_entities(fields)
+    assert entities["full_name"]["value"] == "Abhishek Dixit"
+    assert entities["date_of_birth"]["value"] == "2004-09-27"
+    assert entities["gender"]["value"] == "MALE"
+    assert entities["fathers_name"]["value"] == "Ajay Kumar Dixit"
+    assert entities["pincode"]["value"] == "208017"
+    assert "aadhaar_number" not in entities  # only the last 4 digits are in the QR
+    assert qr_missing_fields(entities) == ["aadhaar_number"]  # not a complete fast path hit
+
+
+def test_legacy_xml_qr_has_full_uid():
+    entities = qr_to_entities(decode_aadhaar_qr(LEGACY_XML))
+    assert entities["aadhaar_number"]["value"] == "470226297140"
+    assert entities["date_of_birth"]["value"] == "2004-09-27"
+    assert qr_missing_fields(entities) == []
+
+
+def test_uid_suffix_match():
+    assert find_uid_with_suffix("12 4702 2629 7140 2004", "7140") == "470226297140"
+    assert find_uid_with_suffix("4702 2629 7141", "7140") is None
+
+
+def test_fast_path_on_rendered_qr():
+    # Kept short: OpenCV's encoder is only reliable for small QR versions
+    qr = cv2.QRCodeEncoder.create().encode('<PrintLetterBarcodeData uid="470226297140" name="Abhishek Dixit"/>')
+    qr = cv2.resize(qr, None, fx=6, fy=6, interpolation=cv2.INTER_NEAREST)
+    page = np.full((qr.shape[0] + 80, qr.shape[1] + 80, 3), 255, dtype=np.uint8)
+    page[40:40 + qr.shape[0], 40:40 + qr.shape[1]] = cv2.cvtColor(qr, cv2.COLOR_GRAY2BGR)
+
+    before = aadhaar_qr.get_qr_stats()
+    entities = extract_from_qr([page])
+    after = aadhaar_qr.get_qr_stats()
+    assert entities["full_name"] == {"value": "Abhishek Dixit", "confidence": aadhaar_qr.QR_CONFIDENCE}
+    assert after["hits"] == before["hits"] + 1
+
+    assert extract_from_qr([np.full((200, 200, 3), 255, dtype=np.uint8)]) is None
+
+
+if __name__ == "__main__":
+    test_secure_qr_decodes_to_entities()
+    test_legacy_xml_qr_has_full_uid()
+    test_uid_suffix_match()
+    test_fast_path_on_rendered_qr()
+    print("✅ Aadhaar QR tests passed!")
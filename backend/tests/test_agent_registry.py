@@ -0,0 +1,101 @@
+import sys
+import os
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import ocr_agents.registry as registry
+
+
+class WorkingAgent:
+    constructed = 0
+
+    def __init__(self):
+        WorkingAgent.constructed += 1
+
+    def extract(self, image):
+        return {"agent": "working", "text": "", "confidence": 0.0}
+
+
+class ErrorResultAgent:
+    """Like PaddleOCRAgent: catches its inference error and returns it."""
+
+    def extract(self, image):
+        return {"agent": "error_result", "error": "inference backend crashed"}
+
+
+class BrokenAgent:
+    def __init__(self):
+        raise RuntimeError("model files missing")
+
+
+def _with_factories(factories, required):
+    def wrap(test):
+        def run():
+            original = registry.AGENT_FACTORIES, registry.REQUIRED_AGENTS
+            registry.AGENT_FACTORIES, registry.REQUIRED_AGENTS = factories, required
+            registry.reset_agents()
+            try:
+                test()
+            finally:
+                registry.AGENT_FACTORIES, registry.REQUIRED_AGENTS = original
+                registry.reset_agents()
+        run.__name__ = test.__name__
+        return run
+    return wrap
+
+
+@_with_factories({"working": WorkingAgent, "broken": BrokenAgent}, ("working",))
+def test_get_agent_constructs_once_and_remembers_failures():
+    WorkingAgent.constructed = 0
+    assert registry.get_agent("working") is registry.get_agent("working")
+    assert WorkingAgent.constructed == 1
+    assert registry.get_agent("broken") is None
+    assert registry.readiness()["agents"] == {"working": "loaded", "broken": "failed: model files missing"}
+
+
+@_with_factories({"working": WorkingAgent, "broken": BrokenAgent}, ("working",))
+def test_warmup_marks_working_agents_ready():
+    report = registry.warmup()
+    assert report["ready"] and not report["warming_up"]
+    assert report["agents"]["working"] == "ready"
+    assert report["agents"]["broken"].startswith("failed")
+
+
+@_with_factories({"working": WorkingAgent, "error_result": ErrorResultAgent}, ("error_result",))
+def test_error_result_during_warmup_is_not_ready():
+    report = registry.warmup()
+    assert not report["ready"]
+    assert report["agents"]["error_result"] == "failed: warmup failed: inference backend crashed"
+    assert report["agents"]["working"] == "ready"
+
+
+@_with_factories({"working": WorkingAgent, "broken": BrokenAgent}, ("working",))
+def test_ready_without_startup_warmup():
+    import ocr_agents
+
+    # Models load on first use: ready before any page, failures still count
+    assert not registry.readiness()["ready"]
+    assert registry.readiness(lazy=True)["ready"]
+
+    original = ocr_agents.AGENT_RUNNERS
+    ocr_agents.AGENT_RUNNERS = [("layout_agent", ocr_agents._run_layout)]
+    registry.AGENT_FACTORIES["layout_agent"] = WorkingAgent
+    try:
+        ocr_agents.run_ocr("unused.png", use_cache=False, policy="all")
+    finally:
+        ocr_agents.AGENT_RUNNERS = original
+    # The first successful page marks the agent ready, as warmup would
+    assert registry.readiness()["agents"]["layout_agent"] == "ready"
+
+    registry.REQUIRED_AGENTS = ("broken",)
+    assert registry.get_agent("broken") is None
+    assert not registry.readiness(lazy=True)["ready"]   # a failed model is never ready
+
+
+if __name__ == "__main__":
+    test_get_agent_constructs_once_and_remembers_failures()
+    test_warmup_marks_working_agents_ready()
+    test_error_result_during_warmup_is_not_ready()
+    test_ready_without_startup_warmup()
+    print("✅ agent registry tests passed!")
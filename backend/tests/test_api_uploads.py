@@ -0,0 +1,243 @@
+import sys
+import os
+import tempfile
+from pathlib import Path
+
+import cv2
+import fitz  # PyMuPDF
+import numpy as np
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+# The API creates its tables on import; use an in-memory database so the
+# upload flow can be exercised without MySQL.
+from sqlalchemy import create_engine
+import api.database as database
+database.engine = create_engine("sqlite://")
+
+from fastapi.testclient import TestClient
+import api.main as main
+
+client = TestClient(main.app)
+
+
+def _photo(seed):
+    """A decodable, sharp, well exposed photo that passes the quality gate."""
+    rng = np.random.default_rng(seed)
+    image = rng.integers(40, 220, size=(600, 900, 3), dtype=np.uint8)
+    return cv2.imencode(".png", image)[1].tobytes()
+
+
+def _patched(**stages):
+    """Replaces pipeline stages in api.main for one test; returns a restore callback."""
+    originals = {name: getattr(main, name) for name in stages}
+    for name, stage in stages.items():
+        setattr(main, name, stage)
+    return lambda: [setattr(main, name, stage) for name, stage in originals.items()]
+
+
+def _with_upload_dir(test):
+    def run():
+        original = main.BASE_DATA_DIR
+        with tempfile.TemporaryDirectory() as upload_dir:
+            main.BASE_DATA_DIR = Path(upload_dir)
+            try:
+                test()
+            finally:
+                main.BASE_DATA_DIR = original
+    run.__name__ = test.__name__
+    return run
+
+
+@_with_upload_dir
+def test_undecodable_images_are_rejected_with_422():
+    response = client.post(
+        "/session/bad-images/upload",
+        data={"document_type": "aadhaar"},
+        files=[("files", ("front.jpg", b"not an image", "image/jpeg")),
+               ("files", ("back.jpg", b"also not an image", "image/jpeg"))],
+    )
+    assert response.status_code == 422
+    assert "front.jpg: the image could not be decoded" in response.json()["detail"]
+
+
+@_with_upload_dir
+def test_partial_qr_still_extracts_missing_fields():
+    qr = {"full_name": {"value": "Abhishek Dixit", "confidence": 0.99},
+          "date_of_birth": {"value": "2004-09-27", "confidence": 0.99},
+          "gender": {"value": "MALE", "confidence": 0.99},
+          "address": {"value": "Kanpur, Uttar Pradesh", "confidence": 0.99},
+          "district": {"value": "Kanpur Nagar", "confidence": 0.99},
+          "tehsil": {"value": "Kanpur", "confidence": 0.99}}
+    calls = []
+
+    async def fake_extract(layer3_output, document_type, form_type, only_fields=None):
+        calls.append(only_fields)
+        return {"aadhaar_number": {"value": "470226297140", "confidence": 0.95},
+                "full_name": {"value": "Abhishek Dixt", "confidence": 0.8}}
+
+    restore = _patched(extract_from_qr=lambda pages: dict(qr),
+                       run_ocr_agents=lambda pages, document_type: {"ocr_outputs": []},
+                       extract_entities_async=fake_extract)
+    try:
+        response = client.post(
+            "/session/partial-qr/upload",
+            data={"document_type": "aadhaar"},
+            files=[("files", ("front.png", _photo(1), "image/png")),
+                   ("files", ("back.png", _photo(2), "image/png"))],
+        )
+    finally:
+        restore()
+
+    assert response.status_code == 200, response.text
+    assert calls == [["aadhaar_number"]]  # the LLM is asked only for what the QR lacked
+    entities = response.json()["current_entities"]
+    assert entities["aadhaar_number"]["value"] == "470226297140"
+    assert entities["full_name"]["value"] == "Abhishek Dixit"  # QR value wins
+
+
+@_with_upload_dir
+def test_text_layer_and_ocr_pages_get_distinct_indexes():
+    digital = fitz.open()
+    for line in ("Name: ABHISHEK DIXIT, Kanpur 208001", "Annual income: Rs 2,40,000 only"):
+        digital.new_page().insert_text((72, 72), line)
+    bundles = []
+
+    async def fake_extract(layer3_output, document_type, form_type, only_fields=None):
+        bundles.append(layer3_output)
+        return {}
+
+    restore = _patched(run_ocr_agents=lambda pages, document_type: {"ocr_outputs": [
+                           {"agent": "paddle_agent", "text": "photo", "confidence": 0.9, "page": 0}]},
+                       extract_entities_async=fake_extract)
+    try:
+        response = client.post(
+            "/session/mixed-pages/upload",
+            data={"document_type": "income_proof"},
+            files=[("files", ("statement.pdf", digital.tobytes(), "application/pdf")),
+                   ("files", ("salary_slip.png", _photo(4), "image/png"))],
+        )
+    finally:
+        restore()
+
+    assert response.status_code == 200, response.text
+    pages = {o["agent"]: [] for o in bundles[0]["ocr_outputs"]}
+    for output in bundles[0]["ocr_outputs"]:
+        pages[output["agent"]].append(output["page"])
+    assert pages == {"pdf_text_layer": [1, 2], "paddle_agent": [0]}
+
+
+@_with_upload_dir
+def test_qr_complete_for_the_form_skips_ocr():
+    # A birth certificate does not use the Aadhaar number the secure QR lacks
+    qr = {field: {"value": value, "confidence": 0.99} for field, value in (
+        ("full_name", "Abhishek Dixit"), ("date_of_birth", "2004-09-27"), ("gender", "MALE"),
+        ("address", "Kanpur, Uttar Pradesh"), ("fathers_name", "Ajay Kumar Dixit"))}
+
+    def fail(*args, **kwargs):
+        raise AssertionError("OCR + LLM should be skipped")
+
+    main.SESSIONS["qr-birth"] = {"store": main.EntityStore(), "form_type": "birth_certificate"}
+    restore = _patched(extract_from_qr=lambda pages: dict(qr), run_ocr_agents=fail, extract_entities_async=fail)
+    try:
+        response = client.post(
+            "/session/qr-birth/upload",
+            data={"document_type": "aadhaar"},
+            files=[("files", ("front.png", _photo(1), "image/png")),
+                   ("files", ("back.png", _photo(2), "image/png"))],
+        )
+    finally:
+        restore()
+
+    assert response.status_code == 200, response.text
+    assert response.json()["current_entities"]["fathers_name"]["value"] == "Ajay Kumar Dixit"
+
+
+AADHAAR_ENTITIES = {"aadhaar_number": {"value": "470226297140", "confidence": 0.98}}
+PAN_ENTITIES = {"pan_number": {"value": "IGDPD2933L", "confidence": 0.97}}
+
+
+def _defer_aadhaar_and_pan(session_id):
+    for document_type, pages in (("aadhaar", [_photo(1), _photo(2)]), ("pan", [_photo(3)])):
+        response = client.post(
+            f"/session/{session_id}/upload",
+            data={"document_type": document_type, "defer": "true"},
+            files=[("files", (f"page{i}.png", page, "image/png")) for i, page in enumerate(pages)],
+        )
+        assert response.status_code == 200, response.text
+    return response
+
+
+def _deferred_stages(batches, fail=False):
+    async def fake_batch(documents, form_type=None):
+        batches.append([d["document_type"] for d in documents])
+        if fail:
+            raise RuntimeError("model unavailable")
+        return [dict(AADHAAR_ENTITIES), dict(PAN_ENTITIES)]
+
+    return _patched(extract_from_qr=lambda pages: None,
+                    run_ocr_agents=lambda pages, document_type: {"ocr_outputs": []},
+                    extract_entities_batch_async=fake_batch)
+
+
+@_with_upload_dir
+def test_deferred_uploads_extracted_in_one_call():
+    batches = []
+    restore = _deferred_stages(batches)
+    try:
+        queued = _defer_aadhaar_and_pan("deferred-batch")
+        response = client.post("/session/deferred-batch/extract")
+    finally:
+        restore()
+
+    assert queued.json()["pending_documents"] == ["aadhaar", "pan"]
+    assert response.status_code == 200, response.text
+    assert batches == [["aadhaar", "pan"]]
+    entities = response.json()["current_entities"]
+    assert entities["aadhaar_number"]["value"] == "470226297140"
+    assert entities["pan_number"]["value"] == "IGDPD2933L"
+    assert not main.SESSIONS["deferred-batch"].get("pending_documents")
+
+
+@_with_upload_dir
+def test_failed_extraction_keeps_documents_queued():
+    batches = []
+    restore = _deferred_stages(batches, fail=True)
+    try:
+        _defer_aadhaar_and_pan("deferred-retry")
+        response = client.post("/session/deferred-retry/extract")
+    finally:
+        restore()
+
+    assert response.status_code == 500
+    pending = main.SESSIONS["deferred-retry"]["pending_documents"]
+    assert [d["document_type"] for d in pending] == ["aadhaar", "pan"]
+
+
+@_with_upload_dir
+def test_finalize_flushes_deferred_documents():
+    batches = []
+    restore = _deferred_stages(batches)
+    try:
+        _defer_aadhaar_and_pan("deferred-finalize")
+        response = client.post("/session/deferred-finalize/finalize")
+    finally:
+        restore()
+
+    assert response.status_code == 200, response.text
+    assert batches == [["aadhaar", "pan"]]
+    assert response.json()["aadhaar_number"] == "470226297140"
+    assert response.json()["pan_number"] == "IGDPD2933L"
+    assert not main.SESSIONS["deferred-finalize"].get("pending_documents")
+
+
+if __name__ == "__main__":
+    test_undecodable_images_are_rejected_with_422()
+    test_partial_qr_still_extracts_missing_fields()
+    test_qr_complete_for_the_form_skips_ocr()
+    test_text_layer_and_ocr_pages_get_distinct_indexes()
+    test_deferred_uploads_extracted_in_one_call()
+    test_failed_extraction_keeps_documents_queued()
+    test_finalize_flushes_deferred_documents()
+    print("✅ API upload tests passed!")
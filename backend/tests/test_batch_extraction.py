@@ -0,0 +1,80 @@
+import sys
+import os
+import asyncio
+import json
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import llm_engine.extractor as extractor
+
+AADHAAR_BUNDLE = {
+    "ocr_outputs": [
+        {"agent": "paddle_agent", "text": "Abhishek Dixit DOB: 27/09/2004 MALE 4702 2629 7140", "confidence": 0.89}
+    ]
+}
+PAN_BUNDLE = {
+    "ocr_outputs": [
+        {"agent": "paddle_agent", "text": "INCOME TAX DEPARTMENT IGDPD2933L ABHISHEK DIXIT", "confidence": 0.87}
+    ]
+}
+
+
+def test_documents_extracted_in_one_call():
+    prompts = []
+
+    def fake_cli(prompt, model_name, timeout, json_mode=False):
+        prompts.append(prompt)
+        return json.dumps({
+            "doc1_aadhaar": {"full_name": {"value": "Abhishek Dixit", "confidence": 0.9}},
+            "doc2_pan": {"full_name": {"value": "ABHISHEK DIXIT", "confidence": 0.9},
+                         "pan_number": {"value": "IGDPD2933X", "confidence": 0.6}},
+        })
+
+    original = extractor._run_cli
+    extractor._run_cli = fake_cli
+    try:
+        aadhaar, pan = asyncio.run(extractor.extract_entities_batch_async(
+            [{"document_type": "aadhaar", "ocr_bundle": AADHAAR_BUNDLE},
+             {"document_type": "pan", "ocr_bundle": PAN_BUNDLE}],
+            backend="cli", use_cache=False))
+    finally:
+        extractor._run_cli = original
+
+    assert len(prompts) == 1
+    assert '"doc1_aadhaar": {' in prompts[0] and '"doc2_pan": {' in prompts[0]
+    assert "IGDPD2933L" in prompts[0] and "4702 2629 7140" in prompts[0]
+
+    assert aadhaar["full_name"]["value"] == "Abhishek Dixit"
+    assert aadhaar["aadhaar_number"]["value"] == "470226297140"   # from the rules
+    assert pan["full_name"]["value"] == "ABHISHEK DIXIT"
+    assert pan["pan_number"]["value"] == "IGDPD2933L"             # rule value wins
+
+
+def test_documents_completed_by_rules_are_not_sent():
+    def fail_cli(*args):
+        raise AssertionError("LLM should not be called")
+
+    bundle = {"ocr_outputs": [{
+        "agent": "paddle_agent",
+        "text": "IGDPD2933L Name ABHISHEK DIXIT Father's Name AJAY KUMAR DIXIT Date of Birth 27/09/2004",
+        "confidence": 0.87,
+        "boxes": [{"text": t} for t in ("IGDPD2933L", "Name", "ABHISHEK DIXIT", "Father's Name",
+                                        "AJAY KUMAR DIXIT", "Date of Birth", "27/09/2004")],
+    }]}
+    original = extractor._run_cli
+    extractor._run_cli = fail_cli
+    try:
+        (pan,) = asyncio.run(extractor.extract_entities_batch_async(
+            [{"document_type": "pan", "ocr_bundle": bundle, "only_fields": ["pan_number", "date_of_birth"]}],
+            backend="cli", use_cache=False))
+    finally:
+        extractor._run_cli = original
+    assert pan["pan_number"]["value"] == "IGDPD2933L"
+    assert pan["date_of_birth"]["value"] == "2004-09-27"
+
+
+if __name__ == "__main__":
+    test_documents_extracted_in_one_call()
+    test_documents_completed_by_rules_are_not_sent()
+    print("✅ batch extraction tests passed!")
@@ -0,0 +1,146 @@
+import sys
+import os
+import tempfile
+import time
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+from utils.cache import TieredCache, stable_hash
+import llm_engine.extractor as extractor
+from llm_engine.cache import llm_cache, llm_cache_key
+from ocr_agents.cache import ocr_cache
+
+
+def test_stable_hash_ignores_key_order():
+    assert stable_hash({"a": 1, "b": 2}) == stable_hash({"b": 2, "a": 1})
+    assert stable_hash(b"img", {"a": 1}) != stable_hash(b"img", {"a": 2})
+
+
+def test_memory_tier_is_lru():
+    cache = TieredCache("test", max_items=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}   # 'a' becomes most recent
+    cache.set("c", {"v": 3})            # evicts 'b'
+    assert cache.get("b") is None
+    assert cache.get("c") == {"v": 3}
+
+    stats = cache.stats()
+    assert stats["memory_hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+
+
+def test_disk_tier_survives_memory_eviction_and_is_size_bounded():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TieredCache("test", max_items=1, disk_dir=tmp, max_disk_bytes=200)
+        cache.set("a", {"text": "x" * 50})
+        cache.set("b", {"text": "y" * 50})
+        # 'a' fell out of memory but is still on disk
+        assert cache.get("a") == {"text": "x" * 50}
+        assert cache.stats()["disk_hits"] == 1
+
+        for i in range(5):
+            cache.set(f"k{i}", {"text": "z" * 50})
+        assert cache.stats()["disk_bytes"] <= 200
+
+        # A fresh instance picks up what is left on disk
+        reopened = TieredCache("test", max_items=1, disk_dir=tmp, max_disk_bytes=200)
+        assert reopened.get("k4") == {"text": "z" * 50}
+
+
+def test_disk_dir_created_on_first_write():
+    with tempfile.TemporaryDirectory() as tmp:
+        disk_dir = os.path.join(tmp, "ocr")
+        cache = TieredCache("test", disk_dir=disk_dir)
+        assert not os.path.exists(disk_dir)
+        assert cache.get("k") is None
+        cache.set("k", {"v": 1})
+        assert os.path.isdir(disk_dir)
+
+
+def test_disk_limit_holds_across_processes_sharing_the_directory():
+    with tempfile.TemporaryDirectory() as tmp:
+        # Two instances stand in for two worker processes; neither sees the
+        # other's writes in its own byte count.
+        first = TieredCache("test", max_items=1, disk_dir=tmp, max_disk_bytes=300)
+        second = TieredCache("test", max_items=1, disk_dir=tmp, max_disk_bytes=300)
+        second.disk_rescan_every = 1
+        for i in range(3):
+            first.set(f"a{i}", {"text": "x" * 50})
+            second.set(f"b{i}", {"text": "y" * 50})
+        on_disk = sum(os.path.getsize(os.path.join(tmp, name)) for name in os.listdir(tmp))
+        assert on_disk <= 300
+        assert second.stats()["disk_bytes"] == on_disk
+
+
+def test_cached_values_are_copies():
+    cache = TieredCache("test")
+    value = {"ocr_outputs": [{"agent": "paddle_agent"}]}
+    cache.set("k", value)
+    value["ocr_outputs"][0]["page"] = 0
+    hit = cache.get("k")
+    assert "page" not in hit["ocr_outputs"][0]
+    hit["ocr_outputs"].append({})
+    assert len(cache.get("k")["ocr_outputs"]) == 1
+
+
+def test_entries_expire_after_ttl():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TieredCache("test", max_items=4, disk_dir=tmp, ttl_seconds=60)
+        cache.set("k", {"v": 1})
+        assert cache.get("k") == {"v": 1}
+
+        # Age the entry in both tiers
+        stored_at, value = cache._memory["k"]
+        cache._memory["k"] = (stored_at - 120, value)
+        path = cache._disk_path("k")
+        os.utime(path, (time.time(), path.stat().st_mtime - 120))
+
+        assert cache.get("k") is None
+        assert not path.exists()
+        assert cache.stats()["expired"] == 2
+
+
+def test_llm_results_are_memoized_per_template_bundle_and_model():
+    bundle = {"ocr_outputs": [{"agent": "paddle_agent", "text": "Abhishek  Dixit", "confidence": 0.8912}]}
+    jittered = {"ocr_outputs": [{"agent": "paddle_agent", "text": "Abhishek Dixit ", "confidence": 0.8899}]}
+    assert llm_cache_key("T", bundle, "m") == llm_cache_key("T", jittered, "m")
+    assert llm_cache_key("T", bundle, "m") != llm_cache_key("T2", bundle, "m")
+    assert llm_cache_key("T", bundle, "m") != llm_cache_key("T", bundle, "m2")
+
+    calls = []
+    original_run, original_cache = extractor._run_cli, extractor.llm_cache
+    extractor._run_cli = lambda prompt, model, timeout, json_mode=False: calls.append(model) or '{"full_name": {"value": "A", "confidence": 0.9}}'
+    extractor.llm_cache = TieredCache("llm-test")
+    try:
+        first = extractor.extract_entities(bundle, "aadhaar", backend="cli", use_cache=True)
+        second = extractor.extract_entities(jittered, "aadhaar", backend="cli", use_cache=True)
+        extractor.extract_entities(bundle, "pan", backend="cli", use_cache=True)
+    finally:
+        extractor._run_cli, extractor.llm_cache = original_run, original_cache
+    assert first == second
+    assert len(calls) == 2  # aadhaar once (second was a hit), pan once
+
+
+def test_results_stay_in_memory_by_default():
+    # OCR text and extracted entities are personal data: nothing on disk unless opted in
+    for cache, prefix in ((llm_cache, "LLM_CACHE"), (ocr_cache, "OCR_CACHE")):
+        if f"{prefix}_DIR" not in os.environ:
+            assert cache.disk_dir is None
+        if f"{prefix}_TTL_HOURS" not in os.environ:
+            assert cache.ttl_seconds == 3600
+
+
+if __name__ == "__main__":
+    test_stable_hash_ignores_key_order()
+    test_memory_tier_is_lru()
+    test_disk_tier_survives_memory_eviction_and_is_size_bounded()
+    test_disk_dir_created_on_first_write()
+    test_disk_limit_holds_across_processes_sharing_the_directory()
+    test_cached_values_are_copies()
+    test_entries_expire_after_ttl()
+    test_llm_results_are_memoized_per_template_bundle_and_model()
+    test_results_stay_in_memory_by_default()
+    print("✅ cache tests passed!")
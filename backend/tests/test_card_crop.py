@@ -0,0 +1,49 @@
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+from ingestion.image_preprocess import crop_card, find_card_quad
+
+
+def _photo_of_card():
+    """A flat 856x540 card pasted in perspective onto a textured background."""
+    rng = np.random.default_rng(0)
+    background = cv2.GaussianBlur(rng.integers(60, 100, (1500, 2000, 3)).astype(np.uint8), (9, 9), 0)
+    card = np.full((540, 856, 3), 235, dtype=np.uint8)
+    cv2.putText(card, "4702 2629 7140", (80, 300), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 4)
+
+    src = np.float32([[0, 0], [855, 0], [855, 539], [0, 539]])
+    dst = np.float32([[500, 400], [1400, 330], [1450, 900], [540, 980]])
+    matrix = cv2.getPerspectiveTransform(src, dst)
+    warped = cv2.warpPerspective(card, matrix, (2000, 1500))
+    mask = cv2.warpPerspective(np.full((540, 856), 255, dtype=np.uint8), matrix, (2000, 1500))
+    background[mask > 0] = warped[mask > 0]
+    return background
+
+
+def test_card_is_found_and_flattened():
+    photo = _photo_of_card()
+    quad = find_card_quad(photo)
+    assert quad is not None
+    # Corners within a few pixels of where the card was pasted
+    assert np.abs(quad - np.float32([[500, 400], [1400, 330], [1450, 900], [540, 980]])).max() < 15
+
+    card = crop_card(photo).bgr
+    assert card.shape[0] * card.shape[1] < 0.25 * photo.shape[0] * photo.shape[1]
+    assert 1.4 < card.shape[1] / card.shape[0] < 1.8
+
+
+def test_scan_without_background_is_unchanged():
+    scan = np.full((540, 856, 3), 235, dtype=np.uint8)
+    assert crop_card(scan).bgr is scan
+
+
+if __name__ == "__main__":
+    test_card_is_found_and_flattened()
+    test_scan_without_background_is_unchanged()
+    print("✅ card crop tests passed!")
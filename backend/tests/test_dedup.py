@@ -0,0 +1,79 @@
+import sys
+import os
+import tempfile
+
+import cv2
+import numpy as np
+from fastapi import HTTPException
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+from ingestion.dedup import dhash, hamming, dedupe_pages, MAX_DUPLICATE_DISTANCE
+from ingestion.quality import check_page_quality
+
+
+def _side(lines, block):
+    card = np.full((540, 856, 3), 235, dtype=np.uint8)
+    cv2.rectangle(card, block[0], block[1], (90, 90, 90), -1)
+    for i, line in enumerate(lines):
+        cv2.putText(card, line, (40 if block[0][0] > 400 else 260, 120 + i * 65),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.0, (20, 20, 20), 2)
+    cv2.putText(card, "4702 2629 7140", (250, 480), cv2.FONT_HERSHEY_SIMPLEX, 1.6, (0, 0, 0), 4)
+    return card
+
+
+FRONT = _side(["GOVERNMENT OF INDIA", "Abhishek Dixit", "DOB: 27/09/2004", "MALE"], ((40, 120), (230, 380)))
+BACK = _side(["Address:", "S/O Ajay Kumar Dixit,", "12/4 Kalyanpur,", "Uttar Pradesh 208017"], ((580, 120), (800, 340)))
+
+
+def _reshoot(img):
+    """Same side photographed again: shifted, exposure changed, recompressed, resized."""
+    shifted = cv2.warpAffine(img, np.float32([[1, 0, 6], [0, 1, -4]]), (856, 540), borderMode=cv2.BORDER_REPLICATE)
+    shifted = cv2.convertScaleAbs(shifted, alpha=1.05, beta=-10)
+    shifted = cv2.imdecode(cv2.imencode(".jpg", shifted, [cv2.IMWRITE_JPEG_QUALITY, 60])[1], cv2.IMREAD_COLOR)
+    return cv2.resize(shifted, (1000, 630))
+
+
+def test_near_duplicate_matches_but_other_side_does_not():
+    assert hamming(dhash(FRONT), dhash(_reshoot(FRONT))) <= MAX_DUPLICATE_DISTANCE
+    assert hamming(dhash(FRONT), dhash(BACK)) > MAX_DUPLICATE_DISTANCE
+
+
+def test_same_side_twice_is_rejected_for_front_back_documents():
+    assert len(dedupe_pages([FRONT, BACK], "aadhaar")) == 2
+    try:
+        dedupe_pages([FRONT, _reshoot(FRONT)], "aadhaar", labels=["front.jpg", "front2.jpg"])
+    except HTTPException as e:
+        assert e.status_code == 400 and "front.jpg and front2.jpg" in e.detail
+    else:
+        raise AssertionError("duplicate side was not rejected")
+
+
+def test_duplicates_are_dropped_for_other_documents():
+    pages = dedupe_pages([FRONT, BACK, FRONT.copy()], "pan")
+    assert len(pages) == 2 and pages[1] is BACK
+
+
+def test_unreadable_pages_are_left_to_the_quality_gate():
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for name in ("front.jpg", "back.jpg"):
+            paths.append(os.path.join(tmp, name))
+            with open(paths[-1], "wb") as f:
+                f.write(b"not an image")
+        assert len(dedupe_pages(paths, "aadhaar")) == 2
+        try:
+            check_page_quality(paths, ["front.jpg", "back.jpg"], mode="reject")
+        except HTTPException as e:
+            assert e.status_code == 422 and "could not be decoded" in e.detail
+        else:
+            raise AssertionError("unreadable pages passed the quality gate")
+
+
+if __name__ == "__main__":
+    test_near_duplicate_matches_but_other_side_does_not()
+    test_same_side_twice_is_rejected_for_front_back_documents()
+    test_duplicates_are_dropped_for_other_documents()
+    test_unreadable_pages_are_left_to_the_quality_gate()
+    print("✅ duplicate page tests passed!")
@@ -0,0 +1,97 @@
+import sys
+import os
+
+import numpy as np
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+from llm_engine.extractor import _prompt_view
+from ocr_agents.tesseract_agent import DigitOCRAgent, is_number_line
+
+
+class FakeBackend:
+    """Records each crop handed to Tesseract and reads back a fixed line."""
+    def __init__(self, reply="4702 2629 7140"):
+        self.calls = []
+        self.reply = reply
+
+    def image_to_string(self, gray, psm=None):
+        self.calls.append((gray.shape, psm))
+        return self.reply
+
+
+def _agent(backend):
+    agent = DigitOCRAgent.__new__(DigitOCRAgent)
+    agent.backend = backend
+    return agent
+
+
+PAGE = np.full((400, 600), 255, dtype=np.uint8)
+REGIONS = [
+    {"text": "GOVERNMENT OF INDIA", "confidence": 0.99, "box": [100, 20, 500, 60]},
+    {"text": "4702 2629 7140", "confidence": 0.91, "box": [150, 300, 450, 340]},
+    {"text": "DOB: 27/09/2004", "confidence": 0.9, "box": [150, 200, 400, 230]},
+]
+
+
+def test_number_lines():
+    assert is_number_line("4702 2629 7140")
+    assert is_number_line("DOB: 27/09/2004")
+    assert is_number_line("VID 9165124797481412")
+    assert is_number_line("X7014")
+    assert not is_number_line("GOVERNMENT OF INDIA")
+    assert not is_number_line("Address: Ward 12")
+    assert not is_number_line(None)
+
+
+def test_regions_mode_reads_only_number_lines():
+    backend = FakeBackend()
+    result = _agent(backend).extract(PAGE, regions=REGIONS)
+
+    assert result["mode"] == "regions"
+    assert result["text"] == "4702 2629 7140 4702 2629 7140"
+    assert result["confidence"] == 0.95
+    # Two number-line crops (not the header), padded by a quarter of the line height, read as single lines
+    assert backend.calls == [((60, 320), 7), ((44, 264), 7)]
+
+
+def test_page_mode_without_qualifying_regions():
+    backend = FakeBackend(reply="27 0")
+    for regions in (None, REGIONS[:1]):
+        result = _agent(backend).extract(PAGE, regions=regions)
+        assert result["mode"] == "page"
+        assert result["text"] == "27" and result["confidence"] == 0.6
+    assert backend.calls == [((400, 600), None)] * 2
+
+
+def test_unreadable_page_is_an_error_output():
+    result = _agent(FakeBackend()).extract("/nonexistent/page.png")
+    assert result["agent"] == "digit_agent" and "error" in result
+
+
+def test_prompt_view_strips_agent_internal_fields():
+    bundle = {
+        "ocr_outputs": [
+            {"agent": "paddle_agent", "text": "4702 2629 7140", "confidence": 0.9, "page": 0, "boxes": REGIONS},
+            {"agent": "digit_agent", "text": "470226297140", "confidence": 0.95, "page": 0, "mode": "regions"},
+        ],
+        "skipped_agents": [{"page": 0, "agent": "layout_agent"}],
+    }
+    view = _prompt_view(bundle)
+
+    assert view == {"ocr_outputs": [
+        {"agent": "paddle_agent", "text": "4702 2629 7140", "confidence": 0.9, "page": 0},
+        {"agent": "digit_agent", "text": "470226297140", "confidence": 0.95, "page": 0, "mode": "regions"},
+    ]}
+    assert "boxes" in bundle["ocr_outputs"][0] and "skipped_agents" in bundle   # input left intact
+    assert _prompt_view({"ocr_outputs": "raw"}) == {"ocr_outputs": "raw"}
+
+
+if __name__ == "__main__":
+    test_number_lines()
+    test_regions_mode_reads_only_number_lines()
+    test_page_mode_without_qualifying_regions()
+    test_unreadable_page_is_an_error_output()
+    test_prompt_view_strips_agent_internal_fields()
+    print("✅ digit agent tests passed!")
@@ -0,0 +1,100 @@
+import sys
+import os
+import time
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import ocr_agents
+from ocr_agents.cascade import missing_numeric_fields
+
+
+def _paddle(text, boxes, confidence=0.95):
+    return {"agent": "paddle_agent", "text": text, "confidence": confidence, "boxes": boxes}
+
+
+AADHAAR_FRONT = _paddle(
+    "Abhishek Dixit DOB: 27/09/2004 MALE 4702 2629 7140",
+    [
+        {"text": "Abhishek Dixit", "confidence": 0.97, "box": [0, 0, 10, 10]},
+        {"text": "DOB: 27/09/2004", "confidence": 0.96, "box": [0, 10, 10, 20]},
+        {"text": "4702 2629 7140", "confidence": 0.98, "box": [0, 20, 10, 30]},
+    ],
+)
+
+
+def test_clean_aadhaar_front_needs_no_digit_agent():
+    assert missing_numeric_fields(AADHAAR_FRONT, "aadhaar") == []
+
+
+def test_low_confidence_number_needs_digit_agent():
+    blurry = _paddle("4702 2629 7140", [{"text": "4702 2629 7140", "confidence": 0.7, "box": [0, 0, 1, 1]}])
+    assert missing_numeric_fields(blurry, "aadhaar") == ["aadhaar_number"]
+
+
+def test_dob_only_required_where_labelled():
+    back = _paddle("Address: Kanpur 4702 2629 7140",
+                   [{"text": "4702 2629 7140", "confidence": 0.95, "box": [0, 0, 1, 1]}])
+    assert missing_numeric_fields(back, "aadhaar") == []
+
+
+def test_unknown_document_type_runs_everything():
+    assert missing_numeric_fields(AADHAAR_FRONT, "voice") is None
+
+
+def test_cascade_reports_skipped_digit_agent():
+    calls = []
+    original = ocr_agents.AGENT_RUNNERS
+    ocr_agents.AGENT_RUNNERS = [
+        ("paddle_ocr", lambda page: AADHAAR_FRONT),
+        ("digit_ocr", lambda page: calls.append("digit") or {"agent": "digit_agent", "text": ""}),
+        ("layout_agent", lambda page: {"agent": "layout_agent"}),
+    ]
+    try:
+        result = ocr_agents.run_ocr("unused.png", use_cache=False, policy="cascade", document_type="aadhaar")
+    finally:
+        ocr_agents.AGENT_RUNNERS = original
+
+    assert calls == []
+    assert result["skipped_agents"] == ["digit_ocr"]
+    assert [o["agent"] for o in result["ocr_outputs"]] == ["paddle_agent", "layout_agent"]
+
+
+def test_cascade_digit_stage_is_bounded_by_the_agent_timeout():
+    blurry = _paddle("4702 2629 7140", [{"text": "4702 2629 7140", "confidence": 0.7, "box": [0, 0, 1, 1]}])
+    regions = []
+
+    def slow_digits(page, regions_arg=None):
+        regions.append(regions_arg)
+        time.sleep(2)
+        return {"agent": "digit_agent", "text": "470226297140"}
+
+    original_runners, original_tesseract = ocr_agents.AGENT_RUNNERS, ocr_agents._run_tesseract
+    ocr_agents.AGENT_RUNNERS = [
+        ("paddle_ocr", lambda page: blurry),
+        ("digit_ocr", slow_digits),
+        ("layout_agent", lambda page: {"agent": "layout_agent"}),
+    ]
+    ocr_agents._run_tesseract = slow_digits
+    try:
+        for digit_mode in ("page", "regions"):
+            start = time.time()
+            result = ocr_agents.run_ocr("unused.png", concurrent=True, timeout=0.3, use_cache=False,
+                                        digit_mode=digit_mode, policy="cascade", document_type="aadhaar")
+            assert time.time() - start < 1.5
+            digit = result["ocr_outputs"][1]
+            assert digit == {"agent": "digit_ocr", "error": "Timed out after 0.3s"}
+    finally:
+        ocr_agents.AGENT_RUNNERS, ocr_agents._run_tesseract = original_runners, original_tesseract
+
+    assert regions == [None, blurry["boxes"]]   # region mode reads the stage-1 Paddle boxes
+
+
+if __name__ == "__main__":
+    test_clean_aadhaar_front_needs_no_digit_agent()
+    test_low_confidence_number_needs_digit_agent()
+    test_dob_only_required_where_labelled()
+    test_unknown_document_type_runs_everything()
+    test_cascade_reports_skipped_digit_agent()
+    test_cascade_digit_stage_is_bounded_by_the_agent_timeout()
+    print("✅ cascade tests passed!")
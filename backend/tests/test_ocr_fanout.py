@@ -0,0 +1,48 @@
+import sys
+import os
+import time
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import ocr_agents
+
+
+def _fast_agent(image_path):
+    return {"agent": "fast", "text": "1234", "confidence": 0.9}
+
+
+def _slow_agent(image_path):
+    time.sleep(2)
+    return {"agent": "slow", "text": "late", "confidence": 0.9}
+
+
+def _broken_agent(image_path):
+    raise ValueError("boom")
+
+
+def test_concurrent_fanout_returns_partial_results():
+    original = ocr_agents.AGENT_RUNNERS
+    ocr_agents.AGENT_RUNNERS = [
+        ("fast", _fast_agent),
+        ("slow", _slow_agent),
+        ("broken", _broken_agent),
+    ]
+    try:
+        start = time.time()
+        result = ocr_agents.run_ocr("unused.png", concurrent=True, timeout=0.5, use_cache=False)
+        elapsed = time.time() - start
+    finally:
+        ocr_agents.AGENT_RUNNERS = original
+
+    outputs = result["ocr_outputs"]
+    assert elapsed < 1.5
+    assert [o["agent"] for o in outputs] == ["fast", "slow", "broken"]
+    assert outputs[0]["text"] == "1234"
+    assert "Timed out" in outputs[1]["error"]
+    assert outputs[2]["error"] == "boom"
+
+
+if __name__ == "__main__":
+    test_concurrent_fanout_returns_partial_results()
+    print("✅ test_concurrent_fanout_returns_partial_results passed!")
@@ -0,0 +1,100 @@
+import sys
+import os
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+from llm_engine.ollama_client import OllamaClient
+from llm_engine.extractor import extract_entities, extract_entities_async
+from llm_engine.prompt_registry import get_prompt, output_schema
+
+ENTITIES = {"full_name": {"value": "Abhishek Dixit", "confidence": 0.95}}
+
+
+class StubOllama(BaseHTTPRequestHandler):
+    """Answers /api/generate like Ollama and records each request."""
+    protocol_version = "HTTP/1.1"  # keep-alive
+    requests = []
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        StubOllama.requests.append({"path": self.path, "body": body, "client": self.client_address})
+        reply = json.dumps({"model": body["model"], "response": json.dumps(ENTITIES), "done": True}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(reply)))
+        self.end_headers()
+        self.wfile.write(reply)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_sync_calls_reuse_one_connection():
+    server = _start_stub()
+    StubOllama.requests = []
+    client = OllamaClient(host=f"127.0.0.1:{server.server_port}", keep_alive="10m")
+    try:
+        for _ in range(3):
+            assert json.loads(client.generate("prompt", "qwen2:7b-instruct")) == ENTITIES
+    finally:
+        client.close()
+        server.shutdown()
+
+    assert [r["path"] for r in StubOllama.requests] == ["/api/generate"] * 3
+    assert StubOllama.requests[0]["body"]["keep_alive"] == "10m"
+    assert StubOllama.requests[0]["body"]["stream"] is False
+    # Same client port every time: the TCP connection was kept alive
+    assert len({r["client"] for r in StubOllama.requests}) == 1
+
+
+def test_extractor_sync_and_async_entry_points():
+    import llm_engine.ollama_client as ollama_client
+
+    server = _start_stub()
+    original = ollama_client._default_client
+    ollama_client._default_client = OllamaClient(host=f"http://127.0.0.1:{server.server_port}")
+    try:
+        bundle = {"ocr_outputs": [{"agent": "paddle_agent", "text": "Abhishek Dixit", "confidence": 0.9}]}
+        StubOllama.requests = []
+        assert extract_entities(bundle, "aadhaar", backend="http", use_cache=False) == ENTITIES
+        assert StubOllama.requests[0]["body"]["format"] == output_schema(get_prompt("aadhaar"))
+
+        async def run_async():
+            try:
+                return await extract_entities_async(bundle, "aadhaar", backend="http", use_cache=False)
+            finally:
+                await ollama_client.close_ollama_client()
+
+        assert asyncio.run(run_async()) == ENTITIES
+    finally:
+        ollama_client._default_client = original
+        server.shutdown()
+
+
+def test_output_schema_from_prompt():
+    schema = output_schema(get_prompt("pan"))
+    assert schema["required"] == ["full_name", "fathers_name", "date_of_birth", "pan_number"]
+    assert schema["additionalProperties"] is False
+    pan = schema["properties"]["pan_number"]["properties"]["value"]
+    assert pan["pattern"] == "^[A-Z0-9]{10}$" and "null" in pan["type"]
+    gender = output_schema(get_prompt("voter_id"))["properties"]["gender"]["properties"]["value"]
+    assert gender["enum"] == ["MALE", "FEMALE", "OTHER", None]
+    assert output_schema(get_prompt("unknown")) is None
+
+
+if __name__ == "__main__":
+    test_sync_calls_reuse_one_connection()
+    test_extractor_sync_and_async_entry_points()
+    test_output_schema_from_prompt()
+    print("✅ Ollama client tests passed!")
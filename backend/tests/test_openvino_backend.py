@@ -0,0 +1,96 @@
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import ocr_agents.openvino_backend as openvino_backend
+from ocr_agents.openvino_backend import OpenVINOOCR
+
+MODEL_DIR = os.getenv("OPENVINO_MODEL_DIR", "models/ppocr_openvino")
+
+
+def _pipeline():
+    """An OpenVINOOCR without compiled models, for the pure post-processing helpers."""
+    ocr = OpenVINOOCR.__new__(OpenVINOOCR)
+    ocr.characters = ["blank", "a", "b", "c", " "]
+    return ocr
+
+
+def _rect_contour(x1, y1, x2, y2):
+    return np.array([[[x1, y1]], [[x2, y1]], [[x2, y2]], [[x1, y2]]], dtype=np.int32)
+
+
+def test_min_box_orders_corners_clockwise_from_top_left():
+    box, short_side = OpenVINOOCR._min_box(_rect_contour(10, 20, 50, 40))
+    assert box.tolist() == [[10, 20], [50, 20], [50, 40], [10, 40]]
+    assert short_side == 20
+
+
+def test_box_score_is_the_mean_probability_inside_the_contour():
+    prob = np.zeros((64, 64), dtype=np.float32)
+    prob[20:41, 10:51] = 0.8
+    assert abs(OpenVINOOCR._box_score(prob, _rect_contour(10, 20, 50, 40)) - 0.8) < 1e-6
+
+    prob[20:41, 30:51] = 0.0   # right half below threshold
+    assert 0.3 < OpenVINOOCR._box_score(prob, _rect_contour(10, 20, 50, 40)) < 0.5
+
+
+def test_unclip_grows_the_box_with_and_without_pyclipper():
+    box = np.array([[10, 10], [50, 10], [50, 30], [10, 30]], dtype=np.float32)
+    area = cv2.contourArea(box)
+    original = openvino_backend.pyclipper
+    try:
+        for clipper in {original, None}:
+            openvino_backend.pyclipper = clipper
+            expanded = _pipeline()._unclip(box)
+            assert cv2.contourArea(expanded.astype(np.float32)) > area
+            x, y, w, h = cv2.boundingRect(expanded.astype(np.int32))
+            assert x < 10 and y < 10 and x + w > 50 and y + h > 30
+    finally:
+        openvino_backend.pyclipper = original
+
+    assert _pipeline()._unclip(np.zeros((4, 2), dtype=np.float32)) is None   # degenerate box
+
+
+def test_ctc_decode_collapses_repeats_and_drops_blanks():
+    steps = [1, 1, 0, 1, 2, 2, 4, 3]   # a a _ a b b ' ' c
+    pred = np.full((len(steps), 5), 0.01, dtype=np.float32)
+    for t, index in enumerate(steps):
+        pred[t, index] = 0.9 if t != 3 else 0.6
+
+    text, confidence = _pipeline()._ctc_decode(pred)
+    assert text == "aab c"
+    assert abs(confidence - (0.9 + 0.6 + 0.9 + 0.9 + 0.9) / 5) < 1e-6
+
+    assert _pipeline()._ctc_decode(np.eye(5, dtype=np.float32)[[0, 0]]) == ("", 0.0)
+
+
+def test_extract_output_shape():
+    import pytest
+    if openvino_backend.ov is None or not os.path.isdir(MODEL_DIR):
+        pytest.skip("openvino or the exported PP-OCR models are not available")
+    from ocr_agents.paddle_agent import PaddleOCRAgent
+
+    agent = PaddleOCRAgent.__new__(PaddleOCRAgent)
+    agent.ocr = openvino_backend.create_openvino_ocr()
+    agent.batcher = None
+    page = np.full((200, 640, 3), 255, dtype=np.uint8)
+    cv2.putText(page, "ABCDE1234F", (20, 120), cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 0), 4)
+
+    result = agent.extract(page)
+    assert "error" not in result
+    assert isinstance(result["text"], str) and 0.0 <= result["confidence"] <= 1.0
+    for box in result["boxes"]:
+        assert set(box) == {"text", "confidence", "box"} and len(box["box"]) == 4
+
+
+if __name__ == "__main__":
+    test_min_box_orders_corners_clockwise_from_top_left()
+    test_box_score_is_the_mean_probability_inside_the_contour()
+    test_unclip_grows_the_box_with_and_without_pyclipper()
+    test_ctc_decode_collapses_repeats_and_drops_blanks()
+    print("✅ OpenVINO backend tests passed!")
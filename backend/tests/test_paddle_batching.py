@@ -0,0 +1,107 @@
+import sys
+import os
+import threading
+import time
+import types
+
+import numpy as np
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+from ocr_agents.batching import BatchingOCRService
+
+
+class FakeOCR:
+    """Echoes each input back so routing can be checked."""
+    def __init__(self):
+        self.batch_sizes = []
+
+    def ocr(self, images):
+        self.batch_sizes.append(len(images))
+        return [{"rec_texts": [f"img-{img}"], "rec_scores": [0.99]} for img in images]
+
+
+def test_concurrent_calls_are_batched_and_routed_back():
+    fake = FakeOCR()
+    service = BatchingOCRService(fake, max_batch_size=8, max_wait_ms=200)
+    results = {}
+
+    def call(i):
+        results[i] = service.infer(i)
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    service.close()
+
+    for i in range(6):
+        assert results[i] == [{"rec_texts": [f"img-{i}"], "rec_scores": [0.99]}]
+    assert sum(fake.batch_sizes) == 6
+    assert len(fake.batch_sizes) < 6
+    assert max(fake.batch_sizes) <= 8
+
+
+def test_batch_failure_is_raised_to_every_caller():
+    class BrokenOCR:
+        def ocr(self, images):
+            raise RuntimeError("model crashed")
+
+    service = BatchingOCRService(BrokenOCR(), max_batch_size=4, max_wait_ms=10)
+    try:
+        service.infer("page")
+        assert False, "expected RuntimeError"
+    except RuntimeError as e:
+        assert "model crashed" in str(e)
+    finally:
+        service.close()
+
+
+class ThreadUnsafeOCR:
+    """Stands in for a PaddleOCR predictor; fails if two threads call it at once."""
+    def __init__(self, **params):
+        self.busy = threading.Lock()
+        self.calls = 0
+
+    def ocr(self, img):
+        assert self.busy.acquire(blocking=False), "predictor called concurrently"
+        try:
+            time.sleep(0.02)
+            self.calls += 1
+            return [{"rec_texts": ["IGDPD2933L"], "rec_scores": [0.99], "rec_boxes": [[0, 0, 10, 10]]}]
+        finally:
+            self.busy.release()
+
+
+def test_direct_inference_is_serialized_across_threads():
+    from ocr_agents.paddle_agent import PaddleOCRAgent
+
+    original = sys.modules.get("paddleocr")
+    sys.modules["paddleocr"] = types.SimpleNamespace(PaddleOCR=ThreadUnsafeOCR)
+    try:
+        agent = PaddleOCRAgent(batch_size=1)
+    finally:
+        if original is None:
+            sys.modules.pop("paddleocr", None)
+        else:
+            sys.modules["paddleocr"] = original
+
+    page = np.full((64, 256, 3), 255, dtype=np.uint8)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(agent.extract(page))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert agent.batcher is None and agent.ocr.calls == 8
+    assert all(r.get("text") == "IGDPD2933L" for r in results), results
+
+
+if __name__ == "__main__":
+    test_concurrent_calls_are_batched_and_routed_back()
+    test_batch_failure_is_raised_to_every_caller()
+    test_direct_inference_is_serialized_across_threads()
+    print("✅ batching tests passed!")
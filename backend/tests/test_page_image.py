@@ -0,0 +1,95 @@
+import sys
+import os
+import pickle
+import tempfile
+
+import cv2
+import numpy as np
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import ocr_agents.page as page_module
+from ocr_agents.page import PageImage
+
+
+def _image(h=300, w=800):
+    return np.random.default_rng(0).integers(0, 255, size=(h, w, 3), dtype=np.uint8)
+
+
+def test_variants_are_derived_lazily_and_once():
+    reads = []
+    original = page_module.cv2.imread
+
+    def counting_imread(path, *args):
+        reads.append(path)
+        return original(path, *args)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "front.png")
+        cv2.imwrite(path, _image())
+        page_module.cv2.imread = counting_imread
+        try:
+            page = PageImage(path=path)
+            assert reads == []                       # nothing decoded up front
+            assert page.bgr.shape == (300, 800, 3)
+            gray = page.gray
+            small = page.downscaled(400)
+            assert page.gray is gray and page.downscaled(400) is small
+            assert reads == [path]                   # decoded exactly once
+        finally:
+            page_module.cv2.imread = original
+
+    assert gray.shape == (300, 800)
+    assert small.shape == (150, 400, 3)
+    assert page.downscaled(2048) is page.bgr         # already small enough
+
+
+def test_gray_page_is_its_own_grayscale():
+    image = _image()[:, :, 0]
+    page = PageImage(image=image)
+    assert page.gray is image
+
+
+def test_coerce_wraps_paths_and_arrays():
+    image = _image()
+    from_array = PageImage.coerce(image)
+    assert from_array.bgr is image and from_array.name == "<in-memory page>"
+    assert PageImage.coerce(from_array) is from_array
+
+    from_path = PageImage.coerce("data/pages/front.png")
+    assert from_path.path == "data/pages/front.png" and from_path.name == "data/pages/front.png"
+
+
+def test_unreadable_file_yields_none():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corrupt.jpg")
+        with open(path, "wb") as f:
+            f.write(b"not an image")
+        page = PageImage.coerce(path)
+        assert page.bgr is None and page.gray is None and page.downscaled(512) is None
+        assert PageImage.coerce(os.path.join(tmp, "missing.jpg")).bgr is None
+
+    try:
+        PageImage()
+        assert False, "a page needs a source"
+    except ValueError:
+        pass
+
+
+def test_pickling_ships_only_the_source():
+    page = PageImage(image=_image())
+    page.gray, page.downscaled(400)
+    copy = pickle.loads(pickle.dumps(page))
+    assert copy._gray is None and copy._scaled == {}
+    assert np.array_equal(copy.bgr, page.bgr)
+    assert copy.digest() == page.digest()
+
+
+if __name__ == "__main__":
+    test_variants_are_derived_lazily_and_once()
+    test_gray_page_is_its_own_grayscale()
+    test_coerce_wraps_paths_and_arrays()
+    test_unreadable_file_yields_none()
+    test_pickling_ships_only_the_source()
+    print("✅ PageImage tests passed!")
@@ -0,0 +1,67 @@
+import sys
+import os
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import ocr_agents.aggregator as aggregator
+
+PAGES = [f"page{i}.png" for i in range(4)]
+
+
+def _fake_run_ocr(image_path, document_type=None):
+    # Earlier pages finish last, so completion order differs from page order
+    index = PAGES.index(image_path)
+    time.sleep(0.05 * (len(PAGES) - index))
+    return {"ocr_outputs": [{"agent": "paddle_agent", "text": f"{document_type} {image_path}", "confidence": 0.9,
+                             "worker": os.getpid()}],
+            "skipped_agents": ["digit_ocr"] if index % 2 else []}
+
+
+def test_parallel_pages_match_serial_order():
+    original_run_ocr, original_pool, original_setting = aggregator.run_ocr, aggregator._page_pool, \
+        aggregator.PARALLEL_PAGES
+    aggregator.run_ocr, aggregator.PARALLEL_PAGES = _fake_run_ocr, True   # OCR_PARALLEL_PAGES=true
+    # Forked workers inherit the patched run_ocr (the real pool spawns and warms models)
+    aggregator._page_pool = ProcessPoolExecutor(max_workers=len(PAGES),
+                                                mp_context=multiprocessing.get_context("fork"))
+    try:
+        serial = aggregator.run_ocr_agents(PAGES, document_type="aadhaar", parallel=False)
+        parallel = aggregator.run_ocr_agents(PAGES, document_type="aadhaar")
+    finally:
+        aggregator.shutdown_page_pool()
+        aggregator.run_ocr, aggregator._page_pool, aggregator.PARALLEL_PAGES = \
+            original_run_ocr, original_pool, original_setting
+
+    workers = {o.pop("worker") for o in parallel["ocr_outputs"]}
+    assert workers and os.getpid() not in workers   # really ran in the pool
+    for output in serial["ocr_outputs"]:
+        output.pop("worker")
+
+    assert parallel == serial
+    assert [(o["page"], o["text"]) for o in parallel["ocr_outputs"]] == [
+        (i, f"aadhaar {page}") for i, page in enumerate(PAGES)]
+    assert parallel["skipped_agents"] == [{"page": 1, "agent": "digit_ocr"}, {"page": 3, "agent": "digit_ocr"}]
+
+
+def test_parallel_failure_falls_back_to_serial():
+    class BrokenPool:
+        def map(self, *args):
+            raise RuntimeError("worker died")
+
+    original_run_ocr, original_pool = aggregator.run_ocr, aggregator._page_pool
+    aggregator.run_ocr, aggregator._page_pool = _fake_run_ocr, BrokenPool()
+    try:
+        result = aggregator.run_ocr_agents(PAGES[:2], parallel=True)
+    finally:
+        aggregator.run_ocr, aggregator._page_pool = original_run_ocr, original_pool
+    assert [o["page"] for o in result["ocr_outputs"]] == [0, 1]
+
+
+if __name__ == "__main__":
+    test_parallel_pages_match_serial_order()
+    test_parallel_failure_falls_back_to_serial()
+    print("✅ parallel page OCR tests passed!")
@@ -0,0 +1,99 @@
+import sys
+import os
+import io
+import tempfile
+
+import fitz  # PyMuPDF
+from fastapi import HTTPException, UploadFile
+from starlette.datastructures import Headers
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import ingestion.validators as validators
+from ingestion.pdf_document import PDFDocument, is_pdf_upload, open_pdf
+
+
+def _pdf(pages):
+    doc = fitz.open()
+    for i in range(pages):
+        doc.new_page().insert_text((72, 72), f"page {i + 1}")
+    return doc.tobytes()
+
+
+def _upload(data, filename="card.pdf", content_type="application/pdf"):
+    return UploadFile(file=io.BytesIO(data), filename=filename, headers=Headers({"content-type": content_type}))
+
+
+def test_pdf_document_parses_once_and_saves_the_original_bytes():
+    data = _pdf(2)
+    upload = _upload(data)
+    with tempfile.TemporaryDirectory() as tmp, PDFDocument.from_upload(upload) as pdf:
+        assert upload.file.tell() == 0   # rewound for anyone reading the upload again
+        assert pdf.name == "card.pdf" and pdf.page_count == 2 and not pdf.needs_pass
+        path = os.path.join(tmp, "card.pdf")
+        pdf.save(path)
+        assert pdf.path == path
+        with open(path, "rb") as f:
+            assert f.read() == data
+    assert pdf.doc.is_closed
+    pdf.close()   # closing twice is harmless
+
+
+def test_is_pdf_upload_checks_type_and_extension():
+    assert is_pdf_upload(_upload(b"", "scan.bin", "application/pdf"))
+    assert is_pdf_upload(_upload(b"", "SCAN.PDF", "application/octet-stream"))
+    assert not is_pdf_upload(_upload(b"", "front.jpg", "image/jpeg"))
+
+
+def test_open_pdf_closes_only_what_it_opened():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "card.pdf")
+        with open(path, "wb") as f:
+            f.write(_pdf(1))
+        with open_pdf(path) as doc:
+            assert doc.page_count == 1
+        assert doc.is_closed
+
+    with PDFDocument(_pdf(1)) as pdf:
+        with open_pdf(pdf) as doc:
+            assert doc is pdf.doc
+        assert not pdf.doc.is_closed
+
+        opened = fitz.open(stream=_pdf(1), filetype="pdf")
+        with open_pdf(opened) as doc:
+            assert doc is opened
+        assert not opened.is_closed
+
+
+def test_single_page_aadhaar_pdf_rejected_and_closed():
+    parsed = []
+    original = validators.PDFDocument
+
+    class TrackedPDF(PDFDocument):
+        @classmethod
+        def from_upload(cls, upload_file):
+            parsed.append(super().from_upload(upload_file))
+            return parsed[-1]
+
+    validators.PDFDocument = TrackedPDF
+    try:
+        validators.validate_upload_constraints([_upload(_pdf(1))], "aadhaar")
+        assert False, "a one-page Aadhaar PDF must be rejected"
+    except HTTPException as e:
+        assert e.status_code == 400 and "Found 1 page(s)" in e.detail
+    finally:
+        validators.PDFDocument = original
+    assert parsed[0].doc.is_closed
+
+    (pdf,) = validators.validate_upload_constraints([_upload(_pdf(2))], "aadhaar")
+    assert pdf.page_count == 2   # handed to the caller still open
+    pdf.close()
+
+
+if __name__ == "__main__":
+    test_pdf_document_parses_once_and_saves_the_original_bytes()
+    test_is_pdf_upload_checks_type_and_extension()
+    test_open_pdf_closes_only_what_it_opened()
+    test_single_page_aadhaar_pdf_rejected_and_closed()
+    print("✅ PDF document tests passed!")
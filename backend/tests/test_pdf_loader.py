@@ -0,0 +1,70 @@
+import sys
+import os
+import tempfile
+
+import fitz  # PyMuPDF
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import ingestion.pdf_loader as pdf_loader
+from ingestion.pdf_document import PDFDocument
+from ingestion.pdf_loader import pdf_to_arrays
+
+
+def _pdf(*sizes):
+    """PDF bytes with one page per (width, height) in points."""
+    doc = fitz.open()
+    for width, height in sizes:
+        doc.new_page(width=width, height=height).insert_text((20, 40), "IGDPD2933L")
+    return doc.tobytes()
+
+
+def test_pages_rendered_to_the_ocr_side_or_300_dpi():
+    a4, card = (595, 842), (243, 153)   # card: 85.6 x 54 mm
+    with PDFDocument(_pdf(a4, card)) as pdf:
+        big, small = pdf_to_arrays(pdf)
+
+    assert max(big.shape[:2]) == pdf_loader.OCR_TARGET_SIDE == 2048
+    assert big.shape[2] == 3   # BGR
+    # A small page is not upscaled past 300 DPI just to reach 2048 px
+    height, width = small.shape[:2]
+    assert abs(height - 153 * 300 / 72) <= 1 and abs(width - 243 * 300 / 72) <= 1
+
+    with PDFDocument(_pdf(a4)) as pdf:
+        (limited,) = pdf_to_arrays(pdf, max_side=1024)
+    assert max(limited.shape[:2]) == 1024
+
+
+def test_no_debug_artifacts_by_default():
+    assert not pdf_loader.DEBUG_ARTIFACTS
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pan.pdf")
+        with open(path, "wb") as f:
+            f.write(_pdf((243, 153)))
+        assert len(pdf_to_arrays(path)) == 1
+        assert os.listdir(tmp) == ["pan.pdf"]
+
+        debug_dir = os.path.join(tmp, "debug")
+        pdf_to_arrays(path, debug_dir=debug_dir)
+        assert os.listdir(debug_dir) == ["page_0.png"]
+
+
+def test_debug_artifacts_written_next_to_the_upload_when_enabled():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "pan.pdf")
+        with open(path, "wb") as f:
+            f.write(_pdf((243, 153), (243, 153)))
+        pdf_loader.DEBUG_ARTIFACTS = True
+        try:
+            pdf_to_arrays(path)
+        finally:
+            pdf_loader.DEBUG_ARTIFACTS = False
+        assert sorted(os.listdir(os.path.join(tmp, "pan_pages"))) == ["page_0.png", "page_1.png"]
+
+
+if __name__ == "__main__":
+    test_pages_rendered_to_the_ocr_side_or_300_dpi()
+    test_no_debug_artifacts_by_default()
+    test_debug_artifacts_written_next_to_the_upload_when_enabled()
+    print("✅ PDF loader tests passed!")
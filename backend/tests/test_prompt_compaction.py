@@ -0,0 +1,89 @@
+import sys
+import os
+import json
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+from llm_engine.compaction import compact_bundle, estimate_tokens
+
+AADHAAR_BUNDLE = {
+    "ocr_outputs": [
+        {
+            "agent": "paddle_agent",
+            "modality": "printed_text",
+            "text": "Abhishek Dixit DOB: 27/09/2004 MALE 4702 2629 7140 VID : 9165 1247 9748 1412",
+            "confidence": 0.8912,
+            "page": 0,
+        },
+        {
+            "agent": "paddle_agent",
+            "modality": "printed_text",
+            "text": "Address: C/O Ajay Kumar Dixit, Kanpur Nagar, Uttar Pradesh - 208023   4702 2629 7140",
+            "confidence": 0.87,
+            "page": 1,
+        },
+        {"agent": "digit_agent", "modality": "numeric", "text": "27092004 470226297140 7014", "confidence": 0.95, "page": 0},
+        {"agent": "layout_agent", "modality": "layout", "rotation": 0, "photo_region": "right", "page": 0},
+        {"agent": "digit_agent", "error": "Tesseract not found", "page": 1},
+    ]
+}
+
+
+def test_compaction_drops_noise_and_repeated_numbers():
+    payload, report = compact_bundle(AADHAAR_BUNDLE, "aadhaar")
+    outputs = json.loads(payload)["ocr_outputs"]
+
+    assert [o["agent"] for o in outputs] == ["paddle_agent", "paddle_agent", "digit_agent"]
+    assert "4702 2629 7140" in outputs[0]["text"]
+    assert "4702" not in outputs[1]["text"]          # back-side repeat removed
+    assert outputs[2]["text"] == "7014"               # only what Paddle did not read
+    assert outputs[0]["confidence"] == 0.89
+    assert "modality" not in outputs[0] and "\n" not in payload
+    assert report["tokens_after"] < report["tokens_before"]
+
+
+def test_budget_is_enforced():
+    payload, report = compact_bundle(AADHAAR_BUNDLE, "aadhaar", budget=150)
+    assert report["trimmed"] and report["tokens_after"] <= 150
+    outputs = json.loads(payload)["ocr_outputs"]
+    assert [o["agent"] for o in outputs] == ["paddle_agent", "paddle_agent"]  # digit agent dropped first
+    assert outputs[0]["text"].startswith("Abhishek Dixit DOB: 27/09/2004")
+
+
+def test_single_word_outputs_still_fit_the_budget():
+    # Digit runs with no spaces: the longest text is always one word
+    bundle = {"ocr_outputs": [{"agent": "paddle_agent", "text": str(10 ** 40 + i), "confidence": 0.9, "page": i}
+                              for i in range(6)]}
+    payload, report = compact_bundle(bundle, "pan", budget=200)
+    assert report["trimmed"] and report["tokens_after"] <= 200
+    outputs = json.loads(payload)["ocr_outputs"]
+    assert [o["text"] for o in outputs] == [str(10 ** 40), str(10 ** 40 + 1)]   # dropped from the end
+
+    single = {"ocr_outputs": [{"agent": "paddle_agent", "text": "7" * 200, "confidence": 0.9}]}
+    payload, report = compact_bundle(single, "pan", budget=60)
+    assert report["tokens_after"] <= 60
+    assert json.loads(payload)["ocr_outputs"][0]["text"].startswith("777")
+
+
+def test_voice_transcripts_are_never_trimmed():
+    transcript = " ".join(f"sentence {i} my pincode is 208023." for i in range(200))
+    bundle = {"ocr_outputs": [{"agent": "voice_agent", "text": transcript, "confidence": 0.9}]}
+    payload, report = compact_bundle(bundle, "voice")
+    assert not report["trimmed"] and report["budget"] is None
+    assert json.loads(payload)["ocr_outputs"][0]["text"] == transcript
+    assert report["tokens_after"] > 2000
+
+
+def test_token_estimate_counts_digits_individually():
+    assert estimate_tokens("470226297140") == 12
+    assert estimate_tokens("Dixit") == 2
+
+
+if __name__ == "__main__":
+    test_compaction_drops_noise_and_repeated_numbers()
+    test_budget_is_enforced()
+    test_single_word_outputs_still_fit_the_budget()
+    test_voice_transcripts_are_never_trimmed()
+    test_token_estimate_counts_digits_individually()
+    print("✅ prompt compaction tests passed!")
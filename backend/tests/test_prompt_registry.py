@@ -0,0 +1,52 @@
+import sys
+import os
+import json
+import tempfile
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import llm_engine.prompt_registry as prompt_registry
+from llm_engine.prompt_registry import clear_prompt_cache, get_prompt, output_schema, prompt_fields
+
+
+def test_prompt_pruned_to_form_fields():
+    fields = prompt_fields(get_prompt("aadhaar", "caste_certificate"))
+    assert fields == ["full_name", "aadhaar_number", "fathers_name"]  # what the caste form maps from
+    assert len(prompt_fields(get_prompt("aadhaar"))) == 14            # no form: full template
+    assert list(output_schema(get_prompt("aadhaar", "caste_certificate"))["required"]) == fields
+    get_prompt("aadhaar", "caste_certificate").format(ocr_data="{}")  # still a valid template
+
+
+def test_unknown_form_keeps_full_template():
+    assert get_prompt("pan", "no_such_form") == get_prompt("pan")
+
+
+def test_compiled_prompt_cached_per_document_and_form():
+    with tempfile.TemporaryDirectory() as schema_dir:
+        with open(os.path.join(schema_dir, "test_form.json"), "w") as f:
+            json.dump({"fields": {"applicant": {"name": {"type": "text", "source_entity": "full_name"}}}}, f)
+
+        original_dir = prompt_registry.FORM_SCHEMA_DIR
+        prompt_registry.FORM_SCHEMA_DIR = schema_dir
+        clear_prompt_cache()
+        try:
+            first = get_prompt("pan", "test_form")
+            assert prompt_fields(first) == ["full_name"]
+            assert get_prompt("pan", "test_form") is first  # served from the cache
+
+            # Republishing the form changes its fields once the cache is cleared
+            with open(os.path.join(schema_dir, "test_form.json"), "w") as f:
+                json.dump({"fields": {"pan": {"type": "text", "source_entity": "pan_number"}}}, f)
+            assert get_prompt("pan", "test_form") is first
+            clear_prompt_cache()
+            assert prompt_fields(get_prompt("pan", "test_form")) == ["pan_number"]
+        finally:
+            prompt_registry.FORM_SCHEMA_DIR = original_dir
+            clear_prompt_cache()
+
+if __name__ == "__main__":
+    test_prompt_pruned_to_form_fields()
+    test_unknown_form_keeps_full_template()
+    test_compiled_prompt_cached_per_document_and_form()
+    print("✅ prompt registry tests passed!")
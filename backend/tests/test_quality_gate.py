@@ -0,0 +1,50 @@
+import sys
+import os
+
+import cv2
+import numpy as np
+from fastapi import HTTPException
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+from ingestion.quality import assess_image_quality, check_page_quality
+
+
+def _card():
+    card = np.full((540, 856, 3), 235, dtype=np.uint8)
+    for i, line in enumerate(["GOVERNMENT OF INDIA", "Abhishek Dixit", "DOB: 27/09/2004", "MALE", "4702 2629 7140"]):
+        cv2.putText(card, line, (60, 80 + i * 90), cv2.FONT_HERSHEY_SIMPLEX, 1.3, (20, 20, 20), 3)
+    return card
+
+
+def test_sharp_card_passes():
+    assert assess_image_quality(_card())["issues"] == []
+
+
+def test_blurry_dark_and_tiny_photos_are_flagged():
+    card = _card()
+    assert assess_image_quality(cv2.GaussianBlur(card, (0, 0), 4))["issues"] == ["blur"]
+    assert "dark" in assess_image_quality((card * 0.12).astype(np.uint8))["issues"]
+    assert "resolution" in assess_image_quality(cv2.resize(card, (300, 190)))["issues"]
+
+
+def test_gate_rejects_with_actionable_message():
+    try:
+        check_page_quality([_card(), cv2.GaussianBlur(_card(), (0, 0), 4)], labels=["front.jpg", "back.jpg"])
+    except HTTPException as e:
+        assert e.status_code == 422
+        assert e.detail.startswith("back.jpg: image is too blurry")
+        assert "front.jpg" not in e.detail
+    else:
+        raise AssertionError("blurry page was not rejected")
+
+    # warn mode logs but lets the upload through
+    assert len(check_page_quality([cv2.GaussianBlur(_card(), (0, 0), 4)], mode="warn")) == 1
+
+
+if __name__ == "__main__":
+    test_sharp_card_passes()
+    test_blurry_dark_and_tiny_photos_are_flagged()
+    test_gate_rejects_with_actionable_message()
+    print("✅ quality gate tests passed!")
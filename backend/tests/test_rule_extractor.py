@@ -0,0 +1,128 @@
+import sys
+import os
+import json
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import llm_engine.extractor as extractor
+from llm_engine.prompt_registry import get_prompt, prompt_fields
+from llm_engine.rules import apply_rules, get_rule_stats
+from utils.validators import is_valid_aadhaar
+
+PAN_BUNDLE = {
+    "ocr_outputs": [
+        {
+            "agent": "paddle_agent",
+            "modality": "printed_text",
+            "text": "INCOME TAX DEPARTMENT Permanent Account Number Card IGDPD2933L /Name ABHISHEK DIXIT "
+                    "Father's Name AJAY KUMAR DIXIT 14112022 Date of Birth 27/09/2004",
+            "confidence": 0.87,
+            "boxes": [{"text": t} for t in ("Permanent Account Number Card", "IGDPD2933L", "/Name", "ABHISHEK DIXIT",
+                                            "Father's Name", "AJAY KUMAR DIXIT", "Date of Birth", "27/09/2004")],
+        }
+    ]
+}
+
+AADHAAR_BUNDLE = {
+    "ocr_outputs": [
+        {
+            "agent": "paddle_agent",
+            "modality": "printed_text",
+            "text": "Abhishek Dixit DOB: 27/09/2004 MALE 4702 2629 7140 VID : 9165 1247 9748 1412",
+            "confidence": 0.89,
+        }
+    ]
+}
+
+
+def test_verhoeff_checksum():
+    assert is_valid_aadhaar("4702 2629 7140")
+    assert not is_valid_aadhaar("470226297141")   # one digit misread
+    assert not is_valid_aadhaar("170226297140")   # cannot start with 1
+
+
+def test_aadhaar_rules():
+    entities = apply_rules(AADHAAR_BUNDLE, "aadhaar")
+    assert entities["aadhaar_number"] == {"value": "470226297140", "confidence": 0.98}
+    assert entities["vid_number"]["value"] == "9165124797481412"   # not mistaken for an Aadhaar number
+    assert entities["date_of_birth"]["value"] == "2004-09-27"
+    assert entities["gender"]["value"] == "MALE"
+
+
+def test_llm_skipped_when_rules_fill_every_field():
+    def fail_cli(*args):
+        raise AssertionError("LLM should not be called")
+
+    original = extractor._run_cli
+    extractor._run_cli = fail_cli
+    try:
+        entities = extractor.extract_entities(PAN_BUNDLE, "pan", backend="cli", use_cache=False,
+                                              only_fields=["pan_number", "date_of_birth"])
+    finally:
+        extractor._run_cli = original
+
+    assert entities["pan_number"]["value"] == "IGDPD2933L"
+    assert entities["date_of_birth"]["value"] == "2004-09-27"
+    assert get_rule_stats()["pan"]["llm_calls_avoided"] >= 1
+
+
+def test_labelled_names_left_to_the_llm():
+    prompts = []
+
+    def fake_cli(prompt, model_name, timeout, json_mode=False):
+        prompts.append(prompt)
+        return json.dumps({"full_name": {"value": "ABHISHEK DIXIT", "confidence": 0.95},
+                           "fathers_name": {"value": "AJAY KUMAR DIXIT", "confidence": 0.95}})
+
+    assert apply_rules(PAN_BUNDLE, "pan")["full_name"]["confidence"] < 0.9   # a hint only
+    original = extractor._run_cli
+    extractor._run_cli = fake_cli
+    try:
+        entities = extractor.extract_entities(PAN_BUNDLE, "pan", backend="cli", use_cache=False)
+    finally:
+        extractor._run_cli = original
+
+    output_format = prompts[0].split("RULES:")[0]
+    assert '"full_name":' in output_format and '"fathers_name":' in output_format
+    assert '"pan_number":' not in output_format
+    assert entities["full_name"] == {"value": "ABHISHEK DIXIT", "confidence": 0.95}
+    assert entities["pan_number"]["value"] == "IGDPD2933L"
+
+
+def test_llm_asked_only_for_missing_fields():
+    prompts = []
+
+    def fake_cli(prompt, model_name, timeout, json_mode=False):
+        prompts.append(prompt)
+        return json.dumps({"full_name": {"value": "Abhishek Dixit", "confidence": 0.9},
+                           "aadhaar_number": {"value": "470226297141", "confidence": 0.7}})
+
+    original = extractor._run_cli
+    extractor._run_cli = fake_cli
+    try:
+        entities = extractor.extract_entities(AADHAAR_BUNDLE, "aadhaar", backend="cli", use_cache=False)
+    finally:
+        extractor._run_cli = original
+
+    output_format = prompts[0].split("RULES:")[0]
+    assert '"full_name":' in output_format
+    assert '"aadhaar_number":' not in output_format and '"gender":' not in output_format
+    assert entities["full_name"]["value"] == "Abhishek Dixit"
+    assert entities["aadhaar_number"]["value"] == "470226297140"   # checksum-verified rule value wins
+
+
+def test_prompt_restricted_to_fields():
+    template = get_prompt("pan", fields=["full_name", "pan_number"])
+    assert prompt_fields(template) == ["full_name", "pan_number"]
+    assert template.format(ocr_data="{}")  # still a valid template
+
+
+if __name__ == "__main__":
+    test_verhoeff_checksum()
+    test_aadhaar_rules()
+    test_llm_skipped_when_rules_fill_every_field()
+    test_labelled_names_left_to_the_llm()
+    test_llm_asked_only_for_missing_fields()
+    test_prompt_restricted_to_fields()
+    print("✅ rule-based extractor tests passed!")
@@ -0,0 +1,135 @@
+import sys
+import os
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+from llm_engine.streaming import EntityStreamParser
+
+REPLY = (
+    'Here is the JSON:\n```json\n{\n'
+    '  "full_name": {"value": "Abhishek {Dixit}", "confidence": 0.95}, // from line 1\n'
+    '  "gender": {"value": "MALE", "confidence": 0.9,}\n'
+    '}\n```\nNote: the "DOB" field was not visible, so I left it out.'
+)
+
+
+def _chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class StreamingOllama(BaseHTTPRequestHandler):
+    """Streams REPLY as Ollama NDJSON lines, a few characters per line."""
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        assert body["stream"] is True
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        for piece in _chunks(REPLY, 5):
+            self.wfile.write((json.dumps({"response": piece, "done": False}) + "\n").encode())
+            self.wfile.flush()
+        self.wfile.write(b'{"response": "", "done": true}\n')
+
+    def log_message(self, *args):
+        pass
+
+
+def test_parser_emits_each_entity_as_it_completes():
+    for size in (1, 4, len(REPLY)):
+        parser = EntityStreamParser()
+        emitted = [item for piece in _chunks(REPLY, size) for item in parser.feed(piece)]
+        assert [key for key, _ in emitted] == ["full_name", "gender"]
+        assert parser.entities["full_name"]["value"] == "Abhishek {Dixit}"
+        assert parser.entities["gender"] == {"value": "MALE", "confidence": 0.9}
+        assert parser.closed
+
+
+def test_null_values_match_the_non_streaming_parser():
+    from llm_engine.extractor import parse_llm_output
+
+    reply = '{"full_name": {"value": "Abhishek Dixit", "confidence": 0.9}, "vid_number": null}'
+    parser = EntityStreamParser()
+    emitted = parser.feed(reply)
+    assert emitted == [("full_name", {"value": "Abhishek Dixit", "confidence": 0.9}), ("vid_number", None)]
+    assert parser.entities == parse_llm_output(reply)
+
+
+def test_parser_complete_once_expected_keys_are_in():
+    parser = EntityStreamParser(["full_name"])
+    for position, piece in enumerate(REPLY):
+        parser.feed(piece)
+        if parser.complete:
+            break
+    assert position < REPLY.index('"gender"')  # generation can stop here
+    assert not parser.closed
+
+
+def test_stream_entities_async_iterator():
+    import llm_engine.ollama_client as ollama_client
+    from llm_engine.extractor import extract_entities, stream_entities
+    from llm_engine.ollama_client import OllamaClient
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StreamingOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    original = ollama_client._default_client
+    ollama_client._default_client = OllamaClient(host=f"http://127.0.0.1:{server.server_port}")
+    bundle = {"ocr_outputs": [{"agent": "paddle_agent", "text": "Abhishek Dixit", "confidence": 0.9}]}
+    try:
+        entities = extract_entities(bundle, "voice", backend="http", use_cache=False, stream=True)
+        assert entities["gender"]["value"] == "MALE"
+
+        async def collect():
+            try:
+                return [item async for item in stream_entities(bundle, "voice", use_cache=False)]
+            finally:
+                await ollama_client.close_ollama_client()
+
+        items = asyncio.run(collect())
+        assert [field for field, _ in items] == ["full_name", "gender"]
+    finally:
+        ollama_client._default_client = original
+        server.shutdown()
+
+
+def test_async_stream_honours_explicit_backend():
+    import llm_engine.extractor as extractor
+    import llm_engine.ollama_client as ollama_client
+    from llm_engine.ollama_client import OllamaClient
+
+    def fail_cli(*args):
+        raise AssertionError("an explicit http backend must not fall back to the CLI")
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StreamingOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    original = ollama_client._default_client, extractor.LLM_BACKEND, extractor._run_cli
+    ollama_client._default_client = OllamaClient(host=f"http://127.0.0.1:{server.server_port}")
+    extractor.LLM_BACKEND, extractor._run_cli = "cli", fail_cli
+    bundle = {"ocr_outputs": [{"agent": "paddle_agent", "text": "Abhishek Dixit", "confidence": 0.9}]}
+
+    async def extract():
+        try:
+            return await extractor.extract_entities_async(bundle, "voice", backend="http",
+                                                          use_cache=False, stream=True)
+        finally:
+            await ollama_client.close_ollama_client()
+
+    try:
+        assert asyncio.run(extract())["gender"]["value"] == "MALE"
+    finally:
+        ollama_client._default_client, extractor.LLM_BACKEND, extractor._run_cli = original
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_parser_emits_each_entity_as_it_completes()
+    test_null_values_match_the_non_streaming_parser()
+    test_parser_complete_once_expected_keys_are_in()
+    test_stream_entities_async_iterator()
+    test_async_stream_honours_explicit_backend()
+    print("✅ streaming extraction tests passed!")
@@ -0,0 +1,129 @@
+import sys
+import os
+import threading
+import types
+
+import numpy as np
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+import ocr_agents.tesseract_backend as tesseract_backend
+from ocr_agents.tesseract_backend import PytesseractBackend, TesserocrBackend, create_backend
+
+
+class FakeTessAPI:
+    """Records what a pooled tesserocr engine is asked to do."""
+    created = []
+
+    def __init__(self, lang, psm, path=None):
+        self.variables, self.calls, self.ended = {}, [], False
+        self.busy = threading.Lock()
+        FakeTessAPI.created.append(self)
+
+    def SetVariable(self, name, value):
+        self.variables[name] = value
+
+    def SetPageSegMode(self, psm):
+        self.psm = psm
+
+    def SetImageBytes(self, data, width, height, bytes_per_pixel, bytes_per_line):
+        assert self.busy.acquire(blocking=False), "engine shared between threads"
+        self.calls.append((len(data), width, height, bytes_per_pixel, bytes_per_line, self.psm))
+
+    def GetUTF8Text(self):
+        return "1234"
+
+    def Clear(self):
+        self.busy.release()
+
+    def End(self):
+        self.ended = True
+
+
+def _with_modules(tesserocr=None, pytesseract=None):
+    """Swaps the optional tesserocr / pytesseract modules; returns a restore callback."""
+    original_tesserocr, original_pytesseract = tesseract_backend.tesserocr, sys.modules.get("pytesseract")
+    tesseract_backend.tesserocr = tesserocr
+    if pytesseract is not None:
+        sys.modules["pytesseract"] = pytesseract
+
+    def restore():
+        tesseract_backend.tesserocr = original_tesserocr
+        if original_pytesseract is None:
+            sys.modules.pop("pytesseract", None)
+        else:
+            sys.modules["pytesseract"] = original_pytesseract
+    return restore
+
+
+def _fake_pytesseract(calls):
+    module = types.ModuleType("pytesseract")
+    module.pytesseract = types.SimpleNamespace(tesseract_cmd=None)
+    module.image_to_string = lambda image, config: calls.append(config) or "5678"
+    return module
+
+
+def test_tesserocr_pool_reuses_configured_engines():
+    FakeTessAPI.created = []
+    restore = _with_modules(tesserocr=types.SimpleNamespace(PyTessBaseAPI=FakeTessAPI))
+    try:
+        backend = create_backend("0123456789", psm=7, backend="auto")
+        assert isinstance(backend, TesserocrBackend)
+
+        gray = np.zeros((20, 30), dtype=np.uint8)
+        threads = [threading.Thread(target=backend.image_to_string, args=(gray,)) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert backend.image_to_string(gray, psm=8) == "1234"
+        backend.close()
+    finally:
+        restore()
+
+    engines = FakeTessAPI.created
+    assert len(engines) == tesseract_backend.TESSERACT_POOL_SIZE
+    assert all(e.variables == {"tessedit_char_whitelist": "0123456789"} for e in engines)
+    calls = [call for e in engines for call in e.calls]
+    assert len(calls) == 9
+    assert all(call[:5] == (600, 30, 20, 1, 30) for call in calls)   # raw grayscale buffer
+    assert sorted(call[5] for call in calls) == [7] * 8 + [8]
+    assert all(e.ended for e in engines)
+
+
+def test_pytesseract_fallback_when_tesserocr_is_missing():
+    calls = []
+    restore = _with_modules(tesserocr=None, pytesseract=_fake_pytesseract(calls))
+    try:
+        backend = create_backend("0123456789", psm=6, backend="auto")
+        assert isinstance(backend, PytesseractBackend)
+        assert backend.image_to_string(np.zeros((20, 30), dtype=np.uint8)) == "5678"
+        assert calls == ["-c tessedit_char_whitelist=0123456789 --psm 6"]
+
+        try:
+            create_backend("0123456789", backend="tesserocr")
+            assert False, "an explicit tesserocr backend must not fall back"
+        except RuntimeError:
+            pass
+    finally:
+        restore()
+
+
+def test_pytesseract_fallback_when_tesserocr_fails_to_start():
+    def broken_api(**kwargs):
+        raise RuntimeError("tessdata not found")
+
+    restore = _with_modules(tesserocr=types.SimpleNamespace(PyTessBaseAPI=broken_api),
+                            pytesseract=_fake_pytesseract([]))
+    try:
+        assert isinstance(create_backend("0123456789", backend="auto"), PytesseractBackend)
+    finally:
+        restore()
+
+
+if __name__ == "__main__":
+    test_tesserocr_pool_reuses_configured_engines()
+    test_pytesseract_fallback_when_tesserocr_is_missing()
+    test_pytesseract_fallback_when_tesserocr_fails_to_start()
+    print("✅ tesseract backend tests passed!")
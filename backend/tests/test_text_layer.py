@@ -0,0 +1,74 @@
+import sys
+import os
+import tempfile
+
+import fitz  # PyMuPDF
+import numpy as np
+
+# Add current directory to path so imports work
+sys.path.append(os.getcwd())
+
+from ingestion.pdf_document import PDFDocument
+from ingestion.text_layer import extract_text_layer
+
+
+def _text_pdf(*pages):
+    """PDF bytes with one page of embedded text per argument."""
+    doc = fitz.open()
+    for lines in pages:
+        page = doc.new_page()
+        for i, line in enumerate(lines):
+            page.insert_text((72, 72 + 20 * i), line)
+    return doc.tobytes()
+
+
+def _scanned_pdf():
+    """PDF bytes whose only page is an image, like a scanner produces."""
+    doc = fitz.open()
+    page = doc.new_page()
+    pixels = np.random.default_rng(0).integers(0, 255, size=(100, 160), dtype=np.uint8)
+    pixmap = fitz.Pixmap(fitz.csGRAY, 160, 100, pixels.tobytes(), False)
+    page.insert_image(page.rect, pixmap=pixmap)
+    return doc.tobytes()
+
+
+def test_text_layer_pages_become_layer3_outputs():
+    data = _text_pdf(["Name: ABHISHEK DIXIT", "DOB: 27/09/2004"], ["Address: Kanpur, Uttar Pradesh 208001"])
+    with PDFDocument(data, name="digilocker.pdf") as pdf:
+        bundle = extract_text_layer(pdf)
+
+    first, second = bundle["ocr_outputs"]
+    assert (first["page"], second["page"]) == (0, 1)
+    assert first["agent"] == "pdf_text_layer" and first["confidence"] == 1.0
+    assert first["text"] == "Name: ABHISHEK DIXIT DOB: 27/09/2004"
+    assert [b["text"] for b in first["boxes"]] == ["Name: ABHISHEK DIXIT", "DOB: 27/09/2004"]
+    assert first["boxes"][0]["box"][1] < first["boxes"][1]["box"][1]   # top to bottom
+
+
+def test_text_layer_reads_paths_too():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "digital.pdf")
+        with open(path, "wb") as f:
+            f.write(_text_pdf(["Permanent Account Number IGDPD2933L"]))
+        assert extract_text_layer(path)["ocr_outputs"][0]["text"] == "Permanent Account Number IGDPD2933L"
+
+
+def test_scanned_pdf_goes_to_ocr():
+    with PDFDocument(_scanned_pdf()) as pdf:
+        assert extract_text_layer(pdf) is None
+    # One image-only page is enough to send the whole document to OCR
+    doc = fitz.open(stream=_text_pdf(["Name: ABHISHEK DIXIT, Kanpur 208001"]), filetype="pdf")
+    doc.insert_pdf(fitz.open(stream=_scanned_pdf(), filetype="pdf"))
+    assert extract_text_layer(doc) is None
+
+
+def test_unreadable_pdf_returns_none():
+    assert extract_text_layer("/nonexistent/upload.pdf") is None
+
+
+if __name__ == "__main__":
+    test_text_layer_pages_become_layer3_outputs()
+    test_text_layer_reads_paths_too()
+    test_scanned_pdf_goes_to_ocr()
+    test_unreadable_pdf_returns_none()
+    print("✅ PDF text layer tests passed!")
@@ -0,0 +1,210 @@
+# utils/cache.py
+import copy
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def stable_hash(*parts) -> str:
+    """
+    SHA-256 over the given parts. Bytes are hashed as-is; everything else is
+    serialized as canonical JSON so dict ordering does not change the key.
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, (bytes, bytearray, memoryview)):
+            part = json.dumps(part, sort_keys=True, default=str).encode("utf-8")
+        h.update(part)
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+class TieredCache:
+    """
+    Two-tier cache for JSON-serializable results.
+
+    - Memory tier: LRU bounded by `max_items` entries.
+    - Disk tier (optional): one JSON file per key under `disk_dir`, evicted
+      least recently used first once the directory grows past `max_disk_bytes`.
+      The directory is created on the first write. Several processes (e.g.
+      page-pool workers) may share it: the byte count is re-read from the
+      directory before evicting and every `disk_rescan_every` writes, so
+      between scans other processes' writes can overshoot the limit a little.
+    - Optional `ttl_seconds`: entries older than this are treated as misses
+      (and dropped) in both tiers.
+
+    Hits and misses are counted per tier so the sizes can be tuned.
+    """
+
+    disk_rescan_every = 64
+
+    def __init__(self, name, max_items=128, disk_dir=None, max_disk_bytes=256 * 1024 * 1024,
+                 ttl_seconds=None):
+        self.name = name
+        self.max_items = max_items
+        self.max_disk_bytes = max_disk_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+        }
+        self._disk_bytes = 0
+        self._writes_since_scan = 0
+        if self.disk_dir:
+            self._disk_bytes = self._scan_disk()
+
+    def _scan_disk(self):
+        """Bytes currently on disk, including entries written by other processes."""
+        total = 0
+        for path in self.disk_dir.glob("*.json"):
+            try:
+                total += path.stat().st_size
+            except OSError:
+                pass  # evicted by another process meanwhile
+        return total
+
+    def _disk_path(self, key):
+        return self.disk_dir / f"{key}.json"
+
+    def _expired(self, stored_at):
+        return self.ttl_seconds is not None and time.time() - stored_at > self.ttl_seconds
+
+    def get(self, key):
+        """Returns a copy of the cached value, or None on a miss."""
+        with self._lock:
+            if key in self._memory:
+                stored_at, value = self._memory[key]
+                if self._expired(stored_at):
+                    del self._memory[key]
+                    self._counters["expired"] += 1
+                else:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return copy.deepcopy(value)
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                # mtime = when the entry was stored, atime = last use
+                stored_at = path.stat().st_mtime
+                with open(path, "r", encoding="utf-8") as f:
+                    value = json.load(f)
+            except (OSError, ValueError):
+                value = None
+            if value is not None and self._expired(stored_at):
+                self._unlink(path)
+                with self._lock:
+                    self._counters["expired"] += 1
+                value = None
+            if value is not None:
+                try:
+                    os.utime(path, (time.time(), stored_at))  # refresh recency for eviction
+                except OSError:
+                    pass
+                with self._lock:
+                    self._counters["disk_hits"] += 1
+                    self._remember(key, value, stored_at)
+                return copy.deepcopy(value)
+
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def set(self, key, value):
+        value = copy.deepcopy(value)
+        stored_at = time.time()
+        with self._lock:
+            self._counters["stores"] += 1
+            self._remember(key, value, stored_at)
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            tmp_path = path.with_suffix(".tmp")
+            try:
+                data = json.dumps(value).encode("utf-8")
+                self.disk_dir.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "wb") as f:
+                    f.write(data)
+                old_size = path.stat().st_size if path.exists() else 0
+                os.replace(tmp_path, path)
+                with self._lock:
+                    self._disk_bytes += len(data) - old_size
+                    self._writes_since_scan += 1
+                self._evict_disk()
+            except OSError as e:
+                logger.warning(f"Could not write {self.name} cache entry: {e}")
+
+    def _remember(self, key, value, stored_at):
+        # Caller holds the lock
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+            self._counters["evictions"] += 1
+
+    def _evict_disk(self):
+        with self._lock:
+            if self._disk_bytes <= self.max_disk_bytes and self._writes_since_scan < self.disk_rescan_every:
+                return
+            self._disk_bytes = self._scan_disk()
+            self._writes_since_scan = 0
+            if self._disk_bytes <= self.max_disk_bytes:
+                return
+            entries = sorted(self.disk_dir.glob("*.json"), key=lambda p: p.stat().st_atime)
+            for path in entries:
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                try:
+                    size = path.stat().st_size
+                    path.unlink()
+                except OSError:
+                    continue
+                self._disk_bytes -= size
+                self._counters["evictions"] += 1
+
+    def _unlink(self, path):
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except OSError:
+            return
+        with self._lock:
+            self._disk_bytes -= size
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self.disk_dir:
+                for path in self.disk_dir.glob("*.json"):
+                    path.unlink(missing_ok=True)
+                self._disk_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+            hits = counters["memory_hits"] + counters["disk_hits"]
+            return {
+                "name": self.name,
+                **counters,
+                "hit_rate": round(hits / lookups, 3) if lookups else 0.0,
+                "memory_items": len(self._memory),
+                "memory_capacity": self.max_items,
+                "ttl_seconds": self.ttl_seconds,
+                "disk_bytes": self._disk_bytes if self.disk_dir else 0,
+                "disk_capacity_bytes": self.max_disk_bytes if self.disk_dir else 0,
+            }
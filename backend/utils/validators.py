@@ -6,6 +6,45 @@ PAN_REGEX = r"^[A-Z]{5}[0-9]{4}[A-Z]{1}$"
 IFSC_REGEX = r"^[A-Z]{4}0[A-Z0-9]{6}$"
 PINCODE_REGEX = r"^\d{6}$"
 MOBILE_REGEX = r"^\d{10}$"
+EPIC_REGEX = r"^[A-Z]{3}\d{7}$"
+
+# Verhoeff checksum tables (the last Aadhaar digit is a Verhoeff check digit)
+_VERHOEFF_D = [
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
+    [1, 2, 3, 4, 0, 6, 7, 8, 9, 5],
+    [2, 3, 4, 0, 1, 7, 8, 9, 5, 6],
+    [3, 4, 0, 1, 2, 8, 9, 5, 6, 7],
+    [4, 0, 1, 2, 3, 9, 5, 6, 7, 8],
+    [5, 9, 8, 7, 6, 0, 4, 3, 2, 1],
+    [6, 5, 9, 8, 7, 1, 0, 4, 3, 2],
+    [7, 6, 5, 9, 8, 2, 1, 0, 4, 3],
+    [8, 7, 6, 5, 9, 3, 2, 1, 0, 4],
+    [9, 8, 7, 6, 5, 4, 3, 2, 1, 0],
+]
+_VERHOEFF_P = [
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
+    [1, 5, 7, 6, 2, 8, 3, 0, 9, 4],
+    [5, 8, 0, 3, 7, 9, 6, 1, 4, 2],
+    [8, 9, 1, 6, 0, 4, 3, 5, 2, 7],
+    [9, 4, 5, 3, 1, 2, 6, 8, 7, 0],
+    [4, 2, 8, 6, 5, 7, 3, 9, 0, 1],
+    [2, 7, 9, 3, 8, 0, 6, 4, 1, 5],
+    [7, 0, 4, 6, 9, 1, 3, 2, 5, 8],
+]
+
+def verhoeff_valid(number: str) -> bool:
+    """True if the digit string ends in a valid Verhoeff check digit."""
+    if not number or not number.isdigit():
+        return False
+    c = 0
+    for i, digit in enumerate(reversed(number)):
+        c = _VERHOEFF_D[c][_VERHOEFF_P[i % 8][int(digit)]]
+    return c == 0
+
+def is_valid_aadhaar(number: str) -> bool:
+    """12 digits, not starting with 0 or 1, with a valid Verhoeff checksum."""
+    number = (number or "").replace(" ", "")
+    return bool(re.match(AADHAAR_REGEX, number)) and number[0] not in "01" and verhoeff_valid(number)
 
 def validate_entity_data(key: str, value: str) -> bool:
     """